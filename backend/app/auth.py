@@ -1,3 +1,5 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Any, Dict, Optional
 
@@ -15,11 +17,23 @@ from app.settings import settings
 # ===============================
 # CONFIG
 # ===============================
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min = max = default: хеш с друга цена се отчита като остарял и се прехешира при вход.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+    bcrypt__max_rounds=settings.bcrypt_rounds,
+)
+
+# bcrypt е ~100–300 ms CPU (пуска GIL-а) – ограничен pool, за да не се изяде threadpool-ът при вълна от входове.
+_password_executor = ThreadPoolExecutor(
+    max_workers=max(1, settings.password_hash_workers), thread_name_prefix="password-hash"
+)
 
 SECRET_KEY = settings.jwt_secret
 ALGORITHM = settings.jwt_algorithm
-ACCESS_TOKEN_EXPIRE_MINUTES = 60
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expires_minutes
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
@@ -36,6 +50,25 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def hash_password_pooled(password: str) -> str:
+    """
+    get_password_hash в password pool-а – за sync handler-ите (създаване/смяна на парола).
+    Нишката от threadpool-а чака, но едновременните bcrypt-и са до settings.password_hash_workers.
+    """
+    return _password_executor.submit(pwd_context.hash, password).result()
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """
+    Проверка извън event loop-а, в password pool-а. Вторият елемент е нов хеш,
+    когато паролата е вярна, но е хеширана с друга цена (settings.bcrypt_rounds).
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _password_executor, pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+
 # ===============================
 # JWT HANDLING
 # ===============================
@@ -0,0 +1,45 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable
+
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Малък thread-safe LRU кеш в паметта на процеса.
+    Ключовете трябва да съдържат версията на данните (напр. updated_at),
+    така че остарелите записи просто изпадат, без изрично invalidate.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
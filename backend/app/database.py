@@ -1,21 +1,47 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from .db_pool import PoolMetrics, apply_sqlite_pragmas, timed_pool_class
 from .settings import settings
 
+_database_url = make_url(settings.database_url)
+_is_sqlite = _database_url.get_backend_name() == "sqlite"
+# In-memory SQLite живее в една връзка – там остава pool-ът по подразбиране.
+_is_sqlite_memory = _is_sqlite and _database_url.database in (None, "", ":memory:")
+
+sync_pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+
+def _engine_options(base_pool, metrics: PoolMetrics, is_async: bool) -> dict:
+    """Pool от settings (с метрики) + connect_args според базата."""
+    options = {}
+    if not _is_sqlite_memory:
+        options.update(
+            poolclass=timed_pool_class(base_pool, metrics),
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout_seconds,
+            pool_recycle=settings.db_pool_recycle_seconds,
+        )
+    if _is_sqlite:
+        # SQLite doesn't support pool_pre_ping
+        if not is_async:
+            options["connect_args"] = {"check_same_thread": False}
+    else:
+        options["pool_pre_ping"] = True
+        if settings.db_statement_timeout_ms > 0:
+            options["connect_args"] = {"options": f"-c statement_timeout={settings.db_statement_timeout_ms}"}
+    return options
+
+
 # SQLAlchemy engine
-# SQLite doesn't support pool_pre_ping, so we conditionally enable it
-connect_args = {}
-if settings.database_url.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
-    engine = create_engine(
-        settings.database_url,
-        connect_args=connect_args,
-    )
-else:
-    engine = create_engine(
-        settings.database_url,
-        pool_pre_ping=True,
-    )
+engine = create_engine(settings.database_url, **_engine_options(QueuePool, sync_pool_metrics, is_async=False))
+if _is_sqlite:
+    apply_sqlite_pragmas(engine, settings.sqlite_busy_timeout_ms, settings.sqlite_mmap_size)
 
 # Session factory
 SessionLocal = sessionmaker(
@@ -24,6 +50,34 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+
+def _async_database_url(url: str) -> str:
+    """Същата база през async драйвер: aiosqlite за SQLite, psycopg (3, async режим) за PostgreSQL."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    if parsed.get_backend_name() == "postgresql":
+        return parsed.set(drivername="postgresql+psycopg").render_as_string(hide_password=False)
+    return url
+
+
+# Async engine до sync-а: горещите read пътища (auth, статии, форум, упражнения) не заемат
+# нишка от threadpool-а, докато чакат базата.
+async_engine = create_async_engine(
+    _async_database_url(settings.database_url),
+    **_engine_options(AsyncAdaptedQueuePool, async_pool_metrics, is_async=True),
+)
+if _is_sqlite:
+    apply_sqlite_pragmas(async_engine.sync_engine, settings.sqlite_busy_timeout_ms, settings.sqlite_mmap_size)
+
+# expire_on_commit=False: след commit атрибутите не се презареждат lazily (в async няма lazy load).
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Base class for ORM models
 Base = declarative_base()
 
@@ -38,3 +92,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Async вариантът на get_db за async def handler-ите."""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,94 @@
+import time
+from threading import Lock
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import Pool, QueuePool
+
+
+class PoolMetrics:
+    """
+    Брояч за един connection pool: колко се чака за връзка, колко пъти е изтекъл
+    pool_timeout и колко от капацитета (pool_size + max_overflow) е зает.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.peak_checked_out = 0
+
+    def record_checkout(self, wait_seconds: float, checked_out: int) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def stats(self, pool: Pool) -> dict:
+        result = {"pool": type(pool).__name__}
+        if not isinstance(pool, QueuePool):
+            # NullPool/StaticPool (SQLite) – няма какво да се насища
+            return result
+
+        capacity = pool.size() + max(pool._max_overflow, 0)
+        checked_out = pool.checkedout()
+        with self._lock:
+            result.update(
+                {
+                    "size": pool.size(),
+                    "max_overflow": pool._max_overflow,
+                    "checked_out": checked_out,
+                    "peak_checked_out": self.peak_checked_out,
+                    "saturation": round(checked_out / capacity, 4) if capacity else 0.0,
+                    "peak_saturation": round(self.peak_checked_out / capacity, 4) if capacity else 0.0,
+                    "checkouts": self.checkouts,
+                    "timeouts": self.timeouts,
+                    "wait_ms_avg": round(self.wait_seconds_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                    "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+                }
+            )
+        return result
+
+
+def timed_pool_class(base: type[QueuePool], metrics: PoolMetrics) -> type[QueuePool]:
+    """
+    Подклас на pool-а, който мери времето до получаване на връзка (чакане + ping/connect).
+    Метриките са на класа – запазват се и след engine.dispose(), който пресъздава pool-а.
+    """
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = base.connect(self)
+        except exc.TimeoutError:
+            metrics.record_timeout()
+            raise
+        metrics.record_checkout(time.perf_counter() - started, self.checkedout())
+        return connection
+
+    return type(f"Timed{base.__name__}", (base,), {"connect": connect})
+
+
+def apply_sqlite_pragmas(engine, busy_timeout_ms: int, mmap_size: int) -> None:
+    """
+    WAL (четенията не блокират записа), synchronous=NORMAL (безопасно с WAL, без fsync на всеки commit),
+    mmap и busy_timeout – записите изчакват заключването вместо веднага "database is locked".
+    Работи и за async engine (подава се sync_engine).
+    """
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+            cursor.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+        finally:
+            cursor.close()
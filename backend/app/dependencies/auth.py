@@ -1,4 +1,4 @@
-from app.routers.auth import get_current_user
+from app.routers.auth import get_current_user, get_current_user_async
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
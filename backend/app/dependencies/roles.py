@@ -1,8 +1,25 @@
 from fastapi import Depends, HTTPException, status
-from app.dependencies.auth import get_current_user
+from app.dependencies.auth import get_current_user, get_current_user_async
 from app.models import UserRole
 
 
+def _check_role(user, allowed_roles):
+    # user.role може да е Enum или string - нормализираме
+    role_value = user.role.value if hasattr(user.role, "value") else user.role
+
+    allowed_values = [
+        r.value if hasattr(r, "value") else r
+        for r in allowed_roles
+    ]
+
+    if role_value not in allowed_values:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return user
+
+
 def require_role(*allowed_roles: UserRole):
     """
     Usage:
@@ -10,19 +27,14 @@ def require_role(*allowed_roles: UserRole):
       Depends(require_role(UserRole.coach, UserRole.platform_admin))
     """
     def checker(user=Depends(get_current_user)):
-        # user.role може да е Enum или string - нормализираме
-        role_value = user.role.value if hasattr(user.role, "value") else user.role
-
-        allowed_values = [
-            r.value if hasattr(r, "value") else r
-            for r in allowed_roles
-        ]
-
-        if role_value not in allowed_values:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not enough permissions"
-            )
-        return user
+        return _check_role(user, allowed_roles)
+
+    return checker
+
+
+def require_role_async(*allowed_roles: UserRole):
+    """Като require_role, но за async handler-и с get_async_db – auth ползва тяхната сесия."""
+    async def checker(user=Depends(get_current_user_async)):
+        return _check_role(user, allowed_roles)
 
     return checker
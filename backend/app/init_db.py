@@ -4,10 +4,16 @@ from sqlalchemy import select, func, text
 
 from .database import engine, SessionLocal, Base
 from .settings import settings
-from .models import User, UserRole, Club, Drill
+from .models import User, UserRole, Club, Drill, ForumPost, ForumPostTag, Training, TrainingDrill
 from .seed.seed_clubs import seed_clubs
 from .seed.seed_drills import seed_drills
 from .auth import get_password_hash
+from .services.article_service import backfill_article_renders
+from .services.coach_service import backfill_coach_numbers
+from .services.drill_media_service import backfill_drill_media, generate_drill_thumbnails
+from .services.forum_search import ensure_sqlite_search_index
+from .services.forum_service import FORUM_NOTIFICATIONS_DEDUPE_SQL, backfill_post_tags
+from .services.training_service import backfill_training_drills
 
 
 def seed_platform_admin(db: Session) -> None:
@@ -41,6 +47,31 @@ def _table_has_rows(db: Session, model) -> bool:
     return (count or 0) > 0
 
 
+def _normalize_sqlite_timestamps(conn, table: str, column: str) -> None:
+    """
+    SQLite CURRENT_TIMESTAMP пише 'YYYY-MM-DD HH:MM:SS', а SQLAlchemy сравнява с
+    'YYYY-MM-DD HH:MM:SS.ffffff'. Изравняваме старите редове, за да работят keyset cursor-ите.
+    """
+    result = conn.execute(
+        text(f"UPDATE {table} SET {column} = {column} || '.000000' WHERE length({column}) = 19")
+    )
+    if result.rowcount:
+        print(f"✅ Normalized {result.rowcount} {table}.{column} timestamps")
+
+
+_FORUM_COUNTERS_BACKFILL = """
+UPDATE forum_posts SET
+    reply_count = (SELECT COUNT(*) FROM forum_replies r WHERE r.post_id = forum_posts.id),
+    follower_count = (SELECT COUNT(*) FROM forum_post_subscriptions s WHERE s.post_id = forum_posts.id),
+    media_count = (SELECT COUNT(*) FROM forum_post_media m WHERE m.post_id = forum_posts.id),
+    last_activity_at = COALESCE(
+        (SELECT MAX(r.created_at) FROM forum_replies r WHERE r.post_id = forum_posts.id),
+        updated_at,
+        created_at
+    )
+"""
+
+
 def init_db() -> None:
     """
     - Създава таблиците ако липсват (create_all)
@@ -56,6 +87,40 @@ def init_db() -> None:
     # On PostgreSQL we rely on Alembic migrations and skip PRAGMA-based checks.
     if settings.database_url.startswith("sqlite"):
         with engine.begin() as conn:
+            drill_cols = conn.execute(text("PRAGMA table_info(drills)")).fetchall()
+            drill_col_names = {row[1] for row in drill_cols}
+            if "has_valid_video" not in drill_col_names:
+                conn.execute(text("ALTER TABLE drills ADD COLUMN has_valid_video BOOLEAN"))
+                print("✅ Added drills.has_valid_video column")
+
+            article_col_names = {row[1] for row in conn.execute(text("PRAGMA table_info(articles)")).fetchall()}
+            if "render_version" not in article_col_names:
+                for column, column_type in (
+                    ("content_html", "TEXT"),
+                    ("toc", "JSON"),
+                    ("plain_excerpt", "TEXT"),
+                    ("word_count", "INTEGER"),
+                    ("reading_minutes", "INTEGER"),
+                    ("render_version", "INTEGER"),
+                ):
+                    conn.execute(text(f"ALTER TABLE articles ADD COLUMN {column} {column_type}"))
+                print("✅ Added articles render columns")
+
+            if "comment_count" not in article_col_names:
+                conn.execute(text("ALTER TABLE articles ADD COLUMN comment_count INTEGER NOT NULL DEFAULT 0"))
+                conn.execute(
+                    text(
+                        "UPDATE articles SET comment_count = "
+                        "(SELECT COUNT(*) FROM article_comments c WHERE c.article_id = articles.id)"
+                    )
+                )
+                print("✅ Added and backfilled articles.comment_count column")
+
+            user_col_names = {row[1] for row in conn.execute(text("PRAGMA table_info(users)")).fetchall()}
+            if "coach_number" not in user_col_names:
+                conn.execute(text("ALTER TABLE users ADD COLUMN coach_number INTEGER"))
+                print("✅ Added users.coach_number column")
+
             cols = conn.execute(text("PRAGMA table_info(clubs)")).fetchall()
             col_names = {row[1] for row in cols}
             if "is_active" not in col_names:
@@ -77,6 +142,26 @@ def init_db() -> None:
                 conn.execute(text("ALTER TABLE trainings ADD COLUMN selected_drill_ids JSON"))
                 print("✅ Added trainings.selected_drill_ids column")
 
+            # Keyset cursor-ът на "моите тренировки" изисква created_at (колоната е NOT NULL в модела).
+            backfilled = conn.execute(
+                text(
+                    "UPDATE trainings SET created_at = COALESCE(updated_at, CURRENT_TIMESTAMP) "
+                    "WHERE created_at IS NULL"
+                )
+            )
+            if backfilled.rowcount:
+                print(f"✅ Backfilled {backfilled.rowcount} trainings.created_at values")
+            _normalize_sqlite_timestamps(conn, "trainings", "created_at")
+            _normalize_sqlite_timestamps(conn, "forum_replies", "created_at")
+            _normalize_sqlite_timestamps(conn, "articles", "created_at")
+            _normalize_sqlite_timestamps(conn, "article_comments", "created_at")
+            conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS ix_articles_status_created_id "
+                    "ON articles (status, created_at, id)"
+                )
+            )
+
             forum_post_cols = conn.execute(text("PRAGMA table_info(forum_posts)")).fetchall()
             forum_post_col_names = {row[1] for row in forum_post_cols}
             if "category" not in forum_post_col_names:
@@ -91,6 +176,62 @@ def init_db() -> None:
             if "is_locked" not in forum_post_col_names:
                 conn.execute(text("ALTER TABLE forum_posts ADD COLUMN is_locked BOOLEAN NOT NULL DEFAULT 0"))
                 print("✅ Added forum_posts.is_locked column")
+            if "reply_count" not in forum_post_col_names:
+                for column in ("reply_count", "follower_count", "media_count"):
+                    conn.execute(text(f"ALTER TABLE forum_posts ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0"))
+                conn.execute(text("ALTER TABLE forum_posts ADD COLUMN last_activity_at DATETIME"))
+                conn.execute(text(_FORUM_COUNTERS_BACKFILL))
+                for name, columns in (
+                    ("ix_forum_posts_pinned_activity", "is_pinned, last_activity_at, id"),
+                    ("ix_forum_posts_pinned_created", "is_pinned, created_at, id"),
+                    ("ix_forum_posts_pinned_replies", "is_pinned, reply_count, last_activity_at"),
+                ):
+                    conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON forum_posts ({columns})"))
+                print("✅ Added and backfilled forum_posts counters")
+
+            notification_indexes = {
+                row[1] for row in conn.execute(text("PRAGMA index_list(forum_notifications)")).fetchall()
+            }
+            if "ux_forum_notifications_user_post_unread" not in notification_indexes:
+                conn.execute(text(FORUM_NOTIFICATIONS_DEDUPE_SQL))
+                conn.execute(text("DROP INDEX IF EXISTS ix_forum_notifications_user_post_unread"))
+                conn.execute(
+                    text(
+                        "CREATE UNIQUE INDEX ux_forum_notifications_user_post_unread "
+                        "ON forum_notifications (user_id, post_id) WHERE is_read = false"
+                    )
+                )
+                print("✅ Added unique unread index on forum_notifications")
+            conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS ix_article_comments_article_created_id "
+                    "ON article_comments (article_id, created_at, id)"
+                )
+            )
+            conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS ix_forum_replies_post_created_id "
+                    "ON forum_replies (post_id, created_at, id)"
+                )
+            )
+
+            for media_table in ("article_media", "forum_post_media"):
+                media_cols = {row[1] for row in conn.execute(text(f"PRAGMA table_info({media_table})")).fetchall()}
+                if "content_sha256" not in media_cols:
+                    conn.execute(text(f"ALTER TABLE {media_table} ADD COLUMN content_sha256 VARCHAR(64)"))
+                    conn.execute(
+                        text(
+                            f"CREATE INDEX IF NOT EXISTS ix_{media_table}_content_sha256 "
+                            f"ON {media_table} (content_sha256)"
+                        )
+                    )
+                    print(f"✅ Added {media_table}.content_sha256 column")
+                if "derivatives" not in media_cols:
+                    conn.execute(text(f"ALTER TABLE {media_table} ADD COLUMN derivatives JSON"))
+                    conn.execute(text(f"ALTER TABLE {media_table} ADD COLUMN placeholder TEXT"))
+                    print(f"✅ Added {media_table}.derivatives column")
+
+            ensure_sqlite_search_index(conn)
 
     db = SessionLocal()
     try:
@@ -111,6 +252,31 @@ def init_db() -> None:
         else:
             print("ℹ️ Drills already exist - seeding skipped")
 
+        # Медия на упражненията (идемпотентно – само несинхронизираните)
+        pending_thumbs = backfill_drill_media(db)
+        for drill_id in pending_thumbs:
+            generate_drill_thumbnails(drill_id)
+
+        # forum_post_tags от JSON колоната tags – само ако индексът още е празен
+        if _table_has_rows(db, ForumPost) and not _table_has_rows(db, ForumPostTag):
+            processed = backfill_post_tags(db)
+            print(f"✅ forum_post_tags backfilled for {processed} topics")
+
+        # Рендер на статиите (HTML, съдържание, резюме) – само нерендерираните / по-стара версия
+        rendered = backfill_article_renders(db)
+        if rendered:
+            print(f"✅ Rendered {rendered} articles")
+
+        # "Треньор №N" – само за клубове с треньори без номер
+        renumbered = backfill_coach_numbers(db)
+        if renumbered:
+            print(f"✅ coach_number backfilled for {renumbered} clubs")
+
+        # training_drills от plan JSON – само ако индексът още е празен (напр. SQLite без Alembic)
+        if _table_has_rows(db, Training) and not _table_has_rows(db, TrainingDrill):
+            processed = backfill_training_drills(db)
+            print(f"✅ training_drills backfilled for {processed} trainings")
+
         print("✅ Database initialized successfully")
     except Exception as e:
         db.rollback()
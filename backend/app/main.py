@@ -2,11 +2,15 @@
 
 from pathlib import Path
 
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
+from app.database import async_engine, async_pool_metrics, engine, sync_pool_metrics
+from app.dependencies.roles import require_role
+from app.models import UserRole
+from app.services.image_derivatives import pillow_available
 from app.init_db import init_db
 
 from app.routers.auth import router as auth_router
@@ -17,6 +21,7 @@ from app.routers.trainings import router as trainings_router
 from app.routers.ai_training import router as ai_training_router
 from app.routers.forum import router as forum_router
 from app.routers.fees import router as fees_router
+from app.routers.media import router as media_router
 from app.routers import articles
 
 
@@ -64,12 +69,21 @@ app.include_router(ai_training_router)
 app.include_router(articles.router, prefix="/api", tags=["Articles"])
 app.include_router(forum_router, prefix="/api", tags=["Forum"])
 app.include_router(fees_router, prefix="/api", tags=["Fees"])
+app.include_router(media_router, prefix="/api", tags=["Media"])
 
 # --- Root ---
 @app.get("/")
 def root():
     return {"status": "Volley Platform API is running"}
 
+@app.get("/api/admin/db-pool", tags=["Admin"])
+def db_pool_stats(current_user=Depends(require_role(UserRole.platform_admin))):
+    # Чакане за връзка и заетост на pool-овете на двата engine-а
+    return {
+        "sync": sync_pool_metrics.stats(engine.pool),
+        "async": async_pool_metrics.stats(async_engine.pool),
+    }
+
 # --- Pages (ако ги ползваш) ---
 @app.get("/drills-page")
 def drills_page(request: Request):
@@ -87,4 +101,11 @@ def generator_page(request: Request):
 # --- Startup ---
 @app.on_event("startup")
 def startup_event():
+    if not pillow_available():
+        print("⚠️ Pillow is not installed – no drill thumbnails or image derivatives (only originals are served)")
     init_db()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await async_engine.dispose()
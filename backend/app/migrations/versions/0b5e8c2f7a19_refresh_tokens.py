@@ -0,0 +1,42 @@
+"""refresh_tokens table for rotating refresh tokens
+
+Revision ID: 0b5e8c2f7a19
+Revises: d9e4b1f7a263
+Create Date: 2026-10-19 22:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0b5e8c2f7a19"
+down_revision = "d9e4b1f7a263"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if inspector.has_table("refresh_tokens"):
+        return
+    op.create_table(
+        "refresh_tokens",
+        sa.Column("token_hash", sa.String(length=64), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("family_id", sa.String(length=32), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("revoked_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_refresh_tokens_user_id", "refresh_tokens", ["user_id"], unique=False)
+    op.create_index("ix_refresh_tokens_family_id", "refresh_tokens", ["family_id"], unique=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if inspector.has_table("refresh_tokens"):
+        op.drop_index("ix_refresh_tokens_family_id", table_name="refresh_tokens")
+        op.drop_index("ix_refresh_tokens_user_id", table_name="refresh_tokens")
+        op.drop_table("refresh_tokens")
@@ -0,0 +1,32 @@
+"""composite index for keyset pagination of a coach's trainings
+
+Revision ID: 1a7d4e9c3f82
+Revises: 5c8e3f0a7d21
+Create Date: 2026-10-19 12:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "1a7d4e9c3f82"
+down_revision = "5c8e3f0a7d21"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing_indexes = {idx["name"] for idx in inspector.get_indexes("trainings")}
+    if "ix_trainings_coach_created_id" not in existing_indexes:
+        op.create_index("ix_trainings_coach_created_id", "trainings", ["coach_id", "created_at", "id"], unique=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing_indexes = {idx["name"] for idx in inspector.get_indexes("trainings")}
+    if "ix_trainings_coach_created_id" in existing_indexes:
+        op.drop_index("ix_trainings_coach_created_id", table_name="trainings")
@@ -0,0 +1,91 @@
+"""forum_post_tags association table + backfill from forum_posts.tags JSON
+
+Revision ID: 2d6c8a1f4b93
+Revises: 7f3b9d2e6a14
+Create Date: 2026-10-19 14:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "2d6c8a1f4b93"
+down_revision = "7f3b9d2e6a14"
+branch_labels = None
+depends_on = None
+
+
+forum_posts_table = sa.table(
+    "forum_posts",
+    sa.column("id", sa.Integer()),
+    sa.column("tags", sa.JSON()),
+)
+forum_post_tags_table = sa.table(
+    "forum_post_tags",
+    sa.column("post_id", sa.Integer()),
+    sa.column("tag", sa.String()),
+)
+
+
+def _tag_rows(post_id, tags):
+    # Същата нормализация като forum_service._normalize_tags.
+    if not isinstance(tags, list):
+        return []
+    cleaned = []
+    for tag in tags:
+        t = str(tag or "").strip().lower()
+        if t and t not in cleaned:
+            cleaned.append(t)
+    unique = {t[:100] for t in cleaned[:12]}
+    return [{"post_id": post_id, "tag": t} for t in sorted(unique)]
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if not inspector.has_table("forum_post_tags"):
+        op.create_table(
+            "forum_post_tags",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("post_id", sa.Integer(), nullable=False),
+            sa.Column("tag", sa.String(length=100), nullable=False),
+            sa.ForeignKeyConstraint(["post_id"], ["forum_posts.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("post_id", "tag", name="uq_forum_post_tag"),
+        )
+
+    existing_indexes = {idx["name"] for idx in inspector.get_indexes("forum_post_tags")}
+    if op.f("ix_forum_post_tags_id") not in existing_indexes:
+        op.create_index(op.f("ix_forum_post_tags_id"), "forum_post_tags", ["id"], unique=False)
+    if op.f("ix_forum_post_tags_post_id") not in existing_indexes:
+        op.create_index(op.f("ix_forum_post_tags_post_id"), "forum_post_tags", ["post_id"], unique=False)
+    if "ix_forum_post_tags_tag_post" not in existing_indexes:
+        op.create_index("ix_forum_post_tags_tag_post", "forum_post_tags", ["tag", "post_id"], unique=False)
+
+    # Backfill само ако forum_posts има tags колона и таблицата е празна (идемпотентно).
+    post_cols = {col["name"] for col in inspector.get_columns("forum_posts")}
+    if "tags" not in post_cols:
+        return
+    if bind.execute(sa.select(sa.func.count()).select_from(forum_post_tags_table)).scalar():
+        return
+
+    batch = []
+    for post_id, tags in bind.execute(sa.select(forum_posts_table.c.id, forum_posts_table.c.tags)):
+        batch.extend(_tag_rows(post_id, tags))
+        if len(batch) >= 500:
+            op.bulk_insert(forum_post_tags_table, batch)
+            batch = []
+    if batch:
+        op.bulk_insert(forum_post_tags_table, batch)
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if inspector.has_table("forum_post_tags"):
+        op.drop_index("ix_forum_post_tags_tag_post", table_name="forum_post_tags")
+        op.drop_index(op.f("ix_forum_post_tags_post_id"), table_name="forum_post_tags")
+        op.drop_index(op.f("ix_forum_post_tags_id"), table_name="forum_post_tags")
+        op.drop_table("forum_post_tags")
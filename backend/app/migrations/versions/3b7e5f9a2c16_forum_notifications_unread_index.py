@@ -0,0 +1,41 @@
+"""index for coalescing unread forum notifications per user and topic
+
+Revision ID: 3b7e5f9a2c16
+Revises: 8e5a1c7d3f20
+Create Date: 2026-10-19 16:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3b7e5f9a2c16"
+down_revision = "8e5a1c7d3f20"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("forum_notifications"):
+        return
+    existing_indexes = {idx["name"] for idx in inspector.get_indexes("forum_notifications")}
+    if "ix_forum_notifications_user_post_unread" not in existing_indexes:
+        op.create_index(
+            "ix_forum_notifications_user_post_unread",
+            "forum_notifications",
+            ["user_id", "post_id", "is_read"],
+            unique=False,
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("forum_notifications"):
+        return
+    existing_indexes = {idx["name"] for idx in inspector.get_indexes("forum_notifications")}
+    if "ix_forum_notifications_user_post_unread" in existing_indexes:
+        op.drop_index("ix_forum_notifications_user_post_unread", table_name="forum_notifications")
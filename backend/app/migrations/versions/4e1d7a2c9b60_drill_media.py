@@ -0,0 +1,65 @@
+"""drill media table and drills.has_valid_video
+
+Revision ID: 4e1d7a2c9b60
+Revises: c3a8e4d91b2f
+Create Date: 2026-10-19 09:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "4e1d7a2c9b60"
+down_revision = "c3a8e4d91b2f"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    drill_cols = {col["name"] for col in inspector.get_columns("drills")}
+    if "has_valid_video" not in drill_cols:
+        # NULL = още не е синхронизирано; init_db() попълва при старт.
+        op.add_column("drills", sa.Column("has_valid_video", sa.Boolean(), nullable=True))
+
+    if not inspector.has_table("drill_media"):
+        op.create_table(
+            "drill_media",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("drill_id", sa.Integer(), nullable=False),
+            sa.Column("kind", sa.String(length=20), nullable=False),
+            sa.Column("position", sa.Integer(), nullable=False),
+            sa.Column("url", sa.String(length=1000), nullable=False),
+            sa.Column("provider", sa.String(length=20), nullable=False),
+            sa.Column("is_valid", sa.Boolean(), nullable=False),
+            sa.Column("thumbnail_url", sa.String(length=1000), nullable=True),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=True),
+            sa.ForeignKeyConstraint(["drill_id"], ["drills.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("id"),
+        )
+
+    existing_indexes = {idx["name"] for idx in inspector.get_indexes("drill_media")}
+    if op.f("ix_drill_media_id") not in existing_indexes:
+        op.create_index(op.f("ix_drill_media_id"), "drill_media", ["id"], unique=False)
+    if op.f("ix_drill_media_drill_id") not in existing_indexes:
+        op.create_index(op.f("ix_drill_media_drill_id"), "drill_media", ["drill_id"], unique=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if inspector.has_table("drill_media"):
+        existing_indexes = {idx["name"] for idx in inspector.get_indexes("drill_media")}
+        if op.f("ix_drill_media_drill_id") in existing_indexes:
+            op.drop_index(op.f("ix_drill_media_drill_id"), table_name="drill_media")
+        if op.f("ix_drill_media_id") in existing_indexes:
+            op.drop_index(op.f("ix_drill_media_id"), table_name="drill_media")
+        op.drop_table("drill_media")
+
+    drill_cols = {col["name"] for col in inspector.get_columns("drills")}
+    if "has_valid_video" in drill_cols:
+        with op.batch_alter_table("drills") as batch_op:
+            batch_op.drop_column("has_valid_video")
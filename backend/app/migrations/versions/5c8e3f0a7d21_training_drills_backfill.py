@@ -0,0 +1,119 @@
+"""training_drills table + backfill from trainings.plan JSON
+
+Revision ID: 5c8e3f0a7d21
+Revises: 9b2f6c1e8d47
+Create Date: 2026-10-19 11:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5c8e3f0a7d21"
+down_revision = "9b2f6c1e8d47"
+branch_labels = None
+depends_on = None
+
+
+trainings_table = sa.table(
+    "trainings",
+    sa.column("id", sa.Integer()),
+    sa.column("plan", sa.JSON()),
+)
+drills_table = sa.table("drills", sa.column("id", sa.Integer()))
+training_drills_table = sa.table(
+    "training_drills",
+    sa.column("training_id", sa.Integer()),
+    sa.column("drill_id", sa.Integer()),
+    sa.column("section", sa.String()),
+    sa.column("position", sa.Integer()),
+)
+
+
+def _plan_rows(training_id, plan, drill_ids):
+    rows = []
+    if not isinstance(plan, dict):
+        return rows
+    for section, arr in plan.items():
+        if not section or not isinstance(arr, list):
+            continue
+        seen = set()
+        for raw in arr:
+            try:
+                drill_id = int(raw)
+            except Exception:
+                continue
+            if drill_id in seen or drill_id not in drill_ids:
+                continue
+            seen.add(drill_id)
+            rows.append(
+                {
+                    "training_id": training_id,
+                    "drill_id": drill_id,
+                    "section": str(section)[:50],
+                    "position": len(seen) - 1,
+                }
+            )
+    return rows
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if not inspector.has_table("training_drills"):
+        op.create_table(
+            "training_drills",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("training_id", sa.Integer(), nullable=False),
+            sa.Column("drill_id", sa.Integer(), nullable=False),
+            sa.Column("section", sa.String(length=50), nullable=False),
+            sa.Column("position", sa.Integer(), nullable=False),
+            sa.Column("notes", sa.Text(), nullable=True),
+            sa.Column("duration_min", sa.Integer(), nullable=True),
+            sa.ForeignKeyConstraint(["training_id"], ["trainings.id"], ondelete="CASCADE"),
+            sa.ForeignKeyConstraint(["drill_id"], ["drills.id"]),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("training_id", "drill_id", "section", name="uq_training_drill_section"),
+        )
+
+    existing_indexes = {idx["name"] for idx in inspector.get_indexes("training_drills")}
+    if op.f("ix_training_drills_id") not in existing_indexes:
+        op.create_index(op.f("ix_training_drills_id"), "training_drills", ["id"], unique=False)
+    if op.f("ix_training_drills_training_id") not in existing_indexes:
+        op.create_index(op.f("ix_training_drills_training_id"), "training_drills", ["training_id"], unique=False)
+    if op.f("ix_training_drills_drill_id") not in existing_indexes:
+        op.create_index(op.f("ix_training_drills_drill_id"), "training_drills", ["drill_id"], unique=False)
+    if "ix_training_drills_training_section_pos" not in existing_indexes:
+        op.create_index(
+            "ix_training_drills_training_section_pos",
+            "training_drills",
+            ["training_id", "section", "position"],
+            unique=False,
+        )
+
+    # Backfill само ако trainings има plan колона и индексът е празен (идемпотентно).
+    training_cols = {col["name"] for col in inspector.get_columns("trainings")}
+    if "plan" not in training_cols:
+        return
+    if bind.execute(sa.select(sa.func.count()).select_from(training_drills_table)).scalar():
+        return
+
+    drill_ids = set(bind.execute(sa.select(drills_table.c.id)).scalars())
+    batch = []
+    for training_id, plan in bind.execute(sa.select(trainings_table.c.id, trainings_table.c.plan)):
+        batch.extend(_plan_rows(training_id, plan, drill_ids))
+        if len(batch) >= 500:
+            op.bulk_insert(training_drills_table, batch)
+            batch = []
+    if batch:
+        op.bulk_insert(training_drills_table, batch)
+
+
+def downgrade():
+    # Таблицата е част от модела от самото начало – при downgrade само изчистваме backfill-а.
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if inspector.has_table("training_drills"):
+        op.execute(training_drills_table.delete())
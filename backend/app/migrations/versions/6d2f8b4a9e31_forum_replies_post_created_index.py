@@ -0,0 +1,41 @@
+"""composite index for cursor pagination of topic replies
+
+Revision ID: 6d2f8b4a9e31
+Revises: 3b7e5f9a2c16
+Create Date: 2026-10-19 17:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "6d2f8b4a9e31"
+down_revision = "3b7e5f9a2c16"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("forum_replies"):
+        return
+    existing_indexes = {idx["name"] for idx in inspector.get_indexes("forum_replies")}
+    if "ix_forum_replies_post_created_id" not in existing_indexes:
+        op.create_index(
+            "ix_forum_replies_post_created_id",
+            "forum_replies",
+            ["post_id", "created_at", "id"],
+            unique=False,
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("forum_replies"):
+        return
+    existing_indexes = {idx["name"] for idx in inspector.get_indexes("forum_replies")}
+    if "ix_forum_replies_post_created_id" in existing_indexes:
+        op.drop_index("ix_forum_replies_post_created_id", table_name="forum_replies")
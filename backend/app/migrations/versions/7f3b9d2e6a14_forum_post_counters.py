@@ -0,0 +1,81 @@
+"""denormalized forum_posts counters + last_activity_at, backfill and sort indexes
+
+Revision ID: 7f3b9d2e6a14
+Revises: 1a7d4e9c3f82
+Create Date: 2026-10-19 13:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "7f3b9d2e6a14"
+down_revision = "1a7d4e9c3f82"
+branch_labels = None
+depends_on = None
+
+
+COUNTER_COLUMNS = ("reply_count", "follower_count", "media_count")
+SORT_INDEXES = {
+    "ix_forum_posts_pinned_activity": ["is_pinned", "last_activity_at", "id"],
+    "ix_forum_posts_pinned_created": ["is_pinned", "created_at", "id"],
+    "ix_forum_posts_pinned_replies": ["is_pinned", "reply_count", "last_activity_at"],
+}
+
+BACKFILL_SQL = """
+UPDATE forum_posts SET
+    reply_count = (SELECT COUNT(*) FROM forum_replies r WHERE r.post_id = forum_posts.id),
+    follower_count = (SELECT COUNT(*) FROM forum_post_subscriptions s WHERE s.post_id = forum_posts.id),
+    media_count = (SELECT COUNT(*) FROM forum_post_media m WHERE m.post_id = forum_posts.id),
+    last_activity_at = COALESCE(
+        (SELECT MAX(r.created_at) FROM forum_replies r WHERE r.post_id = forum_posts.id),
+        updated_at,
+        created_at
+    )
+"""
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("forum_posts"):
+        return
+
+    existing_cols = {col["name"] for col in inspector.get_columns("forum_posts")}
+    with op.batch_alter_table("forum_posts") as batch_op:
+        for column in COUNTER_COLUMNS:
+            if column not in existing_cols:
+                batch_op.add_column(sa.Column(column, sa.Integer(), nullable=False, server_default="0"))
+        if "last_activity_at" not in existing_cols:
+            batch_op.add_column(sa.Column("last_activity_at", sa.DateTime(), nullable=True))
+
+    # is_pinned в някои бази идва само от init_db – индексираме каквото реално го има.
+    inspector = sa.inspect(bind)
+    current_cols = {col["name"] for col in inspector.get_columns("forum_posts")}
+    existing_indexes = {idx["name"] for idx in inspector.get_indexes("forum_posts")}
+    for name, columns in SORT_INDEXES.items():
+        if name not in existing_indexes and set(columns) <= current_cols:
+            op.create_index(name, "forum_posts", columns, unique=False)
+
+    # Броячите са производни данни – преизчисляваме ги изцяло (идемпотентно).
+    if all(inspector.has_table(t) for t in ("forum_replies", "forum_post_subscriptions", "forum_post_media")):
+        op.execute(BACKFILL_SQL)
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("forum_posts"):
+        return
+
+    existing_indexes = {idx["name"] for idx in inspector.get_indexes("forum_posts")}
+    for name in SORT_INDEXES:
+        if name in existing_indexes:
+            op.drop_index(name, table_name="forum_posts")
+
+    existing_cols = {col["name"] for col in inspector.get_columns("forum_posts")}
+    with op.batch_alter_table("forum_posts") as batch_op:
+        for column in (*COUNTER_COLUMNS, "last_activity_at"):
+            if column in existing_cols:
+                batch_op.drop_column(column)
@@ -0,0 +1,64 @@
+"""forum full-text search: tsvector + GIN on PostgreSQL, FTS5 + triggers on SQLite
+
+Revision ID: 8e5a1c7d3f20
+Revises: 2d6c8a1f4b93
+Create Date: 2026-10-19 15:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# Схемата живее на едно място с runtime bootstrap-а (init_db за SQLite).
+from app.services.forum_search import (
+    PG_SEARCH_VECTORS,
+    SQLITE_SEARCH_BACKFILL,
+    SQLITE_SEARCH_DDL,
+    SQLITE_SEARCH_TRIGGERS,
+)
+
+
+# revision identifiers, used by Alembic.
+revision = "8e5a1c7d3f20"
+down_revision = "2d6c8a1f4b93"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("forum_posts") or not inspector.has_table("forum_replies"):
+        return
+
+    if bind.dialect.name == "postgresql":
+        for table, expression in PG_SEARCH_VECTORS.items():
+            cols = {col["name"] for col in inspector.get_columns(table)}
+            if "search_vector" not in cols:
+                op.execute(
+                    f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+                    f"GENERATED ALWAYS AS ({expression}) STORED"
+                )
+            op.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector ON {table} USING GIN (search_vector)")
+        return
+
+    if bind.dialect.name == "sqlite":
+        exists = bind.execute(
+            sa.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'forum_search'")
+        ).first()
+        for statement in SQLITE_SEARCH_DDL:
+            op.execute(statement)
+        if not exists:
+            for statement in SQLITE_SEARCH_BACKFILL:
+                op.execute(statement)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        for table in PG_SEARCH_VECTORS:
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_vector")
+            op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
+    elif bind.dialect.name == "sqlite":
+        for trigger in SQLITE_SEARCH_TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS forum_search")
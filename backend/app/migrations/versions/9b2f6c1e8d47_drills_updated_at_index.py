@@ -0,0 +1,32 @@
+"""index on drills.updated_at (catalog version for training details cache)
+
+Revision ID: 9b2f6c1e8d47
+Revises: 4e1d7a2c9b60
+Create Date: 2026-10-19 10:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9b2f6c1e8d47"
+down_revision = "4e1d7a2c9b60"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing_indexes = {idx["name"] for idx in inspector.get_indexes("drills")}
+    if op.f("ix_drills_updated_at") not in existing_indexes:
+        op.create_index(op.f("ix_drills_updated_at"), "drills", ["updated_at"], unique=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing_indexes = {idx["name"] for idx in inspector.get_indexes("drills")}
+    if op.f("ix_drills_updated_at") in existing_indexes:
+        op.drop_index(op.f("ix_drills_updated_at"), table_name="drills")
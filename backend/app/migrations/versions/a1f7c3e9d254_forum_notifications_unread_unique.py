@@ -0,0 +1,62 @@
+"""one unread forum notification per user and topic (partial unique index)
+
+Revision ID: a1f7c3e9d254
+Revises: 0b5e8c2f7a19
+Create Date: 2026-10-20 10:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a1f7c3e9d254"
+down_revision = "0b5e8c2f7a19"
+branch_labels = None
+depends_on = None
+
+
+UNREAD_WHERE = "is_read = false"
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("forum_notifications"):
+        return
+    existing_indexes = {idx["name"] for idx in inspector.get_indexes("forum_notifications")}
+    if "ux_forum_notifications_user_post_unread" in existing_indexes:
+        return
+
+    # Дублираните непрочетени известия (от паралелни fan-out-и) – остава най-новото.
+    op.execute(
+        "DELETE FROM forum_notifications WHERE is_read = false AND id NOT IN ("
+        "SELECT MAX(id) FROM forum_notifications WHERE is_read = false GROUP BY user_id, post_id)"
+    )
+    if "ix_forum_notifications_user_post_unread" in existing_indexes:
+        op.drop_index("ix_forum_notifications_user_post_unread", table_name="forum_notifications")
+    op.create_index(
+        "ux_forum_notifications_user_post_unread",
+        "forum_notifications",
+        ["user_id", "post_id"],
+        unique=True,
+        postgresql_where=sa.text(UNREAD_WHERE),
+        sqlite_where=sa.text(UNREAD_WHERE),
+    )
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("forum_notifications"):
+        return
+    existing_indexes = {idx["name"] for idx in inspector.get_indexes("forum_notifications")}
+    if "ux_forum_notifications_user_post_unread" in existing_indexes:
+        op.drop_index("ux_forum_notifications_user_post_unread", table_name="forum_notifications")
+    if "ix_forum_notifications_user_post_unread" not in existing_indexes:
+        op.create_index(
+            "ix_forum_notifications_user_post_unread",
+            "forum_notifications",
+            ["user_id", "post_id", "is_read"],
+            unique=False,
+        )
@@ -0,0 +1,74 @@
+"""content-addressed media blobs with reference counts
+
+Revision ID: a4c9e2b7d815
+Revises: 6d2f8b4a9e31
+Create Date: 2026-10-19 18:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a4c9e2b7d815"
+down_revision = "6d2f8b4a9e31"
+branch_labels = None
+depends_on = None
+
+MEDIA_TABLES = ("article_media", "forum_post_media")
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if not inspector.has_table("media_blobs"):
+        op.create_table(
+            "media_blobs",
+            sa.Column("sha256", sa.String(length=64), primary_key=True),
+            sa.Column("size", sa.Integer(), nullable=False),
+            sa.Column("mime_type", sa.String(length=255), nullable=False),
+            sa.Column("ref_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+        )
+
+    for table in MEDIA_TABLES:
+        if not inspector.has_table(table):
+            continue
+        columns = {col["name"] for col in inspector.get_columns(table)}
+        if "content_sha256" not in columns:
+            # SQLite не добавя FK през ALTER TABLE – там колоната е без constraint.
+            if bind.dialect.name == "sqlite":
+                column = sa.Column("content_sha256", sa.String(length=64), nullable=True)
+            else:
+                column = sa.Column(
+                    "content_sha256",
+                    sa.String(length=64),
+                    sa.ForeignKey("media_blobs.sha256"),
+                    nullable=True,
+                )
+            op.add_column(table, column)
+        existing_indexes = {idx["name"] for idx in inspector.get_indexes(table)}
+        index_name = f"ix_{table}_content_sha256"
+        if index_name not in existing_indexes:
+            op.create_index(index_name, table, ["content_sha256"], unique=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    for table in MEDIA_TABLES:
+        if not inspector.has_table(table):
+            continue
+        existing_indexes = {idx["name"] for idx in inspector.get_indexes(table)}
+        index_name = f"ix_{table}_content_sha256"
+        if index_name in existing_indexes:
+            op.drop_index(index_name, table_name=table)
+        columns = {col["name"] for col in inspector.get_columns(table)}
+        if "content_sha256" in columns:
+            with op.batch_alter_table(table) as batch_op:
+                batch_op.drop_column("content_sha256")
+
+    if inspector.has_table("media_blobs"):
+        op.drop_table("media_blobs")
@@ -0,0 +1,37 @@
+"""trainings.created_at NOT NULL (keyset cursor of "my trainings")
+
+Revision ID: b3e9d6f1a847
+Revises: a1f7c3e9d254
+Create Date: 2026-10-20 11:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b3e9d6f1a847"
+down_revision = "a1f7c3e9d254"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("trainings"):
+        return
+    op.execute(
+        "UPDATE trainings SET created_at = COALESCE(updated_at, CURRENT_TIMESTAMP) WHERE created_at IS NULL"
+    )
+    with op.batch_alter_table("trainings") as batch_op:
+        batch_op.alter_column("created_at", existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("trainings"):
+        return
+    with op.batch_alter_table("trainings") as batch_op:
+        batch_op.alter_column("created_at", existing_type=sa.DateTime(), nullable=True)
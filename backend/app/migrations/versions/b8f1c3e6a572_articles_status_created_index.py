@@ -0,0 +1,41 @@
+"""composite index for cursor pagination of the public article feed
+
+Revision ID: b8f1c3e6a572
+Revises: e7b3d5a1c946
+Create Date: 2026-10-19 19:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b8f1c3e6a572"
+down_revision = "e7b3d5a1c946"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("articles"):
+        return
+    existing_indexes = {idx["name"] for idx in inspector.get_indexes("articles")}
+    if "ix_articles_status_created_id" not in existing_indexes:
+        op.create_index(
+            "ix_articles_status_created_id",
+            "articles",
+            ["status", "created_at", "id"],
+            unique=False,
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("articles"):
+        return
+    existing_indexes = {idx["name"] for idx in inspector.get_indexes("articles")}
+    if "ix_articles_status_created_id" in existing_indexes:
+        op.drop_index("ix_articles_status_created_id", table_name="articles")
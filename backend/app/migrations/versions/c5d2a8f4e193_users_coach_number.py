@@ -0,0 +1,48 @@
+"""persisted coach ordinal per club
+
+Revision ID: c5d2a8f4e193
+Revises: b8f1c3e6a572
+Create Date: 2026-10-19 19:30:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c5d2a8f4e193"
+down_revision = "b8f1c3e6a572"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("users"):
+        return
+    columns = {col["name"] for col in inspector.get_columns("users")}
+    if "coach_number" not in columns:
+        op.add_column("users", sa.Column("coach_number", sa.Integer(), nullable=True))
+
+    # Поредност по id сред треньорите на клуба – същото, което се смяташе при всяка заявка.
+    op.execute(
+        """
+        UPDATE users SET coach_number = (
+            SELECT COUNT(*) FROM users AS other
+            WHERE other.role = 'coach' AND other.club_id = users.club_id AND other.id <= users.id
+        )
+        WHERE role = 'coach' AND club_id IS NOT NULL
+        """
+    )
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("users"):
+        return
+    columns = {col["name"] for col in inspector.get_columns("users")}
+    if "coach_number" in columns:
+        with op.batch_alter_table("users") as batch_op:
+            batch_op.drop_column("coach_number")
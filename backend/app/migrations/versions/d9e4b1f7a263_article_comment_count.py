@@ -0,0 +1,57 @@
+"""articles.comment_count counter and article_comments keyset index
+
+Revision ID: d9e4b1f7a263
+Revises: f2a6c9d3b758
+Create Date: 2026-10-19 21:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d9e4b1f7a263"
+down_revision = "f2a6c9d3b758"
+branch_labels = None
+depends_on = None
+
+COMMENTS_INDEX = "ix_article_comments_article_created_id"
+BACKFILL_SQL = """
+UPDATE articles SET
+    comment_count = (SELECT COUNT(*) FROM article_comments c WHERE c.article_id = articles.id)
+"""
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("articles"):
+        return
+
+    columns = {col["name"] for col in inspector.get_columns("articles")}
+    if "comment_count" not in columns:
+        with op.batch_alter_table("articles") as batch_op:
+            batch_op.add_column(sa.Column("comment_count", sa.Integer(), nullable=False, server_default="0"))
+
+    if inspector.has_table("article_comments"):
+        existing_indexes = {idx["name"] for idx in inspector.get_indexes("article_comments")}
+        if COMMENTS_INDEX not in existing_indexes:
+            op.create_index(COMMENTS_INDEX, "article_comments", ["article_id", "created_at", "id"], unique=False)
+        # Броячът е производен – преизчисляваме го изцяло (идемпотентно).
+        op.execute(BACKFILL_SQL)
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if inspector.has_table("article_comments"):
+        existing_indexes = {idx["name"] for idx in inspector.get_indexes("article_comments")}
+        if COMMENTS_INDEX in existing_indexes:
+            op.drop_index(COMMENTS_INDEX, table_name="article_comments")
+
+    if not inspector.has_table("articles"):
+        return
+    columns = {col["name"] for col in inspector.get_columns("articles")}
+    if "comment_count" in columns:
+        with op.batch_alter_table("articles") as batch_op:
+            batch_op.drop_column("comment_count")
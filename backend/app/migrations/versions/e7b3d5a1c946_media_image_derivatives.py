@@ -0,0 +1,44 @@
+"""image derivatives and placeholders on article/forum media
+
+Revision ID: e7b3d5a1c946
+Revises: a4c9e2b7d815
+Create Date: 2026-10-19 18:30:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e7b3d5a1c946"
+down_revision = "a4c9e2b7d815"
+branch_labels = None
+depends_on = None
+
+MEDIA_TABLES = ("article_media", "forum_post_media")
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    for table in MEDIA_TABLES:
+        if not inspector.has_table(table):
+            continue
+        columns = {col["name"] for col in inspector.get_columns(table)}
+        if "derivatives" not in columns:
+            op.add_column(table, sa.Column("derivatives", sa.JSON(), nullable=True))
+        if "placeholder" not in columns:
+            op.add_column(table, sa.Column("placeholder", sa.Text(), nullable=True))
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    for table in MEDIA_TABLES:
+        if not inspector.has_table(table):
+            continue
+        columns = {col["name"] for col in inspector.get_columns(table)}
+        with op.batch_alter_table(table) as batch_op:
+            for column in ("placeholder", "derivatives"):
+                if column in columns:
+                    batch_op.drop_column(column)
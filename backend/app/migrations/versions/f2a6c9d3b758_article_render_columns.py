@@ -0,0 +1,49 @@
+"""stored article render: sanitized html, toc, excerpt, reading time
+
+Revision ID: f2a6c9d3b758
+Revises: c5d2a8f4e193
+Create Date: 2026-10-19 20:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f2a6c9d3b758"
+down_revision = "c5d2a8f4e193"
+branch_labels = None
+depends_on = None
+
+# Самият рендер се пуска от init_db (backfill_article_renders) – тук са само колоните.
+RENDER_COLUMNS = (
+    ("content_html", sa.Text()),
+    ("toc", sa.JSON()),
+    ("plain_excerpt", sa.Text()),
+    ("word_count", sa.Integer()),
+    ("reading_minutes", sa.Integer()),
+    ("render_version", sa.Integer()),
+)
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("articles"):
+        return
+    columns = {col["name"] for col in inspector.get_columns("articles")}
+    for name, column_type in RENDER_COLUMNS:
+        if name not in columns:
+            op.add_column("articles", sa.Column(name, column_type, nullable=True))
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("articles"):
+        return
+    columns = {col["name"] for col in inspector.get_columns("articles")}
+    with op.batch_alter_table("articles") as batch_op:
+        for name, _ in reversed(RENDER_COLUMNS):
+            if name in columns:
+                batch_op.drop_column(name)
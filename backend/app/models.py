@@ -17,6 +17,7 @@ from sqlalchemy import (
     Index,
     Boolean,
     Float,
+    text,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -99,6 +100,8 @@ class User(Base):
     role = Column(SqlEnum(UserRole), nullable=False)
 
     club_id = Column(Integer, ForeignKey("clubs.id"), nullable=True)
+    # "Треньор №N" в клуба – поддържа се от coach_service.renumber_club_coaches
+    coach_number = Column(Integer, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     club = relationship("Club", back_populates="users")
@@ -175,15 +178,42 @@ class Drill(Base):
     image_urls = Column(JSON)
     video_urls = Column(JSON)
 
+    # Материализирано от DrillMedia (services/drill_media_service.py); NULL = още не е синхронизирано
+    has_valid_video = Column(Boolean, nullable=True)
+
     created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     status = Column(String, default="pending")
     rejection_reason = Column(Text)
 
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # index: max(updated_at) е "версията на каталога" за кеша на /trainings/{id}/details
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     creator = relationship("User", foreign_keys=[created_by])
     training_items = relationship("TrainingDrill", back_populates="drill")
+    media = relationship(
+        "DrillMedia",
+        back_populates="drill",
+        cascade="all, delete-orphan",
+        order_by="DrillMedia.kind, DrillMedia.position",
+    )
+
+
+class DrillMedia(Base):
+    __tablename__ = "drill_media"
+
+    id = Column(Integer, primary_key=True, index=True)
+    drill_id = Column(Integer, ForeignKey("drills.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    kind = Column(String(20), nullable=False)  # image | video
+    position = Column(Integer, nullable=False, default=0)
+    url = Column(String(1000), nullable=False)
+    provider = Column(String(20), nullable=False, default="other")  # youtube | local | other
+    is_valid = Column(Boolean, nullable=False, default=False)
+    thumbnail_url = Column(String(1000), nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+
+    drill = relationship("Drill", back_populates="media")
 
 
 # =========================
@@ -242,7 +272,9 @@ class Training(Base):
     score_summary = Column(JSON, nullable=True)
     selected_drill_ids = Column(JSON, nullable=True)
 
-    created_at = Column(DateTime, server_default=func.now())
+    # default= освен server_default: така и SQLite пази микросекунди, което keyset cursor-ите изискват.
+    # NOT NULL – cursor-ът е (created_at, id) и празна дата не може да се подреди/декодира.
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
     coach = relationship("User", back_populates="trainings", foreign_keys=[coach_id])
@@ -255,6 +287,45 @@ class Training(Base):
         order_by="TrainingDrill.section, TrainingDrill.position",
     )
 
+    __table_args__ = (
+        # keyset пагинация на "моите тренировки": WHERE coach_id ORDER BY created_at, id
+        Index("ix_trainings_coach_created_id", "coach_id", "created_at", "id"),
+    )
+
+
+# =========================
+# Refresh tokens
+# =========================
+class RefreshToken(Base):
+    """
+    Издаден refresh токен (пази се само SHA-256 на opaque стойността). Всяко /auth/refresh
+    го отменя и издава нов в същото family; повторна употреба на отменен токен
+    отменя цялото family.
+    """
+
+    __tablename__ = "refresh_tokens"
+
+    token_hash = Column(String(64), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    family_id = Column(String(32), nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
+
+
+# =========================
+# Media storage
+# =========================
+class MediaBlob(Base):
+    """Съдържание на качен файл, адресирано по SHA-256; ref_count = брой media редове към него."""
+
+    __tablename__ = "media_blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(Integer, nullable=False)
+    mime_type = Column(String(255), nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, server_default=func.now())
+
 
 # =========================
 # Articles
@@ -272,7 +343,17 @@ class Article(Base):
     approved_at = Column(DateTime, nullable=True)
     reject_reason = Column(Text, nullable=True)
     needs_edit_comment = Column(Text, nullable=True)
-    created_at = Column(DateTime, server_default=func.now())
+    # Резултат от article_render (пресмята се при create/update/approve, не при четене)
+    content_html = Column(Text, nullable=True)
+    toc = Column(JSON, nullable=True)
+    plain_excerpt = Column(Text, nullable=True)
+    word_count = Column(Integer, nullable=True)
+    reading_minutes = Column(Integer, nullable=True)
+    render_version = Column(Integer, nullable=True)
+    # Поддържа се от create/delete на коментар – картите не броят коментарите с заявка
+    comment_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # default от Python: микросекунди за стабилна keyset пагинация и в SQLite
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
     author = relationship("User", back_populates="authored_articles", foreign_keys=[author_id])
@@ -294,6 +375,11 @@ class Article(Base):
         order_by="ArticleComment.created_at",
     )
 
+    __table_args__ = (
+        # публичната лента: WHERE status = APPROVED ORDER BY created_at, id
+        Index("ix_articles_status_created_id", "status", "created_at", "id"),
+    )
+
 
 class ArticleMedia(Base):
     __tablename__ = "article_media"
@@ -305,6 +391,11 @@ class ArticleMedia(Base):
     name = Column(String(255), nullable=False)
     mime_type = Column(String(255), nullable=False)
     size = Column(Integer, nullable=False)
+    # NULL за стари файлове под /static/uploads
+    content_sha256 = Column(String(64), ForeignKey("media_blobs.sha256"), nullable=True, index=True)
+    # [{width, height, url, sha256, mime_type, size}] – попълва се от image_derivatives
+    derivatives = Column(JSON, nullable=True)
+    placeholder = Column(Text, nullable=True)
     created_at = Column(DateTime, server_default=func.now())
 
     article = relationship("Article", back_populates="media_items")
@@ -328,9 +419,14 @@ class ArticleComment(Base):
     article_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), nullable=False, index=True)
     author_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     content = Column(Text, nullable=False)
-    created_at = Column(DateTime, server_default=func.now())
+    # default= за микросекунди и в SQLite – коментарите се страницират по (created_at, id)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        Index("ix_article_comments_article_created_id", "article_id", "created_at", "id"),
+    )
+
     article = relationship("Article", back_populates="comments")
     author = relationship("User", back_populates="article_comments", foreign_keys=[author_id])
 
@@ -352,6 +448,18 @@ class ForumPost(Base):
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
+    # Денормализирани броячи – поддържат се от forum_service при всяка промяна.
+    reply_count = Column(Integer, nullable=False, default=0, server_default="0")
+    follower_count = Column(Integer, nullable=False, default=0, server_default="0")
+    media_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_activity_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_forum_posts_pinned_activity", "is_pinned", "last_activity_at", "id"),
+        Index("ix_forum_posts_pinned_created", "is_pinned", "created_at", "id"),
+        Index("ix_forum_posts_pinned_replies", "is_pinned", "reply_count", "last_activity_at"),
+    )
+
     author = relationship("User")
     media_items = relationship(
         "ForumPostMedia",
@@ -363,6 +471,27 @@ class ForumPost(Base):
         back_populates="post",
         cascade="all, delete-orphan",
     )
+    # Нормализиран индекс на tags (JSON остава за показване); поддържа се от forum_service.
+    tag_items = relationship(
+        "ForumPostTag",
+        back_populates="post",
+        cascade="all, delete-orphan",
+    )
+
+
+class ForumPostTag(Base):
+    __tablename__ = "forum_post_tags"
+
+    id = Column(Integer, primary_key=True, index=True)
+    post_id = Column(Integer, ForeignKey("forum_posts.id", ondelete="CASCADE"), nullable=False, index=True)
+    tag = Column(String(100), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("post_id", "tag", name="uq_forum_post_tag"),
+        Index("ix_forum_post_tags_tag_post", "tag", "post_id"),
+    )
+
+    post = relationship("ForumPost", back_populates="tag_items")
 
 
 class ForumReply(Base):
@@ -372,9 +501,14 @@ class ForumReply(Base):
     post_id = Column(Integer, ForeignKey("forum_posts.id"), nullable=False)
     content = Column(Text, nullable=False)
     author_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    created_at = Column(DateTime, server_default=func.now())
+    # default= за микросекунди и в SQLite – отговорите се страницират по (created_at, id)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        Index("ix_forum_replies_post_created_id", "post_id", "created_at", "id"),
+    )
+
     post = relationship("ForumPost", back_populates="replies")
     author = relationship("User")
 
@@ -388,6 +522,11 @@ class ForumPostMedia(Base):
     name = Column(String(255), nullable=False)
     mime_type = Column(String(255), nullable=False)
     size = Column(Integer, nullable=False)
+    # NULL за стари файлове под /static/uploads
+    content_sha256 = Column(String(64), ForeignKey("media_blobs.sha256"), nullable=True, index=True)
+    # [{width, height, url, sha256, mime_type, size}] – попълва се от image_derivatives
+    derivatives = Column(JSON, nullable=True)
+    placeholder = Column(Text, nullable=True)
     created_at = Column(DateTime, server_default=func.now())
 
     post = relationship("ForumPost", back_populates="media_items")
@@ -420,6 +559,19 @@ class ForumNotification(Base):
     is_read = Column(Boolean, nullable=False, default=False)
     created_at = Column(DateTime, server_default=func.now())
 
+    __table_args__ = (
+        # Най-много едно непрочетено известие за (потребител, тема) – обединяването е
+        # INSERT ... ON CONFLICT срещу този частичен индекс.
+        Index(
+            "ux_forum_notifications_user_post_unread",
+            "user_id",
+            "post_id",
+            unique=True,
+            postgresql_where=text("is_read = false"),
+            sqlite_where=text("is_read = false"),
+        ),
+    )
+
     user = relationship("User")
     post = relationship("ForumPost")
     reply = relationship("ForumReply")
@@ -0,0 +1,32 @@
+import base64
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(created_at: datetime | None, row_id: int) -> str:
+    """(created_at, id) -> непрозрачен cursor за keyset пагинация."""
+    stamp = created_at.isoformat() if created_at else ""
+    raw = f"{stamp}|{int(row_id)}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        stamp, row_id = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8").split("|", 1)
+        return datetime.fromisoformat(stamp), int(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_filter(created_col, id_col, cursor: str, descending: bool = True):
+    """
+    WHERE условие за "след cursor-а" при ORDER BY (created_at, id) в дадената посока.
+    Изисква индекс (…, created_at, id), за да е константно по цена.
+    """
+    created_at, row_id = decode_cursor(cursor)
+    if descending:
+        return or_(created_col < created_at, and_(created_col == created_at, id_col < row_id))
+    return or_(created_col > created_at, and_(created_col == created_at, id_col > row_id))
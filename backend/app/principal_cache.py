@@ -0,0 +1,108 @@
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.cache import LRUCache
+from app.models import Club, User, UserRole
+from app.settings import settings
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Текущият потребител за auth зависимостите – само полетата, които handler-ите четат.
+    Не е ORM обект: не се пипа през сесията и може да се кешира между заявките.
+    """
+
+    id: int
+    email: str
+    name: str
+    role: UserRole
+    club_id: Optional[int]
+    club_active: bool = True
+
+
+class PrincipalCache:
+    """
+    Principal по user_id за settings.principal_cache_ttl_seconds. Промените по треньори и
+    клубове го чистят изрично; TTL-ът ограничава остаряването в другите worker-и.
+    """
+
+    def __init__(self, ttl_seconds: float, maxsize: int = 4096):
+        self.ttl_seconds = ttl_seconds
+        self._entries = LRUCache(maxsize=maxsize)
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if expires_at < time.monotonic():
+            return None
+        return principal
+
+    def set(self, principal: Principal) -> None:
+        if self.ttl_seconds > 0:
+            self._entries.set(principal.id, (time.monotonic() + self.ttl_seconds, principal))
+
+    def invalidate(self, user_id: int) -> None:
+        self._entries.pop(user_id)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+principal_cache = PrincipalCache(ttl_seconds=settings.principal_cache_ttl_seconds)
+
+
+def _principal_stmt(user_id: int):
+    # Потребителят и is_active на клуба му с една заявка
+    return (
+        select(User.id, User.email, User.name, User.role, User.club_id, Club.is_active)
+        .outerjoin(Club, Club.id == User.club_id)
+        .where(User.id == user_id)
+    )
+
+
+def _cache_principal(row) -> Optional[Principal]:
+    if row is None:
+        return None
+    principal = Principal(
+        id=row.id,
+        email=row.email,
+        name=row.name,
+        role=row.role,
+        club_id=row.club_id,
+        club_active=row.is_active is not False,
+    )
+    principal_cache.set(principal)
+    return principal
+
+
+def load_principal(db: Session, user_id: int) -> Optional[Principal]:
+    """От кеша или с една заявка през сесията на sync handler-а."""
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+    return _cache_principal(db.execute(_principal_stmt(user_id)).first())
+
+
+async def load_principal_async(db: AsyncSession, user_id: int) -> Optional[Principal]:
+    """Същото през AsyncSession – за async handler-ите и push канала."""
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+    return _cache_principal((await db.execute(_principal_stmt(user_id))).first())
+
+
+def invalidate_principal(user_id: int) -> None:
+    principal_cache.invalidate(user_id)
+
+
+def invalidate_club_principals() -> None:
+    # Смяна на достъпа на клуб е рядка – по-просто е да изчистим всички.
+    principal_cache.clear()
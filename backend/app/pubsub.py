@@ -0,0 +1,160 @@
+import asyncio
+import json
+from collections import defaultdict
+from threading import Lock
+from typing import Any, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from app.settings import settings
+
+
+class Subscription:
+    """Абонамент за един канал – asyncio опашка на event loop-а, който го е създал."""
+
+    def __init__(self, broker: "InMemoryBroker", channel: str, max_queue: int):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+
+    def _deliver(self, message: Any) -> None:
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Бавен клиент – изпускаме, вместо да трупаме памет; следващото събитие носи актуалния брой.
+            pass
+
+    async def get(self) -> Any:
+        return await self.queue.get()
+
+    def close(self) -> None:
+        self.broker._unsubscribe(self)
+
+
+class InMemoryBroker:
+    """
+    Pub/sub в рамките на един процес. publish е thread-safe – вика се от sync handler-и
+    и background task-ове в threadpool-а. При няколко worker-а се сменя с broker със същия
+    интерфейс (publish/subscribe/channels) чрез settings.pubsub_backend – напр. PostgresBroker.
+    """
+
+    def __init__(self, max_queue: int = 100):
+        self.max_queue = max_queue
+        self._subscribers: dict[str, set[Subscription]] = defaultdict(set)
+        self._lock = Lock()
+
+    def subscribe(self, channel: str) -> Subscription:
+        """Трябва да се вика от event loop-а (напр. в WebSocket handler)."""
+        subscription = Subscription(self, channel, self.max_queue)
+        with self._lock:
+            self._subscribers[channel].add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.channel]
+
+    def publish(self, channel: str, message: Any) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._deliver, message)
+            except RuntimeError:
+                # Loop-ът вече е затворен – абонатът изчезва при следващия close().
+                pass
+
+    def channels(self, prefix: str = "") -> Optional[set[str]]:
+        with self._lock:
+            return {channel for channel in self._subscribers if channel.startswith(prefix)}
+
+
+class PostgresBroker:
+    """
+    Pub/sub между worker-ите през PostgreSQL LISTEN/NOTIFY. publish праща NOTIFY през
+    sync engine-а (вика се от threadpool-а, както при InMemoryBroker); всеки worker държи
+    една LISTEN връзка и разнася съобщенията до локалните си абонати.
+    Съобщение, пратено докато LISTEN връзката се възстановява, се губи – следващото носи
+    актуалния брой непрочетени.
+    """
+
+    NOTIFY_CHANNEL = "volley_pubsub"
+
+    def __init__(self, database_url: str, max_queue: int = 100):
+        # psycopg (libpq) приема само "postgresql://", без SQLAlchemy драйвера
+        self._conninfo = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self._local = InMemoryBroker(max_queue=max_queue)
+        self._listener: Optional[asyncio.Task] = None
+        self._lock = Lock()
+
+    def subscribe(self, channel: str) -> Subscription:
+        """Трябва да се вика от event loop-а; при първия абонат пуска LISTEN задачата."""
+        subscription = self._local.subscribe(channel)
+        with self._lock:
+            if self._listener is None or self._listener.done():
+                self._listener = subscription.loop.create_task(self._listen())
+        return subscription
+
+    def publish(self, channel: str, message: Any) -> None:
+        from app.database import engine
+
+        payload = json.dumps({"channel": channel, "message": message}, default=str)
+        with engine.begin() as conn:
+            conn.execute(text("SELECT pg_notify(:name, :payload)"), {"name": self.NOTIFY_CHANNEL, "payload": payload})
+
+    def channels(self, prefix: str = "") -> Optional[set[str]]:
+        # Абонатите на другите worker-и не се виждат оттук.
+        return None
+
+    def _dispatch(self, payload: str) -> None:
+        try:
+            data = json.loads(payload)
+            channel, message = data["channel"], data["message"]
+        except (ValueError, KeyError, TypeError):
+            return
+        self._local.publish(channel, message)
+
+    async def _listen(self) -> None:
+        import psycopg
+
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(self._conninfo, autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {self.NOTIFY_CHANNEL}")
+                    async for notify in conn.notifies():
+                        self._dispatch(notify.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ pubsub LISTEN connection lost: {e}")
+                await asyncio.sleep(1)
+
+
+def _create_broker():
+    if settings.pubsub_backend == "memory":
+        return InMemoryBroker()
+    if settings.pubsub_backend == "postgres":
+        return PostgresBroker(settings.database_url)
+    raise ValueError(f"Unsupported pubsub backend: {settings.pubsub_backend}")
+
+
+broker = _create_broker()
+
+
+def user_channel(user_id: int) -> str:
+    return f"user:{int(user_id)}"
+
+
+def connected_user_ids() -> Optional[set[int]]:
+    """Свързаните потребители; None – брокерът не ги знае (няколко worker-а), пращаме на всички."""
+    channels = broker.channels("user:")
+    if channels is None:
+        return None
+    return {int(channel.split(":", 1)[1]) for channel in channels}
@@ -0,0 +1,88 @@
+import time
+from collections import defaultdict
+from threading import Lock
+from typing import Hashable
+
+from fastapi import Response
+
+from app.cache import LRUCache
+from app.settings import settings
+
+
+class InMemoryResponseCache:
+    """
+    Кеш на готови JSON отговори (bytes) за публично съдържание.
+
+    Всеки запис зависи от един или няколко scope-а (напр. "articles:feed", "article:5");
+    ключът съдържа текущата им версия. invalidate(scope) само вдига версията, така че
+    всички зависими записи стават недостъпни наведнъж и изпадат от LRU-то.
+    ttl_seconds е предпазна мрежа за пропусната инвалидация – записът изтича и сам.
+    При няколко worker-а се сменя с backend със същия интерфейс чрез
+    settings.response_cache_backend.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl_seconds: float = 300):
+        self.ttl_seconds = ttl_seconds
+        self._entries = LRUCache(maxsize=maxsize)
+        self._versions: dict[str, int] = defaultdict(int)
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def key(self, name: Hashable, *scopes: str) -> tuple:
+        """Версиите се четат тук – set() с този ключ след invalidate() не връща стари данни."""
+        with self._lock:
+            return (name, tuple((scope, self._versions[scope]) for scope in scopes))
+
+    def get(self, key: tuple) -> bytes | None:
+        entry = self._entries.get(key)
+        body = None
+        if entry is not None and entry[0] >= time.monotonic():
+            body = entry[1]
+        with self._lock:
+            if body is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return body
+
+    def set(self, key: tuple, body: bytes) -> None:
+        if self.ttl_seconds > 0:
+            self._entries.set(key, (time.monotonic() + self.ttl_seconds, body))
+
+    def invalidate(self, *scopes: str) -> None:
+        with self._lock:
+            for scope in scopes:
+                self._versions[scope] += 1
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "max_entries": self._entries.maxsize,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+def _create_response_cache():
+    if settings.response_cache_backend == "memory":
+        return InMemoryResponseCache(
+            maxsize=settings.response_cache_size, ttl_seconds=settings.response_cache_ttl_seconds
+        )
+    raise ValueError(f"Unsupported response cache backend: {settings.response_cache_backend}")
+
+
+response_cache = _create_response_cache()
+
+
+def json_response(body: bytes) -> Response:
+    # Готов JSON – FastAPI не го валидира и сериализира повторно.
+    return Response(content=body, media_type="application/json")
@@ -10,6 +10,7 @@ from ..database import get_db
 from ..dependencies.roles import require_role
 from ..models import Drill, Training, TrainingSource, TrainingStatus, User, UserRole
 from ..services.bulgarian_training_generator import BLOCK_TO_PLAN_KEY, generate_training_session
+from ..services.training_service import recent_drill_ids_by_session, sync_training_drills
 
 
 router = APIRouter(prefix="/api/ai/training", tags=["AI Training"])
@@ -46,25 +47,8 @@ class GenerateAndSaveRequest(GenerateRequest):
 
 
 def _recent_drill_ids_for_user(db: Session, user: User, limit_sessions: int = 3) -> List[List[int]]:
-    recent_trainings = (
-        db.query(Training)
-        .filter(Training.coach_id == user.id)
-        .order_by(Training.created_at.desc(), Training.id.desc())
-        .limit(limit_sessions)
-        .all()
-    )
-    grouped: List[List[int]] = []
-    for training in recent_trainings:
-        ids: List[int] = []
-        selected = training.selected_drill_ids or []
-        if isinstance(selected, list):
-            for raw in selected:
-                try:
-                    ids.append(int(raw))
-                except Exception:
-                    continue
-        grouped.append(ids)
-    return grouped
+    # От training_drills (индекс по training_id), а не от JSON-а на всяка тренировка.
+    return recent_drill_ids_by_session(db, user.id, limit_sessions=limit_sessions)
 
 
 @router.post("/generate")
@@ -152,6 +136,7 @@ def generate_and_save_ai_training(
         selected_drill_ids=selected_drill_ids,
     )
     db.add(training)
+    sync_training_drills(db, training)
     db.commit()
     db.refresh(training)
 
@@ -1,16 +1,17 @@
 from pathlib import Path
 from typing import Optional
-from uuid import uuid4
 
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.dependencies.auth import get_current_user
+from app.database import get_async_db, get_db
+from app.dependencies.auth import get_current_user_async
 from app.dependencies.roles import require_role
 from app.models import ArticleMedia, ArticleMediaType, ArticleStatus, User, UserRole
 from app.schemas.article import (
     ArticleCommentCreate,
+    ArticleCommentPageResponse,
     ArticleCommentResponse,
     ArticleCommentUpdate,
     ArticleCreate,
@@ -19,6 +20,7 @@ from app.schemas.article import (
     ArticleListResponse,
     ArticleMediaResponse,
     ArticleModerationAction,
+    ArticlePageResponse,
     ArticleResponse,
     ArticleUpdate,
 )
@@ -33,14 +35,23 @@ from app.services.article_service import (
     create_article,
     delete_article_link,
     delete_article_media,
-    get_article_by_id,
     get_article_comments,
     get_articles,
+    invalidate_public_article,
+    list_approved_articles,
+    load_article_status,
+    public_article_key,
+    public_comments_key,
+    public_feed_key,
+    read_article,
     update_article_comment,
     needs_edit_article,
     reject_article,
     update_article,
 )
+from app.response_cache import json_response, response_cache
+from app.services.image_derivatives import generate_image_derivatives, needs_derivatives
+from app.services.upload_service import mime_type_for, sanitize_filename, stage_upload
 
 router = APIRouter()
 
@@ -58,10 +69,6 @@ ALLOWED_FILE_MIME_TYPES = {
 }
 
 
-def _sanitize_filename(name: str) -> str:
-    return Path(name).name.replace(" ", "_")
-
-
 def _detect_media_type(file_name: str, mime_type: str) -> ArticleMediaType:
     extension = Path(file_name).suffix.lower()
     if extension in ALLOWED_IMAGE_EXTENSIONS and mime_type in ALLOWED_IMAGE_MIME_TYPES:
@@ -71,41 +78,39 @@ def _detect_media_type(file_name: str, mime_type: str) -> ArticleMediaType:
     raise HTTPException(status_code=400, detail="Unsupported file type")
 
 
-def _save_upload(article_id: int, upload: UploadFile) -> tuple[str, str, str, int, ArticleMediaType]:
-    safe_name = _sanitize_filename(upload.filename or "file")
-    mime_type = upload.content_type or "application/octet-stream"
-    media_type = _detect_media_type(safe_name, mime_type)
-
-    content = upload.file.read()
-    size = len(content)
-    if size > MAX_FILE_SIZE:
-        raise HTTPException(status_code=400, detail="File size exceeds 50MB limit")
-
-    file_name = f"{uuid4().hex}_{safe_name}"
-    storage_dir = Path(__file__).resolve().parents[1] / "static" / "uploads" / "articles" / str(article_id)
-    storage_dir.mkdir(parents=True, exist_ok=True)
-    file_path = storage_dir / file_name
-    file_path.write_bytes(content)
-
-    public_url = f"/static/uploads/articles/{article_id}/{file_name}"
-    return public_url, safe_name, mime_type, size, media_type
-
-
-@router.get("/articles", response_model=list[ArticleListResponse])
-def list_articles(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+@router.get("/articles", response_model=ArticlePageResponse)
+async def list_articles(
+    cursor: Optional[str] = Query(default=None),
+    limit: int = Query(default=20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    return get_articles(db, current_user, admin_view=False)
+    key = public_feed_key(cursor, limit)
+    body = response_cache.get(key)
+    if body is None:
+        items, next_cursor = await list_approved_articles(db, cursor=cursor, limit=limit)
+        body = ArticlePageResponse(items=items, next_cursor=next_cursor).model_dump_json().encode("utf-8")
+        response_cache.set(key, body)
+    return json_response(body)
 
 
 @router.get("/articles/{article_id}", response_model=ArticleResponse)
-def article_details(
+async def article_details(
     article_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    return get_article_by_id(db, article_id, current_user)
+    key = public_article_key(article_id)
+    body = response_cache.get(key)
+    if body is not None:
+        return json_response(body)
+
+    article = await read_article(db, article_id, current_user)
+    if article.status != ArticleStatus.APPROVED:
+        return article
+    body = ArticleResponse.model_validate(article).model_dump_json().encode("utf-8")
+    response_cache.set(key, body)
+    return json_response(body)
 
 
 @router.post("/articles", response_model=ArticleResponse, status_code=status.HTTP_201_CREATED)
@@ -130,21 +135,24 @@ def update_article_endpoint(
 @router.post("/articles/{article_id}/media", response_model=ArticleMediaResponse, status_code=status.HTTP_201_CREATED)
 def upload_article_media(
     article_id: int,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role(UserRole.coach)),
 ):
-    url, name, mime_type, size_bytes, media_type = _save_upload(article_id, file)
-    return add_article_media(
-        db=db,
-        article_id=article_id,
-        user=current_user,
-        media_type=media_type,
-        url=url,
-        name=name,
-        mime_type=mime_type,
-        size=size_bytes,
-    )
+    file_name = sanitize_filename(file.filename)
+    media_type = _detect_media_type(file_name, mime_type_for(file_name))
+    staged = stage_upload(file, max_size=MAX_FILE_SIZE)
+    try:
+        media = add_article_media(db=db, article_id=article_id, user=current_user, media_type=media_type, staged=staged)
+    finally:
+        # Ако статията липсва / не е на потребителя, временният файл не остава.
+        staged.discard()
+    if media.type == ArticleMediaType.IMAGE and needs_derivatives(media):
+        background_tasks.add_task(generate_image_derivatives, ArticleMedia, media.id)
+        # Задачите вървят последователно – ако статията вече е одобрена, кешът вижда производните.
+        background_tasks.add_task(invalidate_public_article, article_id)
+    return media
 
 
 @router.delete("/articles/{article_id}/media/{media_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -154,12 +162,6 @@ def remove_article_media(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role(UserRole.coach)),
 ):
-    media = db.query(ArticleMedia).filter(ArticleMedia.id == media_id, ArticleMedia.article_id == article_id).first()
-    if media and media.url.startswith("/static/"):
-        local_path = Path(__file__).resolve().parents[1] / media.url.lstrip("/")
-        if local_path.exists():
-            local_path.unlink()
-
     delete_article_media(db, article_id, media_id, current_user)
     return None
 
@@ -174,13 +176,27 @@ def create_article_link_endpoint(
     return add_article_link(db, article_id, current_user, payload)
 
 
-@router.get("/articles/{article_id}/comments", response_model=list[ArticleCommentResponse])
-def list_article_comments(
+@router.get("/articles/{article_id}/comments", response_model=ArticleCommentPageResponse)
+async def list_article_comments(
     article_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    cursor: Optional[str] = Query(default=None),
+    limit: int = Query(default=20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    return get_article_comments(db, article_id, current_user)
+    key = public_comments_key(article_id, cursor, limit)
+    body = response_cache.get(key)
+    if body is not None:
+        return json_response(body)
+
+    article_status = await load_article_status(db, article_id, current_user)
+    items, next_cursor = await get_article_comments(db, article_id, cursor=cursor, limit=limit)
+    page = ArticleCommentPageResponse(items=items, next_cursor=next_cursor)
+    if article_status != ArticleStatus.APPROVED:
+        return page
+    body = page.model_dump_json().encode("utf-8")
+    response_cache.set(key, body)
+    return json_response(body)
 
 
 @router.post("/articles/{article_id}/comments", response_model=ArticleCommentResponse, status_code=status.HTTP_201_CREATED)
@@ -226,6 +242,13 @@ def remove_article_link(
     return None
 
 
+@router.get("/admin/response-cache")
+def response_cache_stats(
+    current_user: User = Depends(require_role(UserRole.platform_admin)),
+):
+    return response_cache.stats()
+
+
 @router.get("/admin/articles", response_model=list[ArticleListResponse])
 def admin_list_articles(
     status_filter: Optional[ArticleStatus] = Query(default=None, alias="status"),
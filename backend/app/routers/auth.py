@@ -6,16 +6,26 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError
 from pydantic import BaseModel, EmailStr
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from ..auth import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
     create_access_token,
     decode_jwt_token,
-    verify_password,
+    verify_and_update_password,
 )
-from ..database import SessionLocal
+# FastAPI дава една сесия на заявка за зависимостите с еднакъв get_db / get_async_db:
+# get_current_user е за sync handler-ите, get_current_user_async – за async.
+from ..database import get_async_db, get_db
 from ..models import User, UserRole, Club
+from ..principal_cache import Principal, load_principal, load_principal_async
+from ..services.token_service import (
+    issue_refresh_token,
+    purge_expired_refresh_tokens,
+    revoke_refresh_token,
+    rotate_refresh_token,
+)
 
 router = APIRouter()
 
@@ -31,6 +41,12 @@ class LoginRequest(BaseModel):
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    # Opaque, еднократен – разменя се на /auth/refresh срещу нова двойка токени
+    refresh_token: Optional[str] = None
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 
 class UserResponse(BaseModel):
@@ -44,48 +60,55 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-async def authenticate_user(db: Session, email: str, password: str) -> User:
-    user = db.execute(select(User).where(User.email == email)).scalar_one_or_none()
-    if not user or not verify_password(password, user.hashed_password):
+async def _load_login_user(db: AsyncSession, email: str) -> tuple[Optional[User], bool]:
+    """Потребителят и дали клубът му е активен, с една заявка."""
+    row = (await db.execute(
+        select(User, Club.is_active).outerjoin(Club, Club.id == User.club_id).where(User.email == email)
+    )).first()
+    if row is None:
+        return None, True
+    user, club_active = row
+    return user, club_active is not False
+
+
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> User:
+    # Заявките са async, bcrypt – в password pool-а; event loop-ът само чака.
+    user, club_active = await _load_login_user(db, email)
+    verified, new_hash = False, None
+    if user is not None:
+        verified, new_hash = await verify_and_update_password(password, user.hashed_password)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    if user.role == UserRole.coach and user.club_id is not None:
-        club = db.get(Club, user.club_id)
-        if club is not None and not bool(getattr(club, "is_active", True)):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Достъпът е временно спрян за вашия клуб. Свържете се с администратор.",
-            )
+    if user.role == UserRole.coach and user.club_id is not None and not club_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Достъпът е временно спрян за вашия клуб. Свържете се с администратор.",
+        )
+    if new_hash:
+        # Цената (settings.bcrypt_rounds) е сменена – записваме новия хеш прозрачно.
+        user.hashed_password = new_hash
+        await db.commit()
     return user
 
 
-async def get_current_user(
-    request: Request,
-    db: Annotated[Session, Depends(get_db)],
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-) -> User:
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _token_user_id(request: Request, credentials: Optional[HTTPAuthorizationCredentials]) -> int:
     """
     Extract and validate JWT token from Authorization: Bearer <token> header.
     Manually extracts token from request headers if HTTPBearer doesn't provide it.
     Raises HTTPException 401 if token is missing or invalid.
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
     # Extract token from HTTPBearer or manually from Authorization header
     token = None
     if credentials:
@@ -95,50 +118,109 @@ async def get_current_user(
         auth_header = request.headers.get("Authorization")
         if auth_header and auth_header.startswith("Bearer "):
             token = auth_header.split("Bearer ")[1]
-    
+
     # If no token provided, raise 401
     if not token:
-        raise credentials_exception
-    
+        raise _credentials_exception()
+
     try:
         payload = decode_jwt_token(token)
         user_id: str | None = payload.get("sub")
         if user_id is None:
-            raise credentials_exception
+            raise _credentials_exception()
     except JWTError:
-        raise credentials_exception
-
-    user = db.get(User, int(user_id))
-    if user is None:
-        raise credentials_exception
-    if user.role == UserRole.coach and user.club_id is not None:
-        club = db.get(Club, user.club_id)
-        if club is not None and not bool(getattr(club, "is_active", True)):
+        raise _credentials_exception()
+    return int(user_id)
+
+
+def _active_principal(principal: Optional[Principal]) -> Principal:
+    if principal is None:
+        raise _credentials_exception()
+    if principal.role == UserRole.coach and principal.club_id is not None:
+        if not principal.club_active:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Достъпът е временно спрян за вашия клуб. Свържете се с администратор.",
             )
-    return user
+    return principal
+
+
+def get_current_user(
+    request: Request,
+    db: Annotated[Session, Depends(get_db)],
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+) -> Principal:
+    """
+    Auth за sync handler-ите – при пропуск в кеша чете през същата sync сесия като handler-а.
+    Returns a cached Principal (not an ORM User) – no query while the cache entry is fresh.
+    """
+    return _active_principal(load_principal(db, _token_user_id(request, credentials)))
+
+
+async def get_current_user_async(
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+) -> Principal:
+    """Същото за async handler-ите – през тяхната AsyncSession."""
+    return _active_principal(await load_principal_async(db, _token_user_id(request, credentials)))
+
+
+def _access_token(user: User | Principal) -> str:
+    role = user.role.value if hasattr(user.role, "value") else user.role
+    return create_access_token(
+        data={"sub": str(user.id), "email": user.email, "role": role},
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+
+
+async def _start_refresh_family(db: AsyncSession, user_id: int) -> str:
+    await purge_expired_refresh_tokens(db, user_id)
+    token = issue_refresh_token(db, user_id)
+    await db.commit()
+    return token
 
 
 @router.post("/login", response_model=TokenResponse)
 async def login(
     request: LoginRequest,
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_async_db)],
 ):
     """
     Login endpoint that accepts JSON body with email and password.
     Returns JWT access token for use with Authorization: Bearer <token> header.
     """
     user = await authenticate_user(db, request.email, request.password)
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": str(user.id), "email": user.email, "role": user.role.value},
-        expires_delta=access_token_expires,
+    access_token = _access_token(user)
+    refresh_token = await _start_refresh_family(db, user.id)
+    return TokenResponse(access_token=access_token, token_type="bearer", refresh_token=refresh_token)
+
+
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh(
+    request: RefreshRequest,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+):
+    """
+    Rotates the refresh token and issues a new access token – no password, no bcrypt.
+    Deleted users and coaches of suspended clubs get the same errors as on login.
+    """
+    user_id, refresh_token = await rotate_refresh_token(db, request.refresh_token)
+    principal = _active_principal(await load_principal_async(db, user_id))
+    return TokenResponse(
+        access_token=_access_token(principal), token_type="bearer", refresh_token=refresh_token
     )
-    return TokenResponse(access_token=access_token, token_type="bearer")
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    request: RefreshRequest,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+):
+    """Revokes the refresh token family; the access token simply expires."""
+    await revoke_refresh_token(db, request.refresh_token)
 
 
 @router.get("/me", response_model=UserResponse)
-async def read_current_user(current_user: Annotated[User, Depends(get_current_user)]):
+async def read_current_user(current_user: Annotated[User, Depends(get_current_user_async)]):
     return current_user
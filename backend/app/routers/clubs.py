@@ -5,6 +5,8 @@ from pydantic import BaseModel
 from ..database import get_db
 from ..models import Club, UserRole, User
 from ..dependencies.roles import require_role
+from ..principal_cache import invalidate_club_principals
+from ..services.article_service import clear_article_cache
 
 router = APIRouter(prefix="/clubs", tags=["Clubs"])
 
@@ -58,6 +60,11 @@ def update_club(
 
     db.commit()
     db.refresh(club)
+    if "is_active" in data:
+        invalidate_club_principals()
+    if "name" in data:
+        # Името на клуба е в автора на кешираните статии
+        clear_article_cache()
     return club
 
 
@@ -73,6 +80,7 @@ def toggle_club_access(
     club.is_active = not bool(getattr(club, "is_active", True))
     db.commit()
     db.refresh(club)
+    invalidate_club_principals()
     return {"id": club.id, "is_active": club.is_active}
 
 
@@ -1,12 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import csv
+import io
+import json
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Iterator
 from datetime import datetime
 
-from ..database import get_db
-from ..models import Drill, UserRole
+from ..database import SessionLocal, get_async_db, get_db
+from ..models import Drill, Training, TrainingDrill, UserRole
 from ..dependencies.roles import require_role
+from ..seed.seed_drills import DRILL_CSV_COLUMNS, drill_to_csv_row, drill_to_export_record
+from ..services.drill_media_service import generate_drill_thumbnails, needs_thumbnails, sync_drill_media
+from ..services.training_service import drill_usage_counts, training_ids_using_drill
 
 router = APIRouter()
 
@@ -120,11 +129,37 @@ class DrillUpdate(BaseModel):
     rejection_reason: Optional[str] = None
 
 
+class DrillUsageOut(BaseModel):
+    drill_id: int
+    title: Optional[str] = None
+    trainings_count: int
+
+
+class DrillTrainingOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: str
+    coach_id: int
+    created_at: Optional[datetime] = None
+
+
 class DrillDecision(BaseModel):
     action: str = Field(..., description="approve или reject")
     rejection_reason: Optional[str] = None
 
 
+class DrillMediaOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    kind: str
+    position: int = 0
+    url: str
+    provider: str
+    is_valid: bool = False
+    thumbnail_url: Optional[str] = None
+
+
 class DrillOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -171,6 +206,8 @@ class DrillOut(BaseModel):
 
     image_urls: Optional[List[str]] = None
     video_urls: Optional[List[str]] = None
+    has_valid_video: Optional[bool] = None
+    media: List[DrillMediaOut] = []
 
     created_by: Optional[int] = None
     status: str
@@ -184,12 +221,82 @@ class DrillOut(BaseModel):
 # Helpers
 # ========================
 
-def _list_approved(db: Session):
-    return db.query(Drill).filter(Drill.status == "approved").order_by(Drill.id.asc()).all()
+def _query_drills(db: Session):
+    return db.query(Drill).options(selectinload(Drill.media))
+
+
+async def _list_approved(db: AsyncSession):
+    result = await db.execute(
+        select(Drill).options(selectinload(Drill.media)).where(Drill.status == "approved").order_by(Drill.id.asc())
+    )
+    return result.scalars().all()
 
 
 def _list_pending(db: Session):
-    return db.query(Drill).filter(Drill.status == "pending").order_by(Drill.id.desc()).all()
+    return _query_drills(db).filter(Drill.status == "pending").order_by(Drill.id.desc()).all()
+
+
+def _schedule_thumbnails(drill: Drill, background_tasks: BackgroundTasks) -> None:
+    if needs_thumbnails(drill):
+        background_tasks.add_task(generate_drill_thumbnails, drill.id)
+
+
+EXPORT_BATCH_SIZE = 200
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "drills.csv"),
+    "jsonl": ("application/x-ndjson; charset=utf-8", "drills.jsonl"),
+}
+
+
+def _iter_approved_rows(batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[dict]:
+    """
+    Обхожда одобрените упражнения със server-side cursor (yield_per),
+    така че в паметта има най-много една партида редове.
+    Сесията е собствена – StreamingResponse чете след като get_db е затворил своята.
+    """
+    attrs = [attr for _, attr, _ in DRILL_CSV_COLUMNS]
+    stmt = (
+        select(*[getattr(Drill, attr) for attr in attrs])
+        .where(Drill.status == "approved")
+        .order_by(Drill.id.asc())
+        .execution_options(yield_per=batch_size)
+    )
+    db = SessionLocal()
+    try:
+        for row in db.execute(stmt):
+            yield dict(zip(attrs, row))
+    finally:
+        db.close()
+
+
+def _stream_csv(batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=[column for column, _, _ in DRILL_CSV_COLUMNS])
+    # BOM – seed-ът чете с utf-8-sig, а Excel така разпознава кирилицата.
+    buffer.write("\ufeff")
+    writer.writeheader()
+
+    pending = 0
+    for values in _iter_approved_rows(batch_size):
+        writer.writerow(drill_to_csv_row(values))
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            pending = 0
+    yield buffer.getvalue()
+
+
+def _stream_jsonl(batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[str]:
+    lines: List[str] = []
+    for values in _iter_approved_rows(batch_size):
+        lines.append(json.dumps(drill_to_export_record(values), ensure_ascii=False))
+        if len(lines) >= batch_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
 
 
 # ========================
@@ -197,8 +304,66 @@ def _list_pending(db: Session):
 # ========================
 
 @router.get("", response_model=List[DrillOut])
-def list_drills(db: Session = Depends(get_db)):
-    return _list_approved(db)
+async def list_drills(db: AsyncSession = Depends(get_async_db)):
+    return await _list_approved(db)
+
+
+# ========================
+# Public export (approved) – CSV/JSONL
+# ========================
+
+@router.get("/export")
+def export_drills(export_format: str = Query(default="csv", alias="format")):
+    fmt = export_format.lower().strip()
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="format must be csv or jsonl")
+
+    media_type, file_name = EXPORT_FORMATS[fmt]
+    body = _stream_csv() if fmt == "csv" else _stream_jsonl()
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{file_name}"'},
+    )
+
+
+# ========================
+# Usage (training_drills)
+# ========================
+
+@router.get("/popular", response_model=List[DrillUsageOut])
+def popular_drills(
+    limit: int = Query(default=20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    user=Depends(require_role(UserRole.coach, UserRole.platform_admin, UserRole.federation_admin)),
+):
+    counts = drill_usage_counts(db, limit=limit)
+    titles = dict(
+        db.query(Drill.id, Drill.title).filter(Drill.id.in_([drill_id for drill_id, _ in counts])).all()
+    ) if counts else {}
+    return [
+        {"drill_id": drill_id, "title": titles.get(drill_id), "trainings_count": count}
+        for drill_id, count in counts
+    ]
+
+
+@router.get("/{drill_id}/trainings", response_model=List[DrillTrainingOut])
+def drill_trainings(
+    drill_id: int,
+    db: Session = Depends(get_db),
+    user=Depends(require_role(UserRole.coach, UserRole.platform_admin, UserRole.federation_admin)),
+):
+    # Треньорът вижда само своите тренировки, админите – всички.
+    coach_id = user.id if user.role == UserRole.coach else None
+    ids = training_ids_using_drill(db, drill_id, coach_id=coach_id)
+    if not ids:
+        return []
+    return (
+        db.query(Training.id, Training.title, Training.coach_id, Training.created_at)
+        .filter(Training.id.in_(ids))
+        .order_by(Training.created_at.desc(), Training.id.desc())
+        .all()
+    )
 
 
 # ========================
@@ -208,6 +373,7 @@ def list_drills(db: Session = Depends(get_db)):
 @router.post("", response_model=DrillOut)
 def coach_submit_drill(
     payload: DrillCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     user=Depends(require_role(UserRole.coach)),
 ):
@@ -216,10 +382,12 @@ def coach_submit_drill(
     drill.status = "pending"
     drill.created_at = datetime.utcnow()
     drill.updated_at = datetime.utcnow()
+    sync_drill_media(drill)
 
     db.add(drill)
     db.commit()
     db.refresh(drill)
+    _schedule_thumbnails(drill, background_tasks)
     return drill
 
 
@@ -232,7 +400,7 @@ def coach_my_drills(
     db: Session = Depends(get_db),
     user=Depends(require_role(UserRole.coach)),
 ):
-    return db.query(Drill).filter(Drill.created_by == user.id).order_by(Drill.id.desc()).all()
+    return _query_drills(db).filter(Drill.created_by == user.id).order_by(Drill.id.desc()).all()
 
 
 # ========================
@@ -287,6 +455,7 @@ def admin_decide(
 def admin_update_drill(
     drill_id: int,
     payload: DrillUpdate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     user=Depends(require_role(UserRole.platform_admin, UserRole.federation_admin)),
 ):
@@ -297,10 +466,13 @@ def admin_update_drill(
     data = payload.model_dump(exclude_unset=True)
     for k, v in data.items():
         setattr(drill, k, v)
+    if "image_urls" in data or "video_urls" in data:
+        sync_drill_media(drill)
 
     drill.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(drill)
+    _schedule_thumbnails(drill, background_tasks)
     return drill
 
 
@@ -314,6 +486,8 @@ def admin_delete_drill(
     if not drill:
         raise HTTPException(status_code=404, detail="Drill not found")
 
+    # training_drills.drill_id няма ON DELETE – махаме индекса; plan JSON остава както досега.
+    db.query(TrainingDrill).filter(TrainingDrill.drill_id == drill_id).delete(synchronize_session=False)
     db.delete(drill)
     db.commit()
     return None
@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, File, Query, UploadFile, status
+import asyncio
+
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Query, UploadFile, WebSocket, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.auth import decode_jwt_token
+from app.database import AsyncSessionLocal, get_async_db, get_db
 from app.dependencies.auth import get_current_user
-from app.models import User, UserRole
-from app.dependencies.roles import require_role
+from app.models import ForumPostMedia, User, UserRole
+from app.principal_cache import load_principal_async
+from app.pubsub import broker, user_channel
+from app.dependencies.roles import require_role, require_role_async
 from app.schemas.forum import (
     ForumFollowStateResponse,
     ForumNotificationResponse,
@@ -15,12 +21,17 @@ from app.schemas.forum import (
     ForumPostResponse,
     ForumPostUpdate,
     ForumReplyCreate,
+    ForumReplyPageResponse,
     ForumReplyResponse,
     ForumReplyUpdate,
+    ForumSearchHitResponse,
+    ForumTagCountResponse,
 )
+from app.services.image_derivatives import generate_image_derivatives, needs_derivatives
 from app.services.forum_service import (
     get_available_categories,
     get_available_tags,
+    get_tag_counts,
     paginate_meta,
     create_post,
     create_reply,
@@ -28,14 +39,18 @@ from app.services.forum_service import (
     delete_post,
     delete_post_media,
     delete_reply,
+    fan_out_reply_notifications,
     get_post,
     list_posts,
+    list_replies,
     list_notifications,
     mark_all_notifications_read,
     mark_notification_read,
     moderate_post,
+    search_posts,
     set_follow_post,
     update_post,
+    unread_notifications_count,
     update_reply,
 )
 
@@ -43,19 +58,19 @@ router = APIRouter()
 
 
 @router.get("/forum/posts", response_model=ForumPostPageResponse)
-def list_forum_posts(
+async def list_forum_posts(
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=20, ge=1, le=50),
     category: str | None = Query(default=None),
     tag: str | None = Query(default=None),
     query: str | None = Query(default=None),
     sort_by: str = Query(default="last_activity"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(
-        require_role(UserRole.coach, UserRole.platform_admin, UserRole.federation_admin)
+        require_role_async(UserRole.coach, UserRole.platform_admin, UserRole.federation_admin)
     ),
 ):
-    items, total = list_posts(
+    items, total = await list_posts(
         db=db,
         user=current_user,
         page=page,
@@ -69,6 +84,18 @@ def list_forum_posts(
     return {"items": items, **meta}
 
 
+@router.get("/forum/search", response_model=list[ForumSearchHitResponse])
+def search_forum_posts(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(default=20, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(
+        require_role(UserRole.coach, UserRole.platform_admin, UserRole.federation_admin)
+    ),
+):
+    return search_posts(db, current_user, q, limit=limit)
+
+
 @router.get("/forum/categories", response_model=list[str])
 def list_forum_categories(
     db: Session = Depends(get_db),
@@ -89,6 +116,17 @@ def list_forum_tags(
     return get_available_tags(db, current_user)
 
 
+@router.get("/forum/tags/counts", response_model=list[ForumTagCountResponse])
+def list_forum_tag_counts(
+    limit: int = Query(default=50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(
+        require_role(UserRole.coach, UserRole.platform_admin, UserRole.federation_admin)
+    ),
+):
+    return get_tag_counts(db, current_user, limit=limit)
+
+
 @router.post("/forum/posts", response_model=ForumPostResponse, status_code=status.HTTP_201_CREATED)
 def create_forum_post(
     payload: ForumPostCreate,
@@ -146,22 +184,17 @@ def delete_forum_post(
 @router.post("/forum/posts/{post_id}/media", response_model=ForumPostMediaResponse, status_code=status.HTTP_201_CREATED)
 def upload_forum_post_media(
     post_id: int,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     current_user: User = Depends(
         require_role(UserRole.coach, UserRole.platform_admin, UserRole.federation_admin)
     ),
 ):
-    content = file.file.read()
-    return add_post_media(
-        db=db,
-        post_id=post_id,
-        user=current_user,
-        file_name=file.filename or "file",
-        mime_type=file.content_type or "application/octet-stream",
-        size_bytes=len(content),
-        content=content,
-    )
+    media = add_post_media(db=db, post_id=post_id, user=current_user, upload=file)
+    if needs_derivatives(media):
+        background_tasks.add_task(generate_image_derivatives, ForumPostMedia, media.id)
+    return media
 
 
 @router.delete("/forum/posts/{post_id}/media/{media_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -177,16 +210,33 @@ def remove_forum_post_media(
     return None
 
 
+@router.get("/forum/posts/{post_id}/replies", response_model=ForumReplyPageResponse)
+def list_forum_replies(
+    post_id: int,
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(
+        require_role(UserRole.coach, UserRole.platform_admin, UserRole.federation_admin)
+    ),
+):
+    items, next_cursor = list_replies(db, post_id, current_user, cursor=cursor, limit=limit)
+    return {"items": items, "next_cursor": next_cursor}
+
+
 @router.post("/forum/posts/{post_id}/replies", response_model=ForumReplyResponse, status_code=status.HTTP_201_CREATED)
 def create_forum_reply(
     post_id: int,
     payload: ForumReplyCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(
         require_role(UserRole.coach, UserRole.platform_admin, UserRole.federation_admin)
     ),
 ):
-    return create_reply(db, post_id, current_user, payload)
+    reply = create_reply(db, post_id, current_user, payload)
+    background_tasks.add_task(fan_out_reply_notifications, reply.id)
+    return reply
 
 
 @router.post("/forum/posts/{post_id}/follow", response_model=ForumFollowStateResponse)
@@ -224,6 +274,59 @@ def get_forum_notifications(
     return {"items": payload, "unread_count": unread_count}
 
 
+async def _push_channel_state(user_id: int) -> int | None:
+    """Същите проверки като get_current_user + форум роля; връща броя непрочетени или None."""
+    async with AsyncSessionLocal() as db:
+        principal = await load_principal_async(db, user_id)
+        if principal is None or principal.role not in {UserRole.coach, UserRole.platform_admin, UserRole.federation_admin}:
+            return None
+        if principal.role == UserRole.coach and principal.club_id is not None and not principal.club_active:
+            return None
+        return await db.run_sync(unread_notifications_count, user_id)
+
+
+@router.websocket("/forum/ws")
+async def forum_push_channel(websocket: WebSocket, token: str = Query(default="")):
+    """
+    Push канал: {"type": "reply", ...} за нов отговор в следвана тема и
+    {"type": "unread_count", ...} при промяна на непрочетените известия.
+    JWT идва като ?token=, защото браузърът не праща Authorization при WebSocket.
+    """
+    try:
+        user_id = int(decode_jwt_token(token)["sub"])
+    except Exception:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    # Абонираме се преди да прочетем броя, за да не изпуснем събитие между двете.
+    subscription = broker.subscribe(user_channel(user_id))
+    try:
+        unread_count = await _push_channel_state(user_id)
+        if unread_count is None:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        await websocket.accept()
+
+        async def pump():
+            await websocket.send_json({"type": "unread_count", "unread_count": unread_count})
+            while True:
+                await websocket.send_json(await subscription.get())
+
+        async def drain():
+            # Клиентът не праща нищо смислено; четем само за да разберем кога се е откачил.
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+
+        tasks = [asyncio.create_task(pump()), asyncio.create_task(drain())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+    finally:
+        subscription.close()
+
+
 @router.post("/forum/notifications/{notification_id}/read", status_code=status.HTTP_204_NO_CONTENT)
 def read_forum_notification(
     notification_id: int,
@@ -0,0 +1,96 @@
+import re
+from typing import Optional
+from urllib.parse import quote
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models import MediaBlob
+from app.services.media_storage import media_storage
+from app.services.upload_service import mime_type_for, sanitize_filename
+
+router = APIRouter()
+
+SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+# Съдържанието под даден hash никога не се променя.
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Само тези се показват в браузъра; всичко останало се сваля като файл.
+INLINE_MIME_PREFIXES = ("image/", "video/")
+
+
+def _parse_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """
+    "bytes=a-b" / "a-" / "-n" -> (start, end) включително; None ако header-ът не е
+    поддържан (напр. няколко диапазона) – тогава връщаме целия файл.
+    Диапазон извън файла -> 416.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if length == 0:
+            raise HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+@router.get("/media/{sha256}/{file_name}")
+def download_media(
+    sha256: str,
+    file_name: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    db: Session = Depends(get_db),
+):
+    if not SHA256_RE.match(sha256):
+        raise HTTPException(status_code=404, detail="Media not found")
+    blob = db.get(MediaBlob, sha256)
+    if blob is None:
+        raise HTTPException(status_code=404, detail="Media not found")
+
+    # Типът идва от allowlist-а по разширението, не от blob-а: при dedup редът пази типа на
+    # първото качване, а той може да е различен. nosniff – браузърът не "познава" HTML.
+    file_name = sanitize_filename(file_name)
+    mime_type = mime_type_for(file_name)
+    etag = f'"{sha256}"'
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Cache-Control": CACHE_CONTROL,
+        "X-Content-Type-Options": "nosniff",
+    }
+    if not mime_type.startswith(INLINE_MIME_PREFIXES):
+        headers["Content-Disposition"] = f"attachment; filename*=UTF-8''{quote(file_name)}"
+    if if_none_match and etag in if_none_match:
+        return Response(status_code=304, headers=headers)
+
+    size = blob.size
+    byte_range = _parse_range(range_header, size) if range_header and size else None
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        if not size:
+            return Response(content=b"", media_type=mime_type, headers=headers)
+        return StreamingResponse(
+            media_storage.iter_range(sha256, 0, size - 1), media_type=mime_type, headers=headers
+        )
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        media_storage.iter_range(sha256, start, end),
+        status_code=206,
+        media_type=mime_type,
+        headers=headers,
+    )
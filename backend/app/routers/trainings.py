@@ -1,43 +1,55 @@
 # backend/app/routers/trainings.py
-from typing import List, Dict, Set
+from datetime import datetime
+from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import Response
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
+from ..cache import LRUCache
 from ..database import get_db
+from ..pagination import encode_cursor, keyset_filter
 from ..dependencies.roles import require_role
-from ..models import Training, UserRole, User, Drill
+from ..models import Training, TrainingDrill, TrainingSource, TrainingStatus, UserRole, User, Drill
 from ..schemas.training import (
     TrainingCreate,
     TrainingRead,
     TrainingUpdate,
     TrainingReadDetailed,
+    TrainingSummary,
+    TrainingSummaryPage,
+    DrillMini,
 )
+from ..services.training_service import sync_training_drills
 
 router = APIRouter(tags=["Trainings"])
 
+# (training_id, training.updated_at, catalog version) -> сглобен отговор за /details
+_details_cache = LRUCache(maxsize=512)
+
+# Компактна проекция – само колоните от DrillMini, без пълните Drill обекти.
+_DRILL_MINI_FIELDS = list(DrillMini.model_fields)
+_DRILL_MINI_COLUMNS = [getattr(Drill, name).label(f"drill_{name}") for name in _DRILL_MINI_FIELDS]
+_TRAINING_DETAIL_COLUMNS = [
+    Training.id,
+    Training.title,
+    Training.club_id,
+    Training.source,
+    Training.status,
+    Training.plan,
+    Training.notes,
+    Training.coach_id,
+    Training.created_at,
+    Training.updated_at,
+]
+
 
 def _ensure_owner(training: Training, current_user: User):
     if not training or training.coach_id != current_user.id:
         raise HTTPException(status_code=404, detail="Training not found")
 
 
-def _collect_plan_ids(plan: Dict[str, List[int]]) -> Set[int]:
-    ids: Set[int] = set()
-    if not plan:
-        return ids
-    for _, arr in plan.items():
-        if not arr:
-            continue
-        for x in arr:
-            try:
-                ids.add(int(x))
-            except Exception:
-                pass
-    return ids
-
-
 @router.post("/", response_model=TrainingRead, status_code=status.HTTP_201_CREATED)
 def create_training(
     training: TrainingCreate,
@@ -57,23 +69,46 @@ def create_training(
     )
 
     db.add(db_training)
+    sync_training_drills(db, db_training)
     db.commit()
     db.refresh(db_training)
     return db_training
 
 
-@router.get("/my", response_model=List[TrainingRead])
+@router.get("/my", response_model=TrainingSummaryPage)
 def get_my_trainings(
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = Query(default=None),
+    q: str | None = Query(default=None, max_length=200),
+    status_filter: TrainingStatus | None = Query(default=None, alias="status"),
+    source: TrainingSource | None = Query(default=None),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role(UserRole.coach)),
 ):
-    trainings = (
-        db.query(Training)
-        .filter(Training.coach_id == current_user.id)
-        .order_by(Training.created_at.desc())
-        .all()
-    )
-    return trainings
+    # Само колоните от TrainingSummary – plan/generation_request/score_summary не се четат.
+    columns = [getattr(Training, name) for name in TrainingSummary.model_fields]
+    query = db.query(*columns).filter(Training.coach_id == current_user.id)
+    # Филтрите са в SQL – иначе съвпаденията на следващите страници не се виждат.
+    if q and q.strip():
+        search = q.strip()
+        condition = Training.title.ilike(f"%{search}%")
+        if search.isdigit():
+            condition = condition | (Training.id == int(search))
+        query = query.filter(condition)
+    if status_filter is not None:
+        query = query.filter(Training.status == status_filter)
+    if source is not None:
+        query = query.filter(Training.source == source)
+    if cursor:
+        query = query.filter(keyset_filter(Training.created_at, Training.id, cursor))
+    rows = query.order_by(Training.created_at.desc(), Training.id.desc()).limit(limit + 1).all()
+
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @router.get("/{training_id}", response_model=TrainingRead)
@@ -87,37 +122,57 @@ def get_training(
     return training
 
 
+def _details_stamp(db: Session, training_id: int):
+    """
+    Една заявка: собственик + updated_at на тренировката + версия на каталога.
+    Версията (max(updated_at), count) се сменя при редакция/изтриване на упражнение.
+    """
+    catalog_updated = select(func.max(Drill.updated_at)).scalar_subquery()
+    catalog_count = select(func.count(Drill.id)).scalar_subquery()
+    return db.execute(
+        select(Training.coach_id, Training.updated_at, catalog_updated, catalog_count)
+        .where(Training.id == training_id)
+    ).first()
+
+
 @router.get("/{training_id}/details", response_model=TrainingReadDetailed)
 def get_training_details(
     training_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role(UserRole.coach)),
 ):
-    training = db.query(Training).filter(Training.id == training_id).first()
-    _ensure_owner(training, current_user)
+    stamp = _details_stamp(db, training_id)
+    if not stamp or stamp[0] != current_user.id:
+        raise HTTPException(status_code=404, detail="Training not found")
 
-    plan = training.plan or {}
-    ids = _collect_plan_ids(plan)
+    cache_key = (training_id, stamp[1], stamp[2], stamp[3])
+    cached = _details_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Един round trip: тренировката + компактните упражнения през training_drills.
+    rows = db.execute(
+        select(*_TRAINING_DETAIL_COLUMNS, *_DRILL_MINI_COLUMNS)
+        .select_from(Training)
+        .outerjoin(TrainingDrill, TrainingDrill.training_id == Training.id)
+        .outerjoin(Drill, Drill.id == TrainingDrill.drill_id)
+        .where(Training.id == training_id)
+    ).mappings().all()
+    if not rows or rows[0]["coach_id"] != current_user.id:
+        raise HTTPException(status_code=404, detail="Training not found")
 
     drills_map = {}
-    if ids:
-        drills = db.query(Drill).filter(Drill.id.in_(list(ids))).all()
-        for d in drills:
-            drills_map[int(d.id)] = d
-
-    return {
-        "id": training.id,
-        "title": training.title,
-        "club_id": training.club_id,
-        "source": training.source,
-        "status": training.status,
-        "plan": plan,
-        "notes": training.notes,
-        "coach_id": training.coach_id,
-        "created_at": training.created_at,
-        "updated_at": training.updated_at,
-        "drills": drills_map,
-    }
+    for row in rows:
+        if row["drill_id"] is None:
+            continue
+        drills_map[int(row["drill_id"])] = {name: row[f"drill_{name}"] for name in _DRILL_MINI_FIELDS}
+
+    first = rows[0]
+    details = {col.key: first[col.key] for col in _TRAINING_DETAIL_COLUMNS}
+    details["plan"] = details["plan"] or {}
+    details["drills"] = drills_map
+    _details_cache.set(cache_key, details)
+    return details
 
 
 @router.patch("/{training_id}", response_model=TrainingRead)
@@ -137,6 +192,11 @@ def update_training(
 
     for k, v in data.items():
         setattr(training, k, v)
+    # Изрично (а не само onupdate=func.now()), за да е с микросекунди и в SQLite –
+    # updated_at е част от ключа на _details_cache.
+    training.updated_at = datetime.utcnow()
+    if "plan" in data:
+        sync_training_drills(db, training)
 
     db.commit()
     db.refresh(training)
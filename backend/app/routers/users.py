@@ -4,8 +4,12 @@ from pydantic import BaseModel, EmailStr
 
 from ..database import get_db
 from ..models import User, UserRole
-from ..auth import get_password_hash
+from ..auth import hash_password_pooled
 from ..dependencies.roles import require_role
+from ..principal_cache import invalidate_principal
+from ..services.article_service import clear_article_cache
+from ..services.coach_service import renumber_club_coaches
+from ..services.token_service import revoke_user_refresh_tokens
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -53,14 +57,16 @@ def create_coach(
     user = User(
         email=data.email,
         name=data.name,
-        hashed_password=get_password_hash(data.password),
+        hashed_password=hash_password_pooled(data.password),
         role=UserRole.coach,
         club_id=data.club_id,
     )
 
     db.add(user)
+    renumber_club_coaches(db, data.club_id)
     db.commit()
     db.refresh(user)
+    clear_article_cache()
     return user
 
 
@@ -98,6 +104,7 @@ def update_coach(
         raise HTTPException(status_code=404, detail="Coach not found")
 
     payload = data.model_dump(exclude_unset=True)
+    previous_club_id = coach.club_id
 
     if "email" in payload:
         existing = db.query(User).filter(User.email == payload["email"], User.id != coach_id).first()
@@ -120,10 +127,16 @@ def update_coach(
     if "club_id" in payload:
         coach.club_id = payload["club_id"]
     if "password" in payload and payload["password"]:
-        coach.hashed_password = get_password_hash(payload["password"])
+        coach.hashed_password = hash_password_pooled(payload["password"])
+        revoke_user_refresh_tokens(db, coach_id)
 
+    if coach.club_id != previous_club_id:
+        coach.coach_number = None
+        renumber_club_coaches(db, previous_club_id, coach.club_id)
     db.commit()
     db.refresh(coach)
+    invalidate_principal(coach_id)
+    clear_article_cache()
     return coach
 
 
@@ -136,6 +149,11 @@ def delete_coach(
     coach = db.query(User).filter(User.id == coach_id, User.role == UserRole.coach).first()
     if not coach:
         raise HTTPException(status_code=404, detail="Coach not found")
+    club_id = coach.club_id
+    revoke_user_refresh_tokens(db, coach_id)
     db.delete(coach)
+    renumber_club_coaches(db, club_id)
     db.commit()
+    invalidate_principal(coach_id)
+    clear_article_cache()
     return {"ok": True}
\ No newline at end of file
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel, ConfigDict, Field, HttpUrl
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl, field_validator
 
 from app.models import ArticleMediaType, ArticleStatus
 
@@ -43,6 +43,19 @@ class ArticleCommentResponse(BaseModel):
     updated_at: Optional[datetime] = None
 
 
+class ArticleCommentPageResponse(BaseModel):
+    items: list[ArticleCommentResponse] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+class MediaDerivativeResponse(BaseModel):
+    width: int
+    height: int
+    url: str
+    mime_type: str
+    size: int
+
+
 class ArticleMediaResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -52,8 +65,16 @@ class ArticleMediaResponse(BaseModel):
     name: str
     mime_type: str
     size: int
+    # Намалени копия за списъци/карти (попълват се асинхронно след качване)
+    derivatives: list[MediaDerivativeResponse] = Field(default_factory=list)
+    placeholder: Optional[str] = None
     created_at: Optional[datetime] = None
 
+    @field_validator("derivatives", mode="before")
+    @classmethod
+    def validate_derivatives(cls, v):
+        return v or []
+
 
 class ArticleLinkResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -77,10 +98,31 @@ class ArticleListResponse(BaseModel):
     author_display: Optional[str] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
+    # Чист текст от началото на статията – за карти, когато авторът не е дал excerpt
+    plain_excerpt: Optional[str] = None
+    word_count: Optional[int] = None
+    reading_minutes: Optional[int] = None
+    comment_count: int = 0
+    # Първата снимка – за картите в списъка (без да се зарежда цялата статия)
+    cover_image: Optional[ArticleMediaResponse] = None
+
+
+class ArticlePageResponse(BaseModel):
+    items: list[ArticleListResponse] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+class ArticleTocItem(BaseModel):
+    id: str
+    label: str
+    level: int
 
 
 class ArticleResponse(ArticleListResponse):
     content: str
+    # Санитизиран HTML с id-та на h2/h3, съответстващи на toc
+    content_html: Optional[str] = None
+    toc: list[ArticleTocItem] = Field(default_factory=list)
     approved_by: Optional[int] = None
     approved_at: Optional[datetime] = None
     reject_reason: Optional[str] = None
@@ -88,6 +130,11 @@ class ArticleResponse(ArticleListResponse):
     media_items: list[ArticleMediaResponse] = Field(default_factory=list)
     links: list[ArticleLinkResponse] = Field(default_factory=list)
 
+    @field_validator("toc", mode="before")
+    @classmethod
+    def validate_toc(cls, v):
+        return v or []
+
 
 class ArticleLinkCreate(BaseModel):
     title: Optional[str] = None
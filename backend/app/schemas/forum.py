@@ -1,7 +1,9 @@
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+from app.schemas.article import MediaDerivativeResponse
 
 
 class ForumPostCreate(BaseModel):
@@ -52,8 +54,16 @@ class ForumPostMediaResponse(BaseModel):
     name: str
     mime_type: str
     size: int
+    # Намалени копия за списъци/карти (попълват се асинхронно след качване)
+    derivatives: list[MediaDerivativeResponse] = Field(default_factory=list)
+    placeholder: Optional[str] = None
     created_at: Optional[datetime] = None
 
+    @field_validator("derivatives", mode="before")
+    @classmethod
+    def validate_derivatives(cls, v):
+        return v or []
+
 
 class ForumPostListResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -78,7 +88,14 @@ class ForumPostListResponse(BaseModel):
 
 class ForumPostResponse(ForumPostListResponse):
     media_items: list[ForumPostMediaResponse] = Field(default_factory=list)
-    replies: list[ForumReplyResponse] = Field(default_factory=list)
+    # Първата страница отговори; следващите – GET /forum/posts/{id}/replies?cursor=replies_next_cursor
+    replies: list[ForumReplyResponse] = Field(default_factory=list, validation_alias="first_replies")
+    replies_next_cursor: Optional[str] = None
+
+
+class ForumReplyPageResponse(BaseModel):
+    items: list[ForumReplyResponse] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
 
 
 class ForumPostPageResponse(BaseModel):
@@ -89,12 +106,24 @@ class ForumPostPageResponse(BaseModel):
     total_pages: int
 
 
+class ForumSearchHitResponse(BaseModel):
+    post: ForumPostListResponse
+    reply_id: Optional[int] = None
+    score: float
+    snippet: str
+
+
 class ForumFollowStateResponse(BaseModel):
     post_id: int
     is_following: bool
     followers_count: int
 
 
+class ForumTagCountResponse(BaseModel):
+    tag: str
+    count: int
+
+
 class ForumNotificationResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -153,6 +153,26 @@ class TrainingRead(TrainingBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+# --- Списък (без plan и generator JSON-ите) ---
+class TrainingSummary(BaseModel):
+    id: int
+    title: str
+    club_id: Optional[int] = None
+    source: TrainingSource
+    status: TrainingStatus
+    coach_id: int
+    model_version: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class TrainingSummaryPage(BaseModel):
+    items: List[TrainingSummary] = []
+    next_cursor: Optional[str] = None
+
+
 # --- Детайлна схема ---
 class DrillMini(BaseModel):
     id: int
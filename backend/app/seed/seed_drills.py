@@ -4,6 +4,7 @@ from pathlib import Path
 from sqlalchemy.orm import Session
 
 from app.models import Drill
+from app.services.drill_media_service import sync_drill_media
 
 
 BASE_DIR = Path(__file__).resolve().parent
@@ -53,6 +54,97 @@ def _to_list(x):
     return [s]
 
 
+# CSV колона -> (поле в DB модела, тип). Редът съвпада с drills.csv.
+# Същото mapping се ползва и от export-а (GET /drills/export), за да може
+# export -> seed да минава без загуби.
+DRILL_CSV_COLUMNS = [
+    ("id", "id", "int"),
+    ("name", "title", "str"),
+    ("category", "category", "str"),
+    ("level", "level", "str"),
+    ("skillFocus", "skill_focus", "str"),
+    ("goal", "goal", "str"),
+    ("description", "description", "str"),
+    ("variations", "variations", "str"),
+    ("players", "players", "str"),
+    ("equipment", "equipment", "str"),
+    ("rpe", "rpe", "int"),
+    ("durationMin", "duration_min", "int"),
+    ("durationMax", "duration_max", "int"),
+    ("imageUrls", "image_urls", "list"),
+    ("videoUrls", "video_urls", "list"),
+    ("skill_domains", "skill_domains", "list"),
+    ("game_phases", "game_phases", "list"),
+    ("tactical_focus", "tactical_focus", "list"),
+    ("technical_focus", "technical_focus", "list"),
+    ("position_focus", "position_focus", "list"),
+    ("zone_focus", "zone_focus", "list"),
+    ("complexity_level", "complexity_level", "str"),
+    ("decision_level", "decision_level", "str"),
+    ("age_min", "age_min", "int"),
+    ("age_max", "age_max", "int"),
+    ("intensity_type", "intensity_type", "str"),
+    ("training_goal", "training_goal", "str"),
+    ("type_of_drill", "type_of_drill", "str"),
+]
+
+
+def _to_str(x):
+    return (x or "").strip() or None
+
+
+def _list_to_cell(values) -> str:
+    """
+    Обратното на _to_list: списък -> текст за CSV клетка.
+    Ако някоя стойност съдържа разделител, пишем JSON масив (_to_list го чете).
+    """
+    items = [str(v).strip() for v in (values or []) if str(v).strip()]
+    if not items:
+        return ""
+    if any(ch in item for item in items for ch in "|;,[{"):
+        return json.dumps(items, ensure_ascii=False)
+    return ";".join(items)
+
+
+def drill_from_csv_row(row: dict) -> dict:
+    """CSV ред -> kwargs за Drill (без id – DB-то си дава собствени)."""
+    data = {}
+    for column, attr, kind in DRILL_CSV_COLUMNS:
+        if attr == "id":
+            continue
+        raw = row.get(column)
+        if kind == "int":
+            data[attr] = _to_int(raw)
+        elif kind == "list":
+            data[attr] = _to_list(raw)
+        else:
+            data[attr] = _to_str(raw)
+    return data
+
+
+def drill_to_csv_row(values: dict) -> dict:
+    """Стойности по DB полета -> CSV ред със същите колони като drills.csv."""
+    row = {}
+    for column, attr, kind in DRILL_CSV_COLUMNS:
+        value = values.get(attr)
+        if kind == "list":
+            row[column] = _list_to_cell(value)
+        else:
+            row[column] = "" if value is None else str(value)
+    return row
+
+
+def drill_to_export_record(values: dict) -> dict:
+    """Като drill_to_csv_row, но запазва типовете (int/list) – за JSONL."""
+    record = {}
+    for column, attr, kind in DRILL_CSV_COLUMNS:
+        value = values.get(attr)
+        if kind == "list":
+            value = [str(v) for v in (value or [])]
+        record[column] = value
+    return record
+
+
 def seed_drills(db: Session):
     if not CSV_PATH.exists():
         print(f"⚠️ drills.csv not found at: {CSV_PATH}")
@@ -69,51 +161,17 @@ def seed_drills(db: Session):
 
         created = 0
         for row in reader:
-            # mapping от CSV -> DB (snake_case)
-            title = (row.get("name") or "").strip()
-            if not title:
+            # mapping от CSV -> DB (snake_case), виж DRILL_CSV_COLUMNS
+            data = drill_from_csv_row(row)
+            if not data.get("title"):
                 continue
 
             drill = Drill(
-                title=title,
-                description=(row.get("description") or "").strip() or None,
-                goal=(row.get("goal") or "").strip() or None,
-
-                category=(row.get("category") or "").strip() or None,
-                level=(row.get("level") or "").strip() or None,
-                skill_focus=(row.get("skillFocus") or "").strip() or None,
-
-                players=(row.get("players") or "").strip() or None,
-                equipment=(row.get("equipment") or "").strip() or None,
-                variations=(row.get("variations") or "").strip() or None,
-
-                rpe=_to_int(row.get("rpe")),
-                duration_min=_to_int(row.get("durationMin")),
-                duration_max=_to_int(row.get("durationMax")),
-
-                age_min=_to_int(row.get("age_min")),
-                age_max=_to_int(row.get("age_max")),
-
-                intensity_type=(row.get("intensity_type") or "").strip() or None,
-                training_goal=(row.get("training_goal") or "").strip() or None,
-                type_of_drill=(row.get("type_of_drill") or "").strip() or None,
-
-                complexity_level=(row.get("complexity_level") or "").strip() or None,
-                decision_level=(row.get("decision_level") or "").strip() or None,
-
-                image_urls=_to_list(row.get("imageUrls")),
-                video_urls=_to_list(row.get("videoUrls")),
-
-                skill_domains=_to_list(row.get("skill_domains")),
-                game_phases=_to_list(row.get("game_phases")),
-                tactical_focus=_to_list(row.get("tactical_focus")),
-                technical_focus=_to_list(row.get("technical_focus")),
-                position_focus=_to_list(row.get("position_focus")),
-                zone_focus=_to_list(row.get("zone_focus")),
-
+                **data,
                 # Workflow defaults
                 status="approved",   # ако seed-натите искаш да са видими публично
             )
+            sync_drill_media(drill)
 
             db.add(drill)
             created += 1
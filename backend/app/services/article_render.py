@@ -0,0 +1,203 @@
+import html
+import math
+import re
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+
+
+# Сменя се при промяна на рендера – init_db пререндерира статиите с по-стара версия.
+RENDER_VERSION = 1
+WORDS_PER_MINUTE = 220
+EXCERPT_LENGTH = 240
+
+# Каквото произвежда RichTextToolbar + markdown-а по-долу; всичко друго се маха.
+_ALLOWED_TAGS = {
+    "p", "br", "strong", "b", "em", "i", "u", "s", "h2", "h3", "h4",
+    "ul", "ol", "li", "blockquote", "a", "span", "code", "pre", "div",
+}
+_VOID_TAGS = {"br"}
+_BLOCK_TAGS = {"p", "br", "h2", "h3", "h4", "ul", "ol", "li", "blockquote", "pre", "div"}
+# Махат се заедно със съдържанието си.
+_DROPPED_TAGS = {"script", "style", "iframe", "object", "embed", "noscript", "template", "svg", "math"}
+_TOC_TAGS = {"h2", "h3"}
+
+_SAFE_STYLE_RE = {
+    "font-family": re.compile(r"^[\w\s,'\"-]{1,80}$"),
+    "font-size": re.compile(r"^\d{1,3}(\.\d+)?(px|em|rem|%)$"),
+    "color": re.compile(r"^(#[0-9a-fA-F]{3,8}|[a-zA-Z]{1,20}|rgba?\([\d\s.,%]+\))$"),
+}
+_SAFE_URL_RE = re.compile(r"^(https?://|mailto:|/|#)", re.IGNORECASE)
+_HAS_HTML_RE = re.compile(r"</?[a-z][\s\S]*>", re.IGNORECASE)
+_URL_RE = re.compile(r"(https?://[^\s<]+)", re.IGNORECASE)
+
+
+@dataclass
+class RenderedArticle:
+    html: str
+    toc: list[dict] = field(default_factory=list)
+    excerpt: str = ""
+    word_count: int = 0
+    reading_minutes: int = 1
+
+
+def _safe_style(value: str) -> str:
+    rules = []
+    for declaration in (value or "").split(";"):
+        name, _, raw = declaration.partition(":")
+        name, raw = name.strip().lower(), raw.strip()
+        pattern = _SAFE_STYLE_RE.get(name)
+        if pattern and pattern.match(raw):
+            rules.append(f"{name}:{raw}")
+    return ";".join(rules)
+
+
+class _Sanitizer(HTMLParser):
+    """Whitelist sanitizer; събира и текста, и заглавията (с id sec-N) за съдържанието."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out: list[str] = []
+        self.text: list[str] = []
+        self.toc: list[dict] = []
+        self._open: list[str] = []
+        self._dropped_depth = 0
+        self._heading: dict | None = None
+        self._sections = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _DROPPED_TAGS:
+            self._dropped_depth += 1
+            return
+        if self._dropped_depth or tag not in _ALLOWED_TAGS:
+            return
+        if tag in ("li", "p") and self._open and self._open[-1] == tag:
+            # <li>a<li>b – затваряме предишния, както би направил браузърът
+            self.handle_endtag(tag)
+        if tag in _BLOCK_TAGS:
+            self.text.append(" ")
+
+        kept = []
+        attributes = dict(attrs)
+        if tag == "a":
+            href = (attributes.get("href") or "").strip()
+            if href and _SAFE_URL_RE.match(href):
+                kept.append(("href", href))
+                kept.append(("target", "_blank"))
+                kept.append(("rel", "noreferrer"))
+        elif tag == "span":
+            style = _safe_style(attributes.get("style") or "")
+            if style:
+                kept.append(("style", style))
+        elif tag in _TOC_TAGS:
+            self._sections += 1
+            section_id = f"sec-{self._sections}"
+            kept.append(("id", section_id))
+            self._heading = {"id": section_id, "label": [], "level": int(tag[1])}
+
+        rendered = "".join(f' {name}="{html.escape(value, quote=True)}"' for name, value in kept)
+        self.out.append(f"<{tag}{rendered}>")
+        if tag not in _VOID_TAGS:
+            self._open.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in _DROPPED_TAGS:
+            self._dropped_depth = max(0, self._dropped_depth - 1)
+            return
+        if self._dropped_depth or tag not in self._open:
+            return
+        while self._open:
+            current = self._open.pop()
+            self.out.append(f"</{current}>")
+            if current in _TOC_TAGS and self._heading is not None:
+                label = " ".join("".join(self._heading["label"]).split())
+                if label:
+                    self.toc.append({**self._heading, "label": label})
+                self._heading = None
+            if current == tag:
+                break
+        if tag in _BLOCK_TAGS:
+            self.text.append(" ")
+
+    def handle_data(self, data):
+        if self._dropped_depth:
+            return
+        self.out.append(html.escape(data, quote=False))
+        self.text.append(data)
+        if self._heading is not None:
+            self._heading["label"].append(data)
+
+    def result(self) -> str:
+        while self._open:
+            self.handle_endtag(self._open[-1])
+        return "".join(self.out)
+
+
+def _linkify(escaped: str) -> str:
+    return _URL_RE.sub(r'<a href="\1">\1</a>', escaped)
+
+
+def markdown_to_html(raw: str) -> str:
+    """Същият лек markdown като в клиента (richText.js): ##, ###, >, списъци и параграфи."""
+    out: list[str] = []
+    items: list[str] = []
+
+    def flush_list():
+        if items:
+            out.append("<ul>" + "".join(f"<li>{item}</li>" for item in items) + "</ul>")
+            items.clear()
+
+    for line in (raw or "").split("\n"):
+        trimmed = line.strip()
+        if not trimmed:
+            flush_list()
+        elif trimmed.startswith("## "):
+            flush_list()
+            out.append(f"<h2>{html.escape(trimmed[3:].strip(), quote=False)}</h2>")
+        elif trimmed.startswith("### "):
+            flush_list()
+            out.append(f"<h3>{html.escape(trimmed[4:].strip(), quote=False)}</h3>")
+        elif trimmed.startswith("> "):
+            flush_list()
+            out.append(f"<blockquote>{_linkify(html.escape(trimmed[2:].strip(), quote=False))}</blockquote>")
+        elif re.match(r"^[-*]\s+", trimmed):
+            items.append(_linkify(html.escape(re.sub(r"^[-*]\s+", "", trimmed), quote=False)))
+        else:
+            flush_list()
+            out.append(f"<p>{_linkify(html.escape(trimmed, quote=False))}</p>")
+    flush_list()
+    return "".join(out)
+
+
+def make_excerpt(text: str, length: int = EXCERPT_LENGTH) -> str:
+    text = " ".join((text or "").split())
+    if len(text) <= length:
+        return text
+    cut = text[:length].rsplit(" ", 1)[0] or text[:length]
+    return cut.rstrip(",.;:-–— ") + "…"
+
+
+def render_article(content: str) -> RenderedArticle:
+    """
+    Безопасен HTML (markdown или HTML от RichTextToolbar), съдържание по h2/h3,
+    резюме като чист текст, брой думи и минути за четене.
+    """
+    source = content or ""
+    parser = _Sanitizer()
+    parser.feed(source if _HAS_HTML_RE.search(source) else markdown_to_html(source))
+    parser.close()
+    rendered_html = parser.result()
+
+    plain_text = " ".join("".join(parser.text).split())
+    word_count = len(plain_text.split())
+    return RenderedArticle(
+        html=rendered_html,
+        toc=parser.toc,
+        excerpt=make_excerpt(plain_text),
+        word_count=word_count,
+        reading_minutes=max(1, math.ceil(word_count / WORDS_PER_MINUTE)),
+    )
@@ -2,7 +2,9 @@ from datetime import datetime
 from typing import Optional
 
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import case, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, load_only, selectinload
 
 from app.models import (
     Article,
@@ -14,6 +16,8 @@ from app.models import (
     User,
     UserRole,
 )
+from app.pagination import encode_cursor, keyset_filter
+from app.response_cache import response_cache
 from app.schemas.article import (
     ArticleCommentCreate,
     ArticleCommentUpdate,
@@ -21,6 +25,9 @@ from app.schemas.article import (
     ArticleLinkCreate,
     ArticleUpdate,
 )
+from app.services.article_render import RENDER_VERSION, render_article
+from app.services.media_storage import acquire_blob, blob_refs, media_url, purge_blobs, release_blobs
+from app.services.upload_service import StagedUpload, delete_static_file
 
 
 def _role_value(user: User) -> str:
@@ -35,37 +42,119 @@ def _is_author(article: Article, user: User) -> bool:
     return article.author_id == user.id
 
 
-def _query_with_relations(db: Session):
-    return db.query(Article).options(
+def _relation_options() -> tuple:
+    return (
         selectinload(Article.media_items),
         selectinload(Article.links),
         selectinload(Article.author).selectinload(User.club),
     )
 
 
-def _decorate_author_meta(articles: list[Article], db: Session) -> None:
-    if not articles:
-        return
+def _query_with_relations(db: Session):
+    return db.query(Article).options(*_relation_options())
+
+
+ARTICLES_PAGE_SIZE = 20
+COMMENTS_PAGE_SIZE = 20
+
+# Scope-ове в response_cache за публичното (одобрено) съдържание.
+ARTICLES_SCOPE = "articles"
+FEED_SCOPE = "articles:feed"
+
+
+def _article_scope(article_id: int) -> str:
+    return f"article:{article_id}"
+
+
+def _comments_scope(article_id: int) -> str:
+    return f"article:{article_id}:comments"
+
+
+def public_feed_key(cursor: Optional[str], limit: int) -> tuple:
+    return response_cache.key(("articles:feed", cursor, limit), ARTICLES_SCOPE, FEED_SCOPE)
+
+
+def public_article_key(article_id: int) -> tuple:
+    return response_cache.key(("article", article_id), ARTICLES_SCOPE, _article_scope(article_id))
+
+
+def public_comments_key(article_id: int, cursor: Optional[str], limit: int) -> tuple:
+    return response_cache.key(
+        ("article:comments", article_id, cursor, limit), ARTICLES_SCOPE, _comments_scope(article_id)
+    )
+
+
+def invalidate_public_article(article_id: int) -> None:
+    response_cache.invalidate(FEED_SCOPE, _article_scope(article_id), _comments_scope(article_id))
+
+
+def clear_article_cache() -> None:
+    """За промени извън статията, които влизат в отговорите (напр. имената на авторите)."""
+    response_cache.invalidate(ARTICLES_SCOPE)
+
+
+def _apply_render(article: Article) -> None:
+    rendered = render_article(article.content)
+    article.content_html = rendered.html
+    article.toc = rendered.toc
+    article.plain_excerpt = rendered.excerpt
+    article.word_count = rendered.word_count
+    article.reading_minutes = rendered.reading_minutes
+    article.render_version = RENDER_VERSION
 
-    club_ids = {
-        a.author.club_id
-        for a in articles
-        if getattr(a, "author", None) is not None and getattr(a.author, "club_id", None) is not None
-    }
 
-    coaches_by_club: dict[int, list[int]] = {}
-    if club_ids:
-        coaches = (
-            db.query(User)
-            .filter(User.role == UserRole.coach, User.club_id.in_(club_ids))
-            .order_by(User.club_id.asc(), User.id.asc())
+def backfill_article_renders(db: Session, batch_size: int = 100) -> int:
+    """Рендерира статиите без резултат или с по-стара RENDER_VERSION. Връща броя им."""
+    processed = 0
+    while True:
+        articles = (
+            db.query(Article)
+            .filter((Article.render_version.is_(None)) | (Article.render_version < RENDER_VERSION))
+            .limit(batch_size)
             .all()
         )
-        for coach in coaches:
-            if coach.club_id is None:
-                continue
-            coaches_by_club.setdefault(coach.club_id, []).append(coach.id)
+        if not articles:
+            break
+        for article in articles:
+            _apply_render(article)
+        db.commit()
+        processed += len(articles)
+    return processed
+
+
+def _summary_options() -> tuple:
+    """Само колоните за списъците – без content, линкове и коментари."""
+    return (
+        load_only(
+            Article.id,
+            Article.title,
+            Article.excerpt,
+            Article.status,
+            Article.author_id,
+            Article.plain_excerpt,
+            Article.word_count,
+            Article.reading_minutes,
+            Article.comment_count,
+            Article.created_at,
+            Article.updated_at,
+        ),
+        selectinload(Article.media_items),
+        joinedload(Article.author).joinedload(User.club),
+    )
+
+
+def _query_summaries(db: Session):
+    return db.query(Article).options(*_summary_options())
 
+
+def _decorate_cover(articles: list[Article]) -> None:
+    for article in articles:
+        images = [m for m in article.media_items if m.type == ArticleMediaType.IMAGE]
+        article.cover_image = min(images, key=lambda m: m.id) if images else None
+
+
+def _decorate_author_meta(articles: list[Article]) -> None:
+    """Само от вече заредения автор (+ клуб) – coach_number е записан на потребителя."""
     for article in articles:
         author = getattr(article, "author", None)
         if author is None:
@@ -80,11 +169,8 @@ def _decorate_author_meta(articles: list[Article], db: Session) -> None:
         article.author_club_name = getattr(club, "name", None)
 
         coach_number = None
-        club_id = getattr(author, "club_id", None)
-        if club_id is not None:
-            coach_ids = coaches_by_club.get(club_id, [])
-            if author.id in coach_ids:
-                coach_number = coach_ids.index(author.id) + 1
+        if author.role == UserRole.coach and author.club_id is not None:
+            coach_number = author.coach_number
         article.author_coach_number = coach_number
 
         if article.author_club_name and coach_number:
@@ -109,6 +195,7 @@ def create_article(db: Session, author: User, payload: ArticleCreate) -> Article
         status=ArticleStatus.PENDING,
         author_id=author.id,
     )
+    _apply_render(article)
     db.add(article)
     db.commit()
     return get_article_by_id(db, article.id, author)
@@ -128,6 +215,8 @@ def update_article(db: Session, article_id: int, user: User, payload: ArticleUpd
     data = payload.model_dump(exclude_unset=True)
     for field, value in data.items():
         setattr(article, field, value)
+    if "content" in data:
+        _apply_render(article)
 
     article.updated_at = datetime.utcnow()
     db.commit()
@@ -140,37 +229,82 @@ def get_articles(
     status_filter: Optional[ArticleStatus] = None,
     admin_view: bool = False,
 ) -> list[Article]:
-    query = _query_with_relations(db)
+    query = _query_summaries(db)
 
     if admin_view:
         if not _is_admin(user):
             raise HTTPException(status_code=403, detail="Only platform admin can access this endpoint")
         if status_filter is not None:
             query = query.filter(Article.status == status_filter)
-        results = query.order_by(Article.created_at.desc()).all()
-        _decorate_author_meta(results, db)
+        results = query.order_by(Article.created_at.desc(), Article.id.desc()).all()
+        _decorate_author_meta(results)
+        _decorate_cover(results)
         return results
 
     query = query.filter(Article.status == ArticleStatus.APPROVED)
-    results = query.order_by(Article.created_at.desc()).all()
-    _decorate_author_meta(results, db)
+    results = query.order_by(Article.created_at.desc(), Article.id.desc()).all()
+    _decorate_author_meta(results)
+    _decorate_cover(results)
     return results
 
 
+async def list_approved_articles(
+    db: AsyncSession, cursor: Optional[str] = None, limit: int = ARTICLES_PAGE_SIZE
+) -> tuple[list[Article], Optional[str]]:
+    """
+    Публичната лента: одобрени статии, най-новите първо, по cursor върху (created_at, id).
+    Върви по индекса ix_articles_status_created_id, затова цената не расте с броя статии.
+    """
+    limit = max(1, min(int(limit), 100))
+    stmt = select(Article).options(*_summary_options()).where(Article.status == ArticleStatus.APPROVED)
+    if cursor:
+        stmt = stmt.where(keyset_filter(Article.created_at, Article.id, cursor, descending=True))
+    result = await db.execute(stmt.order_by(Article.created_at.desc(), Article.id.desc()).limit(limit + 1))
+    rows = list(result.scalars())
+
+    items = rows[:limit]
+    _decorate_author_meta(items)
+    _decorate_cover(items)
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+    return items, next_cursor
+
+
+def _check_visible(article, user: User) -> ArticleStatus:
+    """article е Article или ред (status, author_id); одобрените са видими за всички."""
+    if article is None:
+        raise HTTPException(status_code=404, detail="Article not found")
+    if article.status != ArticleStatus.APPROVED and article.author_id != user.id and not _is_admin(user):
+        raise HTTPException(status_code=403, detail="Article is not visible")
+    return article.status
+
+
+def ensure_article_visible(db: Session, article_id: int, user: User) -> ArticleStatus:
+    """Същите правила като get_article_by_id, но чете само status и author_id."""
+    row = db.query(Article.status, Article.author_id).filter(Article.id == article_id).first()
+    return _check_visible(row, user)
+
+
+async def load_article_status(db: AsyncSession, article_id: int, user: User) -> ArticleStatus:
+    """Async вариантът на ensure_article_visible за четенето на коментари."""
+    result = await db.execute(select(Article.status, Article.author_id).where(Article.id == article_id))
+    return _check_visible(result.first(), user)
+
+
 def get_article_by_id(db: Session, article_id: int, user: User) -> Article:
     article = _query_with_relations(db).filter(Article.id == article_id).first()
-    if not article:
-        raise HTTPException(status_code=404, detail="Article not found")
+    _check_visible(article, user)
+    _decorate_author_meta([article])
+    return article
 
-    can_view = (
-        article.status == ArticleStatus.APPROVED
-        or _is_author(article, user)
-        or _is_admin(user)
-    )
-    if not can_view:
-        raise HTTPException(status_code=403, detail="Article is not visible")
 
-    _decorate_author_meta([article], db)
+async def read_article(db: AsyncSession, article_id: int, user: User) -> Article:
+    """get_article_by_id за async страницата на статията."""
+    result = await db.execute(select(Article).options(*_relation_options()).where(Article.id == article_id))
+    article = result.scalar_one_or_none()
+    _check_visible(article, user)
+    _decorate_author_meta([article])
     return article
 
 
@@ -182,6 +316,8 @@ def approve_article(db: Session, article_id: int, admin: User) -> Article:
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
 
+    # Публикува се точно рендерът на текущия текст (и на текущата версия на рендера).
+    _apply_render(article)
     article.status = ArticleStatus.APPROVED
     article.approved_by = admin.id
     article.approved_at = datetime.utcnow()
@@ -189,6 +325,7 @@ def approve_article(db: Session, article_id: int, admin: User) -> Article:
     article.needs_edit_comment = None
     article.updated_at = datetime.utcnow()
     db.commit()
+    invalidate_public_article(article_id)
     return get_article_by_id(db, article_id, admin)
 
 
@@ -209,6 +346,7 @@ def reject_article(db: Session, article_id: int, admin: User, reason: Optional[s
     article.needs_edit_comment = None
     article.updated_at = datetime.utcnow()
     db.commit()
+    invalidate_public_article(article_id)
     return get_article_by_id(db, article_id, admin)
 
 
@@ -228,6 +366,7 @@ def needs_edit_article(db: Session, article_id: int, admin: User, comment: Optio
     article.needs_edit_comment = comment
     article.updated_at = datetime.utcnow()
     db.commit()
+    invalidate_public_article(article_id)
     return get_article_by_id(db, article_id, admin)
 
 
@@ -236,10 +375,7 @@ def add_article_media(
     article_id: int,
     user: User,
     media_type: ArticleMediaType,
-    url: str,
-    name: str,
-    mime_type: str,
-    size: int,
+    staged: StagedUpload,
 ) -> ArticleMedia:
     article = db.query(Article).filter(Article.id == article_id).first()
     if not article:
@@ -249,16 +385,23 @@ def add_article_media(
     if article.status == ArticleStatus.APPROVED:
         raise HTTPException(status_code=400, detail="Approved articles cannot be edited")
 
-    media = ArticleMedia(
-        article_id=article_id,
-        type=media_type,
-        url=url,
-        name=name,
-        mime_type=mime_type,
-        size=size,
-    )
-    db.add(media)
-    db.commit()
+    try:
+        acquire_blob(db, staged.sha256, staged.path, staged.size, staged.mime_type)
+        media = ArticleMedia(
+            article_id=article_id,
+            type=media_type,
+            url=media_url(staged.sha256, staged.name),
+            name=staged.name,
+            mime_type=staged.mime_type,
+            size=staged.size,
+            content_sha256=staged.sha256,
+        )
+        db.add(media)
+        db.commit()
+    except Exception:
+        db.rollback()
+        purge_blobs(db, [staged.sha256])
+        raise
     db.refresh(media)
     return media
 
@@ -276,9 +419,14 @@ def delete_article_media(db: Session, article_id: int, media_id: int, user: User
     if not media:
         raise HTTPException(status_code=404, detail="Media not found")
 
+    orphaned = release_blobs(db, blob_refs(media))
     db.delete(media)
     db.commit()
 
+    purge_blobs(db, orphaned)
+    if not media.content_sha256:
+        delete_static_file(media.url)
+
 
 def add_article_link(db: Session, article_id: int, user: User, payload: ArticleLinkCreate) -> ArticleLink:
     article = db.query(Article).filter(Article.id == article_id).first()
@@ -328,9 +476,12 @@ def admin_update_article(db: Session, article_id: int, admin: User, payload: Art
     data = payload.model_dump(exclude_unset=True)
     for field, value in data.items():
         setattr(article, field, value)
+    if "content" in data:
+        _apply_render(article)
 
     article.updated_at = datetime.utcnow()
     db.commit()
+    invalidate_public_article(article_id)
     return get_article_by_id(db, article_id, admin)
 
 
@@ -342,8 +493,16 @@ def admin_delete_article(db: Session, article_id: int, admin: User) -> None:
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
 
+    media_items = list(article.media_items)
+    orphaned = release_blobs(db, [sha for item in media_items for sha in blob_refs(item)])
     db.delete(article)
     db.commit()
+    invalidate_public_article(article_id)
+
+    purge_blobs(db, orphaned)
+    for item in media_items:
+        if not item.content_sha256:
+            delete_static_file(item.url)
 
 
 def _can_manage_comment(comment: ArticleComment, user: User) -> bool:
@@ -355,18 +514,40 @@ def _can_manage_comment(comment: ArticleComment, user: User) -> bool:
     )
 
 
-def get_article_comments(db: Session, article_id: int, user: User) -> list[ArticleComment]:
-    # Reuse visibility rules from article details.
-    get_article_by_id(db, article_id, user)
-    comments = (
-        db.query(ArticleComment)
-        .options(selectinload(ArticleComment.author))
-        .filter(ArticleComment.article_id == article_id)
-        .order_by(ArticleComment.created_at.asc())
-        .all()
+async def get_article_comments(
+    db: AsyncSession, article_id: int, cursor: Optional[str] = None, limit: int = COMMENTS_PAGE_SIZE
+) -> tuple[list[ArticleComment], Optional[str]]:
+    """
+    Страница коментари, най-старите първо, по cursor върху (created_at, id).
+    Видимостта се проверява преди това с load_article_status.
+    """
+    limit = max(1, min(int(limit), 100))
+    stmt = (
+        select(ArticleComment)
+        .options(joinedload(ArticleComment.author))
+        .where(ArticleComment.article_id == article_id)
+    )
+    if cursor:
+        stmt = stmt.where(keyset_filter(ArticleComment.created_at, ArticleComment.id, cursor, descending=False))
+    result = await db.execute(
+        stmt.order_by(ArticleComment.created_at.asc(), ArticleComment.id.asc()).limit(limit + 1)
+    )
+    rows = list(result.scalars())
+
+    items = rows[:limit]
+    _decorate_comments(items)
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+    return items, next_cursor
+
+
+def _bump_comment_count(db: Session, article_id: int, delta: int) -> None:
+    # Никога под 0 – и при две паралелни изтривания на същия коментар.
+    db.query(Article).filter(Article.id == article_id).update(
+        {Article.comment_count: case((Article.comment_count + delta > 0, Article.comment_count + delta), else_=0)},
+        synchronize_session=False,
     )
-    _decorate_comments(comments)
-    return comments
 
 
 def create_article_comment(
@@ -375,7 +556,7 @@ def create_article_comment(
     user: User,
     payload: ArticleCommentCreate,
 ) -> ArticleComment:
-    get_article_by_id(db, article_id, user)
+    ensure_article_visible(db, article_id, user)
     content = payload.content.strip()
     if not content:
         raise HTTPException(status_code=400, detail="Comment content is required")
@@ -386,7 +567,10 @@ def create_article_comment(
         content=content,
     )
     db.add(comment)
+    _bump_comment_count(db, article_id, 1)
     db.commit()
+    # comment_count е и в лентата, и в детайлите
+    invalidate_public_article(article_id)
     db.refresh(comment)
     comment = (
         db.query(ArticleComment)
@@ -405,7 +589,7 @@ def update_article_comment(
     user: User,
     payload: ArticleCommentUpdate,
 ) -> ArticleComment:
-    get_article_by_id(db, article_id, user)
+    ensure_article_visible(db, article_id, user)
     comment = (
         db.query(ArticleComment)
         .options(selectinload(ArticleComment.author))
@@ -424,13 +608,14 @@ def update_article_comment(
     comment.content = content
     comment.updated_at = datetime.utcnow()
     db.commit()
+    response_cache.invalidate(_comments_scope(article_id))
     db.refresh(comment)
     _decorate_comments([comment])
     return comment
 
 
 def delete_article_comment(db: Session, article_id: int, comment_id: int, user: User) -> None:
-    get_article_by_id(db, article_id, user)
+    ensure_article_visible(db, article_id, user)
     comment = (
         db.query(ArticleComment)
         .filter(ArticleComment.id == comment_id, ArticleComment.article_id == article_id)
@@ -441,6 +626,9 @@ def delete_article_comment(db: Session, article_id: int, comment_id: int, user:
     if not _can_manage_comment(comment, user):
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
-    db.delete(comment)
+    removed = db.query(ArticleComment).filter(ArticleComment.id == comment.id).delete(synchronize_session=False)
+    if removed:
+        _bump_comment_count(db, article_id, -1)
     db.commit()
+    invalidate_public_article(article_id)
 
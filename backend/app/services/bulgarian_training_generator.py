@@ -83,6 +83,7 @@ def _drill_to_dict(drill: Any) -> Dict[str, Any]:
         "age_max": _get_field(drill, "age_max", "ageMax"),
         "videoUrls": _get_field(drill, "videoUrls", "video_urls"),
         "imageUrls": _get_field(drill, "imageUrls", "image_urls"),
+        "hasValidVideo": _get_field(drill, "hasValidVideo", "has_valid_video"),
         "rpe": _get_field(drill, "rpe"),
         "intensity_type": _safe_str(_get_field(drill, "intensity_type", "intensityType")),
         "complexity_level": _safe_str(_get_field(drill, "complexity_level", "complexityLevel")),
@@ -285,6 +286,10 @@ def _phase_duration_ok(target_phase: str, duration_target: Optional[float]) -> b
 
 
 def _has_valid_video(drill: Dict[str, Any]) -> bool:
+    # Материализирано в drills.has_valid_video; парсваме URL-ите само ако липсва.
+    precomputed = drill.get("hasValidVideo")
+    if precomputed is not None:
+        return bool(precomputed)
     videos = drill.get("videoUrls")
     if videos is None:
         return False
@@ -0,0 +1,36 @@
+from sqlalchemy.orm import Session
+
+from app.models import User, UserRole
+
+
+def renumber_club_coaches(db: Session, *club_ids) -> None:
+    """
+    Преизчислява User.coach_number ("Треньор №N" – поредност по id в клуба) за дадените
+    клубове. Вика се при всяка промяна на треньорите; не commit-ва.
+    """
+    db.flush()
+    for club_id in {cid for cid in club_ids if cid is not None}:
+        coaches = (
+            db.query(User)
+            .filter(User.role == UserRole.coach, User.club_id == club_id)
+            .order_by(User.id.asc())
+            .all()
+        )
+        for number, coach in enumerate(coaches, start=1):
+            if coach.coach_number != number:
+                coach.coach_number = number
+
+
+def backfill_coach_numbers(db: Session) -> int:
+    """Попълва coach_number за клубовете, в които има треньор без номер. Връща броя клубове."""
+    club_ids = [
+        row[0]
+        for row in db.query(User.club_id)
+        .filter(User.role == UserRole.coach, User.club_id.isnot(None), User.coach_number.is_(None))
+        .distinct()
+        .all()
+    ]
+    if club_ids:
+        renumber_club_coaches(db, *club_ids)
+        db.commit()
+    return len(club_ids)
@@ -0,0 +1,146 @@
+from hashlib import sha1
+from pathlib import Path
+from urllib.parse import urlparse
+
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import Drill, DrillMedia
+
+try:
+    from PIL import Image
+except ImportError:  # Зависимост на проекта; без нея (счупена инсталация) няма thumbnails, startup предупреждава.
+    Image = None
+
+
+STATIC_DIR = Path(__file__).resolve().parents[1] / "static"
+THUMBNAIL_DIR = STATIC_DIR / "thumbnails" / "drills"
+THUMBNAIL_WIDTH = 320
+
+# Същите "празни" стойности, които генераторът игнорира в _has_valid_video.
+_MISSING_VALUES = {"няма данни", "-", "n/a", "unknown"}
+_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp"}
+
+
+def _as_list(raw) -> list[str]:
+    if raw is None:
+        return []
+    if isinstance(raw, list):
+        return [str(x).strip() for x in raw if str(x or "").strip()]
+    text = str(raw).strip()
+    return [text] if text else []
+
+
+def is_valid_media_url(url: str) -> bool:
+    value = str(url or "").strip().lower()
+    return bool(value) and value not in _MISSING_VALUES
+
+
+def media_provider(url: str) -> str:
+    value = str(url or "").strip()
+    if value.startswith("/static/") or value.startswith("static/"):
+        return "local"
+    host = (urlparse(value).hostname or "").lower()
+    if host.endswith("youtube.com") or host.endswith("youtu.be"):
+        return "youtube"
+    return "other"
+
+
+def sync_drill_media(drill: Drill) -> None:
+    """
+    Пресъздава DrillMedia редовете от image_urls/video_urls и обновява drill.has_valid_video.
+    Вече генерирани thumbnails за непроменени URL-и се запазват. Не commit-ва.
+    """
+    existing_thumbs = {(m.kind, m.url): m.thumbnail_url for m in (drill.media or []) if m.thumbnail_url}
+
+    items: list[DrillMedia] = []
+    for kind, urls in (("image", _as_list(drill.image_urls)), ("video", _as_list(drill.video_urls))):
+        for position, url in enumerate(urls):
+            items.append(
+                DrillMedia(
+                    kind=kind,
+                    position=position,
+                    url=url[:1000],
+                    provider=media_provider(url),
+                    is_valid=is_valid_media_url(url),
+                    thumbnail_url=existing_thumbs.get((kind, url[:1000])),
+                )
+            )
+
+    drill.media = items
+    drill.has_valid_video = any(m.kind == "video" and m.is_valid for m in items)
+
+
+def needs_thumbnails(drill: Drill) -> bool:
+    return any(
+        m.kind == "image" and m.provider == "local" and m.is_valid and not m.thumbnail_url
+        for m in (drill.media or [])
+    )
+
+
+def _make_thumbnail(drill_id: int, url: str) -> str | None:
+    source = STATIC_DIR.parent / url.lstrip("/")
+    if Image is None or Path(url).suffix.lower() not in _IMAGE_EXTENSIONS or not source.is_file():
+        return None
+
+    target_dir = THUMBNAIL_DIR / str(drill_id)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    file_name = f"{sha1(url.encode('utf-8')).hexdigest()[:16]}.webp"
+    target = target_dir / file_name
+    if not target.exists():
+        try:
+            with Image.open(source) as img:
+                img.thumbnail((THUMBNAIL_WIDTH, THUMBNAIL_WIDTH * 4))
+                img.convert("RGB").save(target, "WEBP", quality=80)
+        except Exception as e:
+            print(f"⚠️ Thumbnail failed for drill {drill_id} ({url}): {e}")
+            return None
+    return f"/static/thumbnails/drills/{drill_id}/{file_name}"
+
+
+def generate_drill_thumbnails(drill_id: int) -> None:
+    """
+    Background task: прави thumbnails за локалните снимки на упражнението.
+    Отваря собствена сесия, защото върви след като request-ът е приключил.
+    """
+    db = SessionLocal()
+    try:
+        media = (
+            db.query(DrillMedia)
+            .filter(
+                DrillMedia.drill_id == drill_id,
+                DrillMedia.kind == "image",
+                DrillMedia.provider == "local",
+                DrillMedia.is_valid.is_(True),
+                DrillMedia.thumbnail_url.is_(None),
+            )
+            .all()
+        )
+        changed = False
+        for item in media:
+            thumb = _make_thumbnail(drill_id, item.url)
+            if thumb:
+                item.thumbnail_url = thumb
+                changed = True
+        if changed:
+            db.commit()
+    finally:
+        db.close()
+
+
+def backfill_drill_media(db: Session, batch_size: int = 200) -> list[int]:
+    """
+    Материализира медията за упражнения, които още нямат has_valid_video.
+    Връща id-тата, за които има локални снимки без thumbnail.
+    """
+    pending_thumbs: list[int] = []
+    while True:
+        drills = db.query(Drill).filter(Drill.has_valid_video.is_(None)).limit(batch_size).all()
+        if not drills:
+            break
+        for drill in drills:
+            sync_drill_media(drill)
+            if needs_thumbnails(drill):
+                pending_thumbs.append(drill.id)
+        db.commit()
+    return pending_thumbs
@@ -0,0 +1,228 @@
+import re
+import weakref
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+# Индексът се поддържа от самата база: в SQLite с тригери върху FTS5 таблица,
+# в PostgreSQL с генерирани tsvector колони + GIN.
+# Единственото място с тази схема – миграция 8e5a1c7d3f20 и init_db (SQLite) ползват
+# същите константи. Промяна тук изисква нова миграция: стари бази имат IF NOT EXISTS обектите.
+# Темите са на rowid = id * 2, отговорите на id * 2 + 1 – update/delete са по rowid.
+
+# 'simple' конфигурацията няма стеминг, но работи еднакво за български и латиница.
+PG_SEARCH_VECTORS = {
+    "forum_posts": (
+        "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(content, '')), 'B')"
+    ),
+    "forum_replies": "setweight(to_tsvector('simple', coalesce(content, '')), 'B')",
+}
+
+SQLITE_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS forum_search USING fts5(
+        title, body, post_id UNINDEXED, reply_id UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS forum_posts_search_ai AFTER INSERT ON forum_posts BEGIN
+        INSERT INTO forum_search(rowid, title, body, post_id, reply_id)
+        VALUES (new.id * 2, new.title, new.content, new.id, NULL);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS forum_posts_search_au AFTER UPDATE OF title, content ON forum_posts BEGIN
+        UPDATE forum_search SET title = new.title, body = new.content WHERE rowid = new.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS forum_posts_search_ad AFTER DELETE ON forum_posts BEGIN
+        DELETE FROM forum_search WHERE rowid = old.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS forum_replies_search_ai AFTER INSERT ON forum_replies BEGIN
+        INSERT INTO forum_search(rowid, title, body, post_id, reply_id)
+        VALUES (new.id * 2 + 1, '', new.content, new.post_id, new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS forum_replies_search_au AFTER UPDATE OF content ON forum_replies BEGIN
+        UPDATE forum_search SET body = new.content WHERE rowid = new.id * 2 + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS forum_replies_search_ad AFTER DELETE ON forum_replies BEGIN
+        DELETE FROM forum_search WHERE rowid = old.id * 2 + 1;
+    END
+    """,
+]
+
+SQLITE_SEARCH_TRIGGERS = [
+    "forum_posts_search_ai",
+    "forum_posts_search_au",
+    "forum_posts_search_ad",
+    "forum_replies_search_ai",
+    "forum_replies_search_au",
+    "forum_replies_search_ad",
+]
+
+SQLITE_SEARCH_BACKFILL = [
+    """
+    INSERT INTO forum_search(rowid, title, body, post_id, reply_id)
+    SELECT id * 2, title, content, id, NULL FROM forum_posts
+    """,
+    """
+    INSERT INTO forum_search(rowid, title, body, post_id, reply_id)
+    SELECT id * 2 + 1, '', content, post_id, id FROM forum_replies
+    """,
+]
+
+_HIGHLIGHT = "**"
+_SNIPPET_WORDS = 16
+# Засеченият backend е на engine (не на процес) – тестове и няколко engine-а не си го делят.
+_backend_cache: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def ensure_sqlite_search_index(conn) -> bool:
+    """Създава FTS5 таблицата и тригерите (идемпотентно). False ако SQLite е без FTS5."""
+    exists = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'forum_search'")
+    ).first()
+    try:
+        for statement in SQLITE_SEARCH_DDL:
+            conn.execute(text(statement))
+    except Exception as e:
+        print(f"⚠️ Forum full-text search disabled: {e}")
+        return False
+    if not exists:
+        for statement in SQLITE_SEARCH_BACKFILL:
+            conn.execute(text(statement))
+        print("✅ Forum search index built")
+    return True
+
+
+def _search_backend(db: Session) -> str | None:
+    bind = db.get_bind()
+    engine = getattr(bind, "engine", bind)
+    if engine in _backend_cache:
+        return _backend_cache[engine]
+
+    dialect = engine.dialect.name
+
+    backend = None
+    if dialect == "sqlite":
+        found = db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'forum_search'")
+        ).first()
+        backend = "fts5" if found else None
+    elif dialect == "postgresql":
+        found = db.execute(
+            text(
+                "SELECT 1 FROM information_schema.columns "
+                "WHERE table_name = 'forum_posts' AND column_name = 'search_vector'"
+            )
+        ).first()
+        backend = "tsvector" if found else None
+    _backend_cache[engine] = backend
+    return backend
+
+
+def _terms(query: str) -> list[str]:
+    # Само думи – потребителският вход никога не стига до MATCH/tsquery синтаксиса.
+    return re.findall(r"\w+", (query or "").lower())[:8]
+
+
+def _fts5_query(terms: list[str]) -> str:
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _tsquery(terms: list[str]) -> str:
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def matching_post_ids_sql(db: Session, query: str):
+    """
+    (SQL, params) за подзаявка с id-тата на темите, в които има съвпадение
+    (заглавие, текст или отговор), или None ако няма пълнотекстов индекс.
+    """
+    terms = _terms(query)
+    backend = _search_backend(db)
+    if not terms or backend is None:
+        return None
+    if backend == "fts5":
+        return "SELECT post_id FROM forum_search WHERE forum_search MATCH :fts_query", {
+            "fts_query": _fts5_query(terms)
+        }
+    return (
+        "SELECT id FROM forum_posts WHERE search_vector @@ to_tsquery('simple', :fts_query) "
+        "UNION SELECT post_id FROM forum_replies WHERE search_vector @@ to_tsquery('simple', :fts_query)",
+        {"fts_query": _tsquery(terms)},
+    )
+
+
+def search_hits(db: Session, query: str, limit: int = 20) -> list[dict]:
+    """
+    Подредени съвпадения [{post_id, reply_id, score, snippet}] – по едно (най-доброто) на тема.
+    По-висок score = по-добро съвпадение; заглавието тежи повече от текста.
+    """
+    terms = _terms(query)
+    backend = _search_backend(db)
+    if not terms or backend is None:
+        return []
+
+    scan = limit * 5
+    if backend == "fts5":
+        rows = db.execute(
+            text(
+                "SELECT post_id, reply_id, -bm25(forum_search, 5.0, 1.0) AS score, "
+                "snippet(forum_search, -1, :hl, :hl, '…', :words) AS snippet "
+                "FROM forum_search WHERE forum_search MATCH :fts_query "
+                "ORDER BY bm25(forum_search, 5.0, 1.0) LIMIT :scan"
+            ),
+            {"fts_query": _fts5_query(terms), "hl": _HIGHLIGHT, "words": _SNIPPET_WORDS, "scan": scan},
+        ).all()
+    else:
+        rows = db.execute(
+            text(
+                "SELECT hits.post_id, hits.reply_id, hits.score, "
+                "ts_headline('simple', hits.body, to_tsquery('simple', :fts_query), :headline) AS snippet "
+                "FROM ("
+                "  SELECT p.id AS post_id, NULL::integer AS reply_id, p.title || ' ' || p.content AS body, "
+                "         ts_rank(p.search_vector, to_tsquery('simple', :fts_query)) AS score "
+                "  FROM forum_posts p WHERE p.search_vector @@ to_tsquery('simple', :fts_query) "
+                "  UNION ALL "
+                "  SELECT r.post_id, r.id, r.content, "
+                "         ts_rank(r.search_vector, to_tsquery('simple', :fts_query)) * 0.8 "
+                "  FROM forum_replies r WHERE r.search_vector @@ to_tsquery('simple', :fts_query) "
+                "  ORDER BY 4 DESC LIMIT :scan"
+                ") hits ORDER BY hits.score DESC"
+            ),
+            {
+                "fts_query": _tsquery(terms),
+                "headline": f"StartSel={_HIGHLIGHT}, StopSel={_HIGHLIGHT}, MaxWords={_SNIPPET_WORDS}, MinWords=6",
+                "scan": scan,
+            },
+        ).all()
+
+    hits: list[dict] = []
+    seen: set[int] = set()
+    for post_id, reply_id, score, snippet in rows:
+        post_id = int(post_id)
+        if post_id in seen:
+            continue
+        seen.add(post_id)
+        hits.append(
+            {
+                "post_id": post_id,
+                "reply_id": int(reply_id) if reply_id is not None else None,
+                "score": float(score or 0.0),
+                "snippet": snippet or "",
+            }
+        )
+        if len(hits) >= limit:
+            break
+    return hits
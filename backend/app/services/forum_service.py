@@ -1,16 +1,22 @@
 from datetime import datetime
 import math
 from pathlib import Path
-from uuid import uuid4
 
-from fastapi import HTTPException
-from sqlalchemy.orm import Session, selectinload
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import Integer, case, column, func, literal, or_, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 
+from app.database import SessionLocal
+from app.pagination import encode_cursor, keyset_filter
 from app.models import (
     ForumNotification,
     ForumPost,
     ForumPostMedia,
     ForumPostSubscription,
+    ForumPostTag,
     ForumReply,
     User,
     UserRole,
@@ -22,6 +28,20 @@ from app.schemas.forum import (
     ForumReplyCreate,
     ForumReplyUpdate,
 )
+from app.pubsub import broker, connected_user_ids, user_channel
+from app.services.forum_search import matching_post_ids_sql, search_hits
+from app.services.media_storage import acquire_blob, blob_refs, media_url, purge_blobs, release_blobs
+from app.services.upload_service import delete_static_file, sanitize_filename, stage_upload
+
+
+REPLIES_PAGE_SIZE = 20
+# Предикатът на частичния unique индекс ux_forum_notifications_user_post_unread.
+UNREAD_NOTIFICATION_WHERE = "is_read = false"
+# Преди създаването на индекса: от дублираните непрочетени известия остава най-новото.
+FORUM_NOTIFICATIONS_DEDUPE_SQL = (
+    "DELETE FROM forum_notifications WHERE is_read = false AND id NOT IN ("
+    "SELECT MAX(id) FROM forum_notifications WHERE is_read = false GROUP BY user_id, post_id)"
+)
 
 
 def _role_value(user: User) -> str:
@@ -44,7 +64,6 @@ def _query_posts(db: Session):
     return db.query(ForumPost).options(
         selectinload(ForumPost.author),
         selectinload(ForumPost.media_items),
-        selectinload(ForumPost.replies).selectinload(ForumReply.author),
     )
 
 
@@ -61,43 +80,73 @@ def _normalize_tags(tags: list[str] | None) -> list[str]:
     return cleaned[:12]
 
 
-def _to_ts(dt_value) -> float:
-    if not dt_value:
-        return 0.0
-    try:
-        return float(dt_value.timestamp())
-    except Exception:
-        return 0.0
+def _sync_post_tags(post: ForumPost, tags: list[str] | None) -> None:
+    """Записва нормализираните тагове в post.tags и в forum_post_tags (diff, без commit)."""
+    normalized = _normalize_tags(tags)
+    post.tags = normalized
+    wanted = {t[:100] for t in normalized}
+    for item in list(post.tag_items):
+        if item.tag not in wanted:
+            post.tag_items.remove(item)
+    current = {item.tag for item in post.tag_items}
+    for tag in wanted - current:
+        post.tag_items.append(ForumPostTag(tag=tag))
+
+
+def _decremented(counter):
+    """counter - 1 в SQL, но никога под 0 (двоен unfollow, паралелно изтриване)."""
+    return case((counter > 0, counter - 1), else_=0)
+
+
+def _touch_post(post: ForumPost, now: datetime | None = None) -> None:
+    """Обновява updated_at; докато няма отговори, последната активност е самата тема."""
+    now = now or datetime.utcnow()
+    post.updated_at = now
+    if not post.reply_count:
+        post.last_activity_at = now
 
 
 def _decorate_post(db: Session, post: ForumPost, user: User) -> None:
     post.author_name = post.author.name if getattr(post, "author", None) else None
     post.tags = _normalize_tags(getattr(post, "tags", []))
-    post.media_count = len(getattr(post, "media_items", []) or [])
-    replies = list(getattr(post, "replies", []) or [])
-    post.replies_count = len(replies)
-    post.followers_count = db.query(ForumPostSubscription).filter(ForumPostSubscription.post_id == post.id).count()
+    post.replies_count = post.reply_count or 0
+    post.followers_count = post.follower_count or 0
     post.is_following = (
-        db.query(ForumPostSubscription)
+        db.query(ForumPostSubscription.id)
         .filter(ForumPostSubscription.post_id == post.id, ForumPostSubscription.user_id == user.id)
         .first()
         is not None
     )
 
-    last_reply_at = None
-    for reply in replies:
-        if getattr(reply, "author", None) is not None:
-            reply.author_name = reply.author.name
-        else:
-            reply.author_name = None
-        if reply.created_at and (last_reply_at is None or reply.created_at > last_reply_at):
-            last_reply_at = reply.created_at
 
-    post.last_activity_at = last_reply_at or post.updated_at or post.created_at
+def _tag_filter(tag: str):
+    tag_value = tag.strip().lower()[:100]
+    return ForumPost.id.in_(select(ForumPostTag.post_id).where(ForumPostTag.tag == tag_value))
 
 
-def list_posts(
-    db: Session,
+def _following_stmt(posts: list[ForumPost], user: User):
+    return select(ForumPostSubscription.post_id).where(
+        ForumPostSubscription.post_id.in_([post.id for post in posts]), ForumPostSubscription.user_id == user.id
+    )
+
+
+def _decorate_list_page(db: Session, posts: list[ForumPost], user: User) -> None:
+    """Броячите са колони в forum_posts – остава само една заявка за is_following на цялата страница."""
+    following_ids = set(db.execute(_following_stmt(posts, user)).scalars()) if posts else set()
+    _apply_list_decorations(posts, following_ids)
+
+
+def _apply_list_decorations(posts: list[ForumPost], following_ids: set[int]) -> None:
+    for post in posts:
+        post.author_name = post.author.name if getattr(post, "author", None) else None
+        post.tags = _normalize_tags(getattr(post, "tags", []))
+        post.replies_count = post.reply_count or 0
+        post.followers_count = post.follower_count or 0
+        post.is_following = post.id in following_ids
+
+
+async def list_posts(
+    db: AsyncSession,
     user: User,
     page: int = 1,
     page_size: int = 20,
@@ -112,54 +161,68 @@ def list_posts(
     safe_page = max(1, int(page))
     safe_page_size = max(1, min(int(page_size), 50))
 
-    q = _query_posts(db)
+    filters = []
     if category:
-        q = q.filter(ForumPost.category == category.strip())
-    if query:
-        search = f"%{query.strip()}%"
-        q = q.filter((ForumPost.title.ilike(search)) | (ForumPost.content.ilike(search)))
+        filters.append(ForumPost.category == category.strip())
+    if tag and tag.strip():
+        filters.append(_tag_filter(tag))
+    if query and query.strip():
+        # Изборът на пълнотекстовия backend е sync код – run_sync го пуска върху същата връзка.
+        matching = await db.run_sync(matching_post_ids_sql, query)
+        if matching is not None:
+            sql, params = matching
+            filters.append(ForumPost.id.in_(text(sql).bindparams(**params).columns(column("post_id", Integer))))
+        else:
+            # Без пълнотекстов индекс (напр. SQLite без FTS5) – стария ILIKE по темите.
+            search = f"%{query.strip()}%"
+            filters.append((ForumPost.title.ilike(search)) | (ForumPost.content.ilike(search)))
 
-    posts = q.order_by(ForumPost.is_pinned.desc(), ForumPost.updated_at.desc(), ForumPost.created_at.desc()).all()
-    if tag:
-        tag_value = tag.strip().lower()
-        posts = [p for p in posts if tag_value in _normalize_tags(getattr(p, "tags", []))]
-
-    for post in posts:
-        _decorate_post(db, post, user)
+    total = (await db.execute(select(func.count(ForumPost.id)).where(*filters))).scalar() or 0
 
+    # Сортирането и страницирането са в SQL върху денормализираните колони (виж индексите в модела).
+    order_by = [ForumPost.is_pinned.desc()]
     if sort_by == "most_replied":
-        posts.sort(
-            key=lambda p: (
-                0 if p.is_pinned else 1,
-                -(getattr(p, "replies_count", 0) or 0),
-                -_to_ts(getattr(p, "last_activity_at", None) or getattr(p, "updated_at", None) or getattr(p, "created_at", None)),
-            )
-        )
+        order_by += [ForumPost.reply_count.desc(), ForumPost.last_activity_at.desc()]
     elif sort_by == "newest":
-        posts.sort(
-            key=lambda p: (
-                0 if p.is_pinned else 1,
-                -_to_ts(getattr(p, "created_at", None)),
-            )
-        )
+        order_by += [ForumPost.created_at.desc()]
     else:
-        posts.sort(
-            key=lambda p: (
-                0 if p.is_pinned else 1,
-                -_to_ts(
-                    getattr(p, "last_activity_at", None)
-                    or getattr(p, "updated_at", None)
-                    or getattr(p, "created_at", None)
-                ),
+        order_by += [ForumPost.last_activity_at.desc()]
+    order_by.append(ForumPost.id.desc())
+
+    posts = list(
+        (
+            await db.execute(
+                select(ForumPost)
+                .options(joinedload(ForumPost.author))
+                .where(*filters)
+                .order_by(*order_by)
+                .offset((safe_page - 1) * safe_page_size)
+                .limit(safe_page_size)
             )
-        )
+        ).scalars()
+    )
+    following_ids = set((await db.execute(_following_stmt(posts, user))).scalars()) if posts else set()
+    _apply_list_decorations(posts, following_ids)
+
+    return posts, total
 
-    total = len(posts)
-    start = (safe_page - 1) * safe_page_size
-    end = start + safe_page_size
-    paged_items = posts[start:end]
 
-    return paged_items, total
+def search_posts(db: Session, user: User, query: str, limit: int = 20) -> list[dict]:
+    if not _can_participate(user):
+        raise HTTPException(status_code=403, detail="Forum access is allowed only for coaches and admins")
+
+    hits = search_hits(db, query, limit=max(1, min(int(limit), 50)))
+    if not hits:
+        return []
+    posts = (
+        db.query(ForumPost)
+        .options(joinedload(ForumPost.author))
+        .filter(ForumPost.id.in_([hit["post_id"] for hit in hits]))
+        .all()
+    )
+    _decorate_list_page(db, posts, user)
+    by_id = {post.id: post for post in posts}
+    return [{**hit, "post": by_id[hit["post_id"]]} for hit in hits if hit["post_id"] in by_id]
 
 
 def paginate_meta(page: int, page_size: int, total: int) -> dict:
@@ -186,13 +249,45 @@ def get_available_categories(db: Session, user: User) -> list[str]:
 def get_available_tags(db: Session, user: User) -> list[str]:
     if not _can_participate(user):
         raise HTTPException(status_code=403, detail="Forum access is allowed only for coaches and admins")
-    posts = db.query(ForumPost.tags).all()
-    tags: set[str] = set()
-    for post in posts:
-        raw_tags = post[0] if isinstance(post, tuple) else getattr(post, "tags", None)
-        for t in _normalize_tags(raw_tags):
-            tags.add(t)
-    return sorted(tags)
+    rows = db.query(ForumPostTag.tag).distinct().order_by(ForumPostTag.tag.asc()).all()
+    return [row[0] for row in rows]
+
+
+def get_tag_counts(db: Session, user: User, limit: int = 50) -> list[dict]:
+    if not _can_participate(user):
+        raise HTTPException(status_code=403, detail="Forum access is allowed only for coaches and admins")
+    post_count = func.count(ForumPostTag.post_id)
+    rows = (
+        db.query(ForumPostTag.tag, post_count)
+        .group_by(ForumPostTag.tag)
+        .order_by(post_count.desc(), ForumPostTag.tag.asc())
+        .limit(max(1, min(int(limit), 200)))
+        .all()
+    )
+    return [{"tag": tag, "count": int(count)} for tag, count in rows]
+
+
+def backfill_post_tags(db: Session, batch_size: int = 200) -> int:
+    """Попълва forum_post_tags от JSON колоната tags. Връща броя обработени теми."""
+    processed = 0
+    last_id = 0
+    while True:
+        posts = (
+            db.query(ForumPost)
+            .options(selectinload(ForumPost.tag_items))
+            .filter(ForumPost.id > last_id)
+            .order_by(ForumPost.id.asc())
+            .limit(batch_size)
+            .all()
+        )
+        if not posts:
+            break
+        for post in posts:
+            _sync_post_tags(post, post.tags)
+            processed += 1
+        last_id = posts[-1].id
+        db.commit()
+    return processed
 
 
 def get_post(db: Session, post_id: int, user: User) -> ForumPost:
@@ -204,9 +299,38 @@ def get_post(db: Session, post_id: int, user: User) -> ForumPost:
         raise HTTPException(status_code=404, detail="Forum topic not found")
 
     _decorate_post(db, post, user)
+    # Само първата страница отговори – останалите идват от list_replies по cursor.
+    post.first_replies, post.replies_next_cursor = _replies_page(db, post.id, REPLIES_PAGE_SIZE)
     return post
 
 
+def _replies_page(
+    db: Session, post_id: int, limit: int, cursor: str | None = None
+) -> tuple[list[ForumReply], str | None]:
+    q = db.query(ForumReply).options(joinedload(ForumReply.author)).filter(ForumReply.post_id == post_id)
+    if cursor:
+        q = q.filter(keyset_filter(ForumReply.created_at, ForumReply.id, cursor, descending=False))
+    rows = q.order_by(ForumReply.created_at.asc(), ForumReply.id.asc()).limit(limit + 1).all()
+
+    items = rows[:limit]
+    for reply in items:
+        reply.author_name = reply.author.name if getattr(reply, "author", None) is not None else None
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+    return items, next_cursor
+
+
+def list_replies(
+    db: Session, post_id: int, user: User, cursor: str | None = None, limit: int = REPLIES_PAGE_SIZE
+) -> tuple[list[ForumReply], str | None]:
+    if not _can_participate(user):
+        raise HTTPException(status_code=403, detail="Forum access is allowed only for coaches and admins")
+    if db.query(ForumPost.id).filter(ForumPost.id == post_id).first() is None:
+        raise HTTPException(status_code=404, detail="Forum topic not found")
+    return _replies_page(db, post_id, max(1, min(int(limit), 100)), cursor)
+
+
 def create_post(db: Session, user: User, payload: ForumPostCreate) -> ForumPost:
     if not _can_participate(user):
         raise HTTPException(status_code=403, detail="Forum access is allowed only for coaches and admins")
@@ -217,8 +341,14 @@ def create_post(db: Session, user: User, payload: ForumPostCreate) -> ForumPost:
         raise HTTPException(status_code=400, detail="Title and content are required")
 
     category = (payload.category or "").strip() or None
-    tags = _normalize_tags(payload.tags)
-    post = ForumPost(title=title, content=content, category=category, tags=tags, author_id=user.id)
+    post = ForumPost(
+        title=title,
+        content=content,
+        category=category,
+        author_id=user.id,
+        follower_count=1,
+    )
+    _sync_post_tags(post, payload.tags)
     db.add(post)
     db.commit()
     db.add(ForumPostSubscription(post_id=post.id, user_id=user.id))
@@ -226,64 +356,55 @@ def create_post(db: Session, user: User, payload: ForumPostCreate) -> ForumPost:
     return get_post(db, post.id, user)
 
 
-def add_post_media(
-    db: Session,
-    post_id: int,
-    user: User,
-    file_name: str,
-    mime_type: str,
-    size_bytes: int,
-    content: bytes,
-) -> ForumPostMedia:
+ALLOWED_MEDIA_EXTENSIONS = {
+    ".jpg",
+    ".jpeg",
+    ".png",
+    ".webp",
+    ".gif",
+    ".mp4",
+    ".webm",
+    ".mov",
+    ".avi",
+    ".pdf",
+    ".docx",
+    ".pptx",
+    ".xlsx",
+    ".zip",
+}
+
+
+def add_post_media(db: Session, post_id: int, user: User, upload: UploadFile) -> ForumPostMedia:
     post = db.query(ForumPost).filter(ForumPost.id == post_id).first()
     if not post:
         raise HTTPException(status_code=404, detail="Forum topic not found")
     if post.author_id != user.id and not _is_admin(user):
         raise HTTPException(status_code=403, detail="Only the author or admin can upload files")
 
-    safe_name = Path(file_name or "file").name.replace(" ", "_")
-    if size_bytes <= 0:
-        raise HTTPException(status_code=400, detail="Empty file")
-    if size_bytes > 50 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="File size exceeds 50MB limit")
-
-    ext = Path(safe_name).suffix.lower()
-    allowed_ext = {
-        ".jpg",
-        ".jpeg",
-        ".png",
-        ".webp",
-        ".gif",
-        ".mp4",
-        ".webm",
-        ".mov",
-        ".avi",
-        ".pdf",
-        ".docx",
-        ".pptx",
-        ".xlsx",
-        ".zip",
-    }
-    if ext not in allowed_ext:
+    if Path(sanitize_filename(upload.filename)).suffix.lower() not in ALLOWED_MEDIA_EXTENSIONS:
         raise HTTPException(status_code=400, detail="Unsupported file type")
 
-    final_name = f"{uuid4().hex}_{safe_name}"
-    storage_dir = Path(__file__).resolve().parents[1] / "static" / "uploads" / "forum" / str(post_id)
-    storage_dir.mkdir(parents=True, exist_ok=True)
-    file_path = storage_dir / final_name
-    file_path.write_bytes(content)
-
-    public_url = f"/static/uploads/forum/{post_id}/{final_name}"
-    media = ForumPostMedia(
-        post_id=post_id,
-        url=public_url,
-        name=safe_name,
-        mime_type=mime_type or "application/octet-stream",
-        size=size_bytes,
-    )
-    db.add(media)
-    post.updated_at = datetime.utcnow()
-    db.commit()
+    staged = stage_upload(upload, allow_empty=False)
+    try:
+        acquire_blob(db, staged.sha256, staged.path, staged.size, staged.mime_type)
+        media = ForumPostMedia(
+            post_id=post_id,
+            url=media_url(staged.sha256, staged.name),
+            name=staged.name,
+            mime_type=staged.mime_type,
+            size=staged.size,
+            content_sha256=staged.sha256,
+        )
+        db.add(media)
+        post.media_count = ForumPost.media_count + 1
+        _touch_post(post)
+        db.commit()
+    except Exception:
+        db.rollback()
+        purge_blobs(db, [staged.sha256])
+        raise
+    finally:
+        staged.discard()
     db.refresh(media)
     return media
 
@@ -299,15 +420,20 @@ def delete_post_media(db: Session, post_id: int, media_id: int, user: User) -> N
     if not media:
         raise HTTPException(status_code=404, detail="Forum media not found")
 
-    if media.url.startswith("/static/"):
-        local_path = Path(__file__).resolve().parents[1] / media.url.lstrip("/")
-        if local_path.exists():
-            local_path.unlink()
-
-    db.delete(media)
-    post.updated_at = datetime.utcnow()
+    # Броячът и blob референциите се свалят само ако точно този DELETE е махнал реда.
+    removed = db.query(ForumPostMedia).filter(ForumPostMedia.id == media.id).delete(synchronize_session=False)
+    if not removed:
+        db.rollback()
+        return
+    orphaned = release_blobs(db, blob_refs(media))
+    post.media_count = _decremented(ForumPost.media_count)
+    _touch_post(post)
     db.commit()
 
+    purge_blobs(db, orphaned)
+    if not media.content_sha256:
+        delete_static_file(media.url)
+
 
 def update_post(db: Session, post_id: int, user: User, payload: ForumPostUpdate) -> ForumPost:
     post = db.query(ForumPost).filter(ForumPost.id == post_id).first()
@@ -332,9 +458,9 @@ def update_post(db: Session, post_id: int, user: User, payload: ForumPostUpdate)
         category = (data.get("category") or "").strip()
         post.category = category or None
     if "tags" in data:
-        post.tags = _normalize_tags(data.get("tags"))
+        _sync_post_tags(post, data.get("tags"))
 
-    post.updated_at = datetime.utcnow()
+    _touch_post(post)
     db.commit()
     return get_post(db, post_id, user)
 
@@ -347,9 +473,16 @@ def delete_post(db: Session, post_id: int, user: User) -> None:
     if post.author_id != user.id and not _is_admin(user):
         raise HTTPException(status_code=403, detail="Only the author or admin can delete this topic")
 
+    media_items = list(post.media_items)
+    orphaned = release_blobs(db, [sha for item in media_items for sha in blob_refs(item)])
     db.delete(post)
     db.commit()
 
+    purge_blobs(db, orphaned)
+    for item in media_items:
+        if not item.content_sha256:
+            delete_static_file(item.url)
+
 
 def create_reply(db: Session, post_id: int, user: User, payload: ForumReplyCreate) -> ForumReply:
     if not _can_participate(user):
@@ -367,32 +500,136 @@ def create_reply(db: Session, post_id: int, user: User, payload: ForumReplyCreat
 
     reply = ForumReply(post_id=post_id, content=content, author_id=user.id)
     db.add(reply)
-    post.updated_at = datetime.utcnow()
+    now = datetime.utcnow()
+    post.updated_at = now
+    post.last_activity_at = now
+    post.reply_count = ForumPost.reply_count + 1
+
+    is_following = (
+        db.query(ForumPostSubscription.id)
+        .filter(ForumPostSubscription.post_id == post_id, ForumPostSubscription.user_id == user.id)
+        .first()
+        is not None
+    )
+    if not is_following:
+        db.add(ForumPostSubscription(post_id=post_id, user_id=user.id))
+        post.follower_count = ForumPost.follower_count + 1
+
+    # Известията се раздават от fan_out_reply_notifications след отговора на request-а.
     db.commit()
     db.refresh(reply)
     reply.author_name = user.name
+    return reply
 
-    recipient_ids = set()
-    if post.author_id and post.author_id != user.id:
-        recipient_ids.add(post.author_id)
-    subs = db.query(ForumPostSubscription).filter(ForumPostSubscription.post_id == post_id).all()
-    for sub in subs:
-        if sub.user_id != user.id:
-            recipient_ids.add(sub.user_id)
-    if not any(sub.user_id == user.id for sub in subs):
-        db.add(ForumPostSubscription(post_id=post_id, user_id=user.id))
-    for recipient_id in recipient_ids:
-        db.add(
-            ForumNotification(
-                user_id=recipient_id,
-                post_id=post_id,
-                reply_id=reply.id,
-                message=f"Нов отговор в тема \"{post.title}\" от {user.name}",
-                is_read=False,
-            )
+
+def fan_out_reply_notifications(reply_id: int) -> None:
+    """
+    Background task: известия за нов отговор до автора на темата и последователите ѝ.
+    Един bulk INSERT ... SELECT независимо от броя получатели; вече непрочетено известие
+    за темата (unique по user_id, post_id сред непрочетените) се обновява през ON CONFLICT –
+    и два паралелни fan-out-а за същата тема не могат да създадат дубликат.
+    """
+    db = SessionLocal()
+    try:
+        row = (
+            db.query(ForumReply.post_id, ForumReply.author_id, ForumPost.title, ForumPost.author_id, User.name)
+            .join(ForumPost, ForumPost.id == ForumReply.post_id)
+            .outerjoin(User, User.id == ForumReply.author_id)
+            .filter(ForumReply.id == reply_id)
+            .first()
         )
-    db.commit()
-    return reply
+        if not row:
+            return
+        post_id, replier_id, title, post_author_id, replier_name = row
+        now = datetime.utcnow()
+
+        followers = select(ForumPostSubscription.user_id).where(ForumPostSubscription.post_id == post_id)
+        recipients = select(
+            User.id,
+            literal(post_id),
+            literal(reply_id),
+            literal(f"Нов отговор в тема \"{title}\" от {replier_name}"[:400]),
+            literal(False),
+            literal(now),
+        ).where(
+            or_(User.id.in_(followers), User.id == post_author_id),
+            # Авторът на отговора може да е NULL (изтрит потребител) – != NULL би изключил всички.
+            User.id.is_distinct_from(replier_id),
+        )
+        insert_stmt = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+        stmt = insert_stmt(ForumNotification).from_select(
+            ["user_id", "post_id", "reply_id", "message", "is_read", "created_at"],
+            recipients,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ForumNotification.user_id, ForumNotification.post_id],
+            index_where=text(UNREAD_NOTIFICATION_WHERE),
+            set_={
+                "reply_id": stmt.excluded.reply_id,
+                "message": literal(f"Нови отговори в тема \"{title}\" (последен от {replier_name})"[:400]),
+                "created_at": stmt.excluded.created_at,
+            },
+        )
+        db.execute(stmt)
+        db.commit()
+        _push_reply_event(db, reply_id, post_id, title, replier_id, replier_name, post_author_id, now)
+    finally:
+        db.close()
+
+
+def _push_reply_event(
+    db: Session,
+    reply_id: int,
+    post_id: int,
+    title: str,
+    replier_id: int,
+    replier_name: str | None,
+    post_author_id: int | None,
+    created_at: datetime,
+) -> None:
+    """
+    Push към свързаните в момента получатели – без заявки, ако никой не слуша.
+    Ако брокерът не знае кой е свързан (няколко worker-а), пращаме на всички последователи.
+    """
+    connected = connected_user_ids()
+    if connected is not None:
+        connected = connected - {replier_id}
+        if not connected:
+            return
+    followers = db.query(ForumPostSubscription.user_id).filter(ForumPostSubscription.post_id == post_id)
+    if connected is not None:
+        followers = followers.filter(ForumPostSubscription.user_id.in_(connected))
+    recipient_ids = {row[0] for row in followers.all()}
+    if post_author_id is not None and (connected is None or post_author_id in connected):
+        recipient_ids.add(post_author_id)
+    recipient_ids.discard(replier_id)
+
+    event = {
+        "type": "reply",
+        "post_id": post_id,
+        "post_title": title,
+        "reply_id": reply_id,
+        "author_name": replier_name,
+        "created_at": created_at.isoformat(),
+    }
+    for recipient_id in recipient_ids:
+        broker.publish(user_channel(recipient_id), event)
+    _push_unread_counts(db, recipient_ids)
+
+
+def _push_unread_counts(db: Session, user_ids: set[int]) -> None:
+    connected = connected_user_ids()
+    user_ids = set(user_ids) if connected is None else set(user_ids) & connected
+    if not user_ids:
+        return
+    counts = dict(
+        db.query(ForumNotification.user_id, func.count(ForumNotification.id))
+        .filter(ForumNotification.user_id.in_(user_ids), ForumNotification.is_read.is_(False))
+        .group_by(ForumNotification.user_id)
+        .all()
+    )
+    for user_id in user_ids:
+        broker.publish(user_channel(user_id), {"type": "unread_count", "unread_count": int(counts.get(user_id, 0))})
 
 
 def set_follow_post(db: Session, post_id: int, user: User, follow: bool) -> dict:
@@ -407,24 +644,33 @@ def set_follow_post(db: Session, post_id: int, user: User, follow: bool) -> dict
     )
     if follow and not existing:
         db.add(ForumPostSubscription(post_id=post_id, user_id=user.id))
+        post.follower_count = ForumPost.follower_count + 1
         db.commit()
     if not follow and existing:
-        db.delete(existing)
+        removed = (
+            db.query(ForumPostSubscription)
+            .filter(ForumPostSubscription.id == existing.id)
+            .delete(synchronize_session=False)
+        )
+        if removed:
+            post.follower_count = _decremented(ForumPost.follower_count)
         db.commit()
 
-    followers_count = db.query(ForumPostSubscription).filter(ForumPostSubscription.post_id == post_id).count()
-    is_following = (
-        db.query(ForumPostSubscription)
-        .filter(ForumPostSubscription.post_id == post_id, ForumPostSubscription.user_id == user.id)
-        .first()
-        is not None
+    return {"post_id": post_id, "is_following": follow, "followers_count": post.follower_count or 0}
+
+
+def unread_notifications_count(db: Session, user_id: int) -> int:
+    return (
+        db.query(func.count(ForumNotification.id))
+        .filter(ForumNotification.user_id == user_id, ForumNotification.is_read.is_(False))
+        .scalar()
+        or 0
     )
-    return {"post_id": post_id, "is_following": is_following, "followers_count": followers_count}
 
 
 def list_notifications(db: Session, user: User, limit: int = 20) -> tuple[list[ForumNotification], int]:
     safe_limit = max(1, min(int(limit), 50))
-    unread_count = db.query(ForumNotification).filter(ForumNotification.user_id == user.id, ForumNotification.is_read.is_(False)).count()
+    unread_count = unread_notifications_count(db, user.id)
     items = (
         db.query(ForumNotification)
         .filter(ForumNotification.user_id == user.id)
@@ -446,6 +692,7 @@ def mark_notification_read(db: Session, notification_id: int, user: User) -> Non
     if not item.is_read:
         item.is_read = True
         db.commit()
+        _push_unread_counts(db, {user.id})
 
 
 def mark_all_notifications_read(db: Session, user: User) -> None:
@@ -453,6 +700,7 @@ def mark_all_notifications_read(db: Session, user: User) -> None:
     for item in items:
         item.is_read = True
     db.commit()
+    _push_unread_counts(db, {user.id})
 
 
 def update_reply(db: Session, post_id: int, reply_id: int, user: User, payload: ForumReplyUpdate) -> ForumReply:
@@ -475,7 +723,7 @@ def update_reply(db: Session, post_id: int, reply_id: int, user: User, payload:
     reply.updated_at = datetime.utcnow()
 
     if post:
-        post.updated_at = datetime.utcnow()
+        _touch_post(post)
 
     db.commit()
     db.refresh(reply)
@@ -495,10 +743,14 @@ def delete_reply(db: Session, post_id: int, reply_id: int, user: User) -> None:
     if post and bool(getattr(post, "is_locked", False)) and not _is_admin(user):
         raise HTTPException(status_code=400, detail="Topic is locked")
 
-    db.delete(reply)
+    removed = db.query(ForumReply).filter(ForumReply.id == reply.id).delete(synchronize_session=False)
 
-    if post:
-        post.updated_at = datetime.utcnow()
+    if post and removed:
+        now = datetime.utcnow()
+        last_reply_at = db.query(func.max(ForumReply.created_at)).filter(ForumReply.post_id == post_id).scalar()
+        post.updated_at = now
+        post.reply_count = _decremented(ForumPost.reply_count)
+        post.last_activity_at = last_reply_at or now
 
     db.commit()
 
@@ -516,7 +768,7 @@ def moderate_post(db: Session, post_id: int, user: User, payload: ForumPostModer
         post.is_pinned = bool(data["is_pinned"])
     if "is_locked" in data:
         post.is_locked = bool(data["is_locked"])
-    post.updated_at = datetime.utcnow()
+    _touch_post(post)
 
     db.commit()
     return get_post(db, post_id, user)
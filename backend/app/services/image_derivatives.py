@@ -0,0 +1,169 @@
+import base64
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from pathlib import Path
+from threading import Lock
+from uuid import uuid4
+
+from app.database import SessionLocal
+from app.services.media_storage import acquire_blob, media_storage, media_url, purge_blobs
+from app.settings import settings
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Зависимост на проекта; без нея (счупена инсталация) – само оригиналът, startup предупреждава.
+    Image = None
+
+
+PLACEHOLDER_WIDTH = 16
+# Анимации и векторни формати не ги прекодираме.
+_SKIPPED_MIME_TYPES = {"image/gif", "image/svg+xml"}
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = Lock()
+
+
+def pillow_available() -> bool:
+    return Image is not None
+
+
+def needs_derivatives(media) -> bool:
+    mime_type = (media.mime_type or "").lower()
+    return bool(media.content_sha256) and mime_type.startswith("image/") and mime_type not in _SKIPPED_MIME_TYPES
+
+
+def _encode(img, fmt: str, quality: int) -> bytes:
+    buffer = BytesIO()
+    if fmt == "JPEG":
+        img = img.convert("RGB")
+    img.save(buffer, fmt, quality=quality)
+    return buffer.getvalue()
+
+
+def render_derivatives(source: str, out_dir: str, widths: tuple[int, ...]) -> dict:
+    """
+    Върви в process pool-а: намалени копия (WebP, JPEG ако Pillow е без WebP) с ширина до
+    всяка от widths – без уголемяване – и LQIP placeholder като data URI. Файловете се
+    записват в out_dir; връща техните метаданни, за да ги качи родителският процес.
+    """
+    fmt, mime_type, suffix = ("WEBP", "image/webp", ".webp") if features.check("webp") else ("JPEG", "image/jpeg", ".jpg")
+    items = []
+    with Image.open(source) as original:
+        img = ImageOps.exif_transpose(original)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+
+        targets = sorted({min(int(width), img.width) for width in widths if int(width) > 0})
+        for width in targets:
+            height = max(1, round(img.height * width / img.width))
+            resized = img if width == img.width else img.resize((width, height), Image.LANCZOS)
+            data = _encode(resized, fmt, quality=80)
+            path = Path(out_dir) / f"{uuid4().hex}{suffix}"
+            path.write_bytes(data)
+            items.append(
+                {
+                    "width": width,
+                    "height": height,
+                    "path": str(path),
+                    "sha256": hashlib.sha256(data).hexdigest(),
+                    "size": len(data),
+                    "mime_type": mime_type,
+                }
+            )
+
+        tiny_height = max(1, round(img.height * PLACEHOLDER_WIDTH / img.width))
+        tiny = img.resize((PLACEHOLDER_WIDTH, tiny_height), Image.BILINEAR)
+        placeholder = base64.b64encode(_encode(tiny, fmt, quality=40)).decode("ascii")
+
+    return {"items": items, "placeholder": f"data:{mime_type};base64,{placeholder}"}
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn, не fork – родителят е многонишков (uvicorn, threadpool).
+            _executor = ProcessPoolExecutor(
+                max_workers=max(1, settings.image_workers),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def _reset_executor(broken: ProcessPoolExecutor) -> None:
+    # Умрял worker чупи целия pool – следващата задача ще създаде нов.
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def generate_image_derivatives(media_model, media_id: int) -> None:
+    """
+    Background task след качване: прекодирането е в process pool-а (не държи GIL-а на
+    API процеса), а производните файлове стават blob-ове като оригинала и се записват в
+    media.derivatives / media.placeholder. Отваря собствена сесия.
+    """
+    if Image is None:
+        return
+
+    db = SessionLocal()
+    staged_paths: list[Path] = []
+    acquired: list[str] = []
+    try:
+        media = db.get(media_model, media_id)
+        if media is None or media.derivatives or not needs_derivatives(media):
+            return
+
+        out_dir = media_storage.staging_dir
+        out_dir.mkdir(parents=True, exist_ok=True)
+        executor = _get_executor()
+        try:
+            with media_storage.local_copy(media.content_sha256) as source:
+                future = executor.submit(
+                    render_derivatives, str(source), str(out_dir), tuple(settings.image_derivative_widths)
+                )
+                result = future.result()
+        except BrokenProcessPool as e:
+            _reset_executor(executor)
+            print(f"⚠️ Image derivatives failed for {media_model.__tablename__} {media_id}: {e}")
+            return
+        except Exception as e:
+            print(f"⚠️ Image derivatives failed for {media_model.__tablename__} {media_id}: {e}")
+            return
+
+        staged_paths = [Path(item["path"]) for item in result["items"]]
+        stem = Path(media.name).stem or "image"
+        derivatives = []
+        try:
+            for item in result["items"]:
+                if item["sha256"] in acquired:
+                    continue
+                acquire_blob(db, item["sha256"], Path(item["path"]), item["size"], item["mime_type"])
+                acquired.append(item["sha256"])
+                derivatives.append(
+                    {
+                        "width": item["width"],
+                        "height": item["height"],
+                        "url": media_url(item["sha256"], f"{stem}-{item['width']}w{Path(item['path']).suffix}"),
+                        "sha256": item["sha256"],
+                        "mime_type": item["mime_type"],
+                        "size": item["size"],
+                    }
+                )
+            media.derivatives = derivatives
+            media.placeholder = result["placeholder"]
+            # Ако редът е изтрит междувременно, commit-ът гърми и освобождаваме blob-овете.
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            purge_blobs(db, acquired)
+            print(f"⚠️ Image derivatives not saved for {media_model.__tablename__} {media_id}: {e}")
+    finally:
+        for path in staged_paths:
+            path.unlink(missing_ok=True)
+        db.close()
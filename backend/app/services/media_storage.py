@@ -0,0 +1,229 @@
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from uuid import uuid4
+from typing import Iterator
+from urllib.parse import quote
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models import MediaBlob
+from app.settings import settings
+
+try:
+    import boto3
+except ImportError:  # boto3 трябва само за S3 backend-а
+    boto3 = None
+
+
+STREAM_CHUNK_SIZE = 256 * 1024
+MEDIA_URL_PREFIX = "/api/media/"
+
+
+class LocalMediaStorage:
+    """Blob-ове като файлове root/ab/cd/<sha256> – без имена, едно копие на съдържание."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.staging_dir = root / "tmp"
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key[2:4] / key
+
+    def put(self, key: str, source: Path, content_type: str) -> None:
+        # Винаги записваме (атомарен rename): съществуващ файл може точно сега да се трие от purge.
+        target = self._path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source, target)
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[Path]:
+        yield self._path(key)
+
+    def iter_range(self, key: str, start: int, end: int) -> Iterator[bytes]:
+        """Байтове [start, end] включително."""
+        remaining = end - start + 1
+        with self._path(key).open("rb") as fh:
+            fh.seek(start)
+            while remaining > 0:
+                chunk = fh.read(min(STREAM_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+
+class S3MediaStorage:
+    """S3-съвместимо хранилище (AWS, MinIO като локален stand-in през s3_endpoint_url)."""
+
+    def __init__(self, bucket: str, staging_dir: Path):
+        if boto3 is None:
+            raise RuntimeError("S3 media storage requires boto3")
+        if not bucket:
+            raise RuntimeError("S3 media storage requires S3_BUCKET")
+        self.bucket = bucket
+        self.staging_dir = staging_dir
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=settings.s3_endpoint_url,
+            region_name=settings.s3_region,
+            aws_access_key_id=settings.s3_access_key_id,
+            aws_secret_access_key=settings.s3_secret_access_key,
+        )
+
+    @staticmethod
+    def _key(key: str) -> str:
+        return f"blobs/{key[:2]}/{key}"
+
+    def put(self, key: str, source: Path, content_type: str) -> None:
+        try:
+            self.client.upload_file(str(source), self.bucket, self._key(key), ExtraArgs={"ContentType": content_type})
+        finally:
+            source.unlink(missing_ok=True)
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[Path]:
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        target = self.staging_dir / f"{uuid4().hex}.src"
+        try:
+            self.client.download_file(self.bucket, self._key(key), str(target))
+            yield target
+        finally:
+            target.unlink(missing_ok=True)
+
+    def iter_range(self, key: str, start: int, end: int) -> Iterator[bytes]:
+        response = self.client.get_object(Bucket=self.bucket, Key=self._key(key), Range=f"bytes={start}-{end}")
+        yield from response["Body"].iter_chunks(STREAM_CHUNK_SIZE)
+
+
+def _create_storage():
+    root = Path(settings.storage_path).resolve() / "media"
+    if settings.media_storage_backend == "local":
+        return LocalMediaStorage(root)
+    if settings.media_storage_backend == "s3":
+        return S3MediaStorage(settings.s3_bucket, root / "tmp")
+    raise ValueError(f"Unsupported media storage backend: {settings.media_storage_backend}")
+
+
+media_storage = _create_storage()
+
+
+def media_url(sha256: str, name: str) -> str:
+    # Името е само за разширението/изтеглянето – съдържанието се намира по hash-а.
+    return f"{MEDIA_URL_PREFIX}{sha256}/{quote(name)}"
+
+
+def _locked_blob(db: Session, sha256: str):
+    return db.query(MediaBlob).filter(MediaBlob.sha256 == sha256).with_for_update().populate_existing().first()
+
+
+def acquire_blob(db: Session, sha256: str, source: Path, size: int, mime_type: str) -> MediaBlob:
+    """
+    +1 референция към съдържанието; ако е ново – качва source в хранилището.
+    source се консумира и в двата случая. Не commit-ва – върви в транзакцията на media реда.
+    Редът се заключва/вмъква преди файла да се пипне – така purge_blobs (който работи само
+    под същия ред) не може да изтрие файл, към който тази транзакция брои.
+    """
+    _ensure_transaction(db)
+    blob = _locked_blob(db, sha256)
+    if blob is None:
+        # Паралелно качване на същото ново съдържание може да вмъкне реда преди нас:
+        # INSERT-ът е в savepoint – при конфликт отменяме само него и броим към съществуващия ред.
+        try:
+            with db.begin_nested():
+                blob = MediaBlob(sha256=sha256, size=size, mime_type=mime_type, ref_count=1)
+                db.add(blob)
+        except IntegrityError:
+            blob = _locked_blob(db, sha256)
+            if blob is None:
+                raise
+        else:
+            media_storage.put(sha256, source, mime_type)
+            return blob
+
+    if (blob.ref_count or 0) <= 0:
+        # Ред без референции – файлът може вече да е изтрит.
+        media_storage.put(sha256, source, mime_type)
+    else:
+        source.unlink(missing_ok=True)
+    blob.ref_count = MediaBlob.ref_count + 1
+    return blob
+
+
+def _ensure_transaction(db: Session) -> None:
+    """
+    pysqlite отваря транзакция чак при първия DML – SAVEPOINT без нея става външна
+    транзакция и RELEASE commit-ва. Отваряме я изрично, за да е savepoint-ът вложен.
+    """
+    connection = db.connection()
+    if connection.dialect.name != "sqlite":
+        return
+    if not connection.connection.dbapi_connection.in_transaction:
+        connection.exec_driver_sql("BEGIN")
+
+
+def blob_refs(media) -> list[str]:
+    """Всички blob-ове, към които сочи един media ред – оригиналът и производните му."""
+    refs = [media.content_sha256] if media.content_sha256 else []
+    refs.extend(item["sha256"] for item in (media.derivatives or []) if item.get("sha256"))
+    return refs
+
+
+def release_blobs(db: Session, sha256_values) -> list[str]:
+    """
+    -1 референция за всеки hash (None се прескача). Връща hash-овете, които са останали без
+    референции – след commit се подават на purge_blobs. Не commit-ва.
+    """
+    orphaned: list[str] = []
+    for sha256 in sha256_values:
+        if not sha256:
+            continue
+        blob = db.query(MediaBlob).filter(MediaBlob.sha256 == sha256).with_for_update().first()
+        if blob is None:
+            continue
+        blob.ref_count = (blob.ref_count or 0) - 1
+        if blob.ref_count <= 0:
+            db.delete(blob)
+            orphaned.append(sha256)
+    return orphaned
+
+
+def _claim_for_purge(db: Session, sha256: str) -> bool:
+    """
+    True ако съдържанието е без референции и редът му е наш до края на транзакцията:
+    заключен ред с ref_count 0 или вмъкнат от нас tombstone (конфликт = някой го качва в момента).
+    """
+    _ensure_transaction(db)
+    blob = _locked_blob(db, sha256)
+    if blob is not None:
+        return (blob.ref_count or 0) <= 0
+    try:
+        with db.begin_nested():
+            db.add(MediaBlob(sha256=sha256, size=0, mime_type="application/octet-stream", ref_count=0))
+    except IntegrityError:
+        return False
+    return True
+
+
+def purge_blobs(db: Session, sha256_values) -> None:
+    """
+    Трие от хранилището съдържание без референции (вика се след commit/rollback).
+    Всеки hash е в отделна транзакция под заключения ред или tombstone – паралелен
+    acquire_blob на същото съдържание чака и после качва файла наново.
+    """
+    for sha256 in sorted({value for value in sha256_values if value}):
+        try:
+            if _claim_for_purge(db, sha256):
+                media_storage.delete(sha256)
+                db.query(MediaBlob).filter(MediaBlob.sha256 == sha256).delete(synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
@@ -0,0 +1,130 @@
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import RefreshToken
+from app.settings import settings
+
+
+def _hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _invalid_refresh_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def issue_refresh_token(db: AsyncSession, user_id: int, family_id: Optional[str] = None) -> str:
+    """Нов opaque токен (ново family при вход). Не прави commit."""
+    token = secrets.token_urlsafe(32)
+    db.add(
+        RefreshToken(
+            token_hash=_hash_token(token),
+            user_id=user_id,
+            family_id=family_id or secrets.token_hex(16),
+            expires_at=datetime.utcnow() + timedelta(minutes=settings.refresh_token_expires_minutes),
+        )
+    )
+    return token
+
+
+async def purge_expired_refresh_tokens(db: AsyncSession, user_id: int) -> None:
+    # Изтеклите не трябват и за засичане на повторна употреба – таблицата остава малка.
+    await db.execute(
+        delete(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.expires_at < datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def revoke_refresh_family(db: AsyncSession, family_id: str) -> None:
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+
+
+def revoke_user_refresh_tokens(db: Session, user_id: int) -> None:
+    """
+    Смяна на парола / изтриване: всички refresh токени на потребителя спират да работят.
+    Не разчита на FK cascade (SQLite не го прилага). Sync – за admin handler-ите; не прави commit.
+    """
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _family_is_active(db: AsyncSession, family_id: str, now: datetime) -> bool:
+    found = await db.execute(
+        select(RefreshToken.token_hash)
+        .where(
+            RefreshToken.family_id == family_id,
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at >= now,
+        )
+        .limit(1)
+    )
+    return found.first() is not None
+
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> tuple[int, str]:
+    """
+    Отменя подадения токен и издава следващия в същото family; връща (user_id, нов токен).
+    Отменен токен значи, че е изтекъл/откраднат – отменяме цялото family и връщаме 401.
+    Изключение: токен, ротиран преди по-малко от refresh_token_reuse_grace_seconds, докато
+    family-то е живо – два таба с общ localStorage го подават почти едновременно.
+    Тогава издаваме още един токен в family-то вместо да изхвърлим потребителя.
+    """
+    now = datetime.utcnow()
+    row = await db.get(RefreshToken, _hash_token(token or ""))
+    if row is None or row.expires_at < now:
+        raise _invalid_refresh_token()
+
+    user_id, family_id = row.user_id, row.family_id
+    grace = timedelta(seconds=settings.refresh_token_reuse_grace_seconds)
+    if row.revoked_at is not None:
+        if now - row.revoked_at <= grace and await _family_is_active(db, family_id, now):
+            new_token = issue_refresh_token(db, user_id, family_id=family_id)
+            await db.commit()
+            return user_id, new_token
+        await revoke_refresh_family(db, family_id)
+        await db.commit()
+        raise _invalid_refresh_token()
+
+    # Условният UPDATE пази от две едновременни ротации на един и същи токен:
+    # загубилата е същият случай като повторна употреба в grace прозореца.
+    revoked = await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.token_hash == row.token_hash, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if revoked.rowcount != 1 and not (grace and await _family_is_active(db, family_id, now)):
+        await db.rollback()
+        raise _invalid_refresh_token()
+
+    new_token = issue_refresh_token(db, user_id, family_id=family_id)
+    await db.commit()
+    return user_id, new_token
+
+
+async def revoke_refresh_token(db: AsyncSession, token: str) -> None:
+    """Изход: отменя family-то на токена (ако го има)."""
+    row = await db.get(RefreshToken, _hash_token(token or ""))
+    if row is not None:
+        await revoke_refresh_family(db, row.family_id)
+        await db.commit()
@@ -0,0 +1,120 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models import Drill, Training, TrainingDrill
+
+
+def _plan_entries(plan) -> list[tuple[str, int, int]]:
+    """plan JSON -> [(section, position, drill_id)], без дубли в една секция."""
+    entries: list[tuple[str, int, int]] = []
+    if not isinstance(plan, dict):
+        return entries
+    for section, arr in plan.items():
+        if not section or not isinstance(arr, list):
+            continue
+        seen: set[int] = set()
+        for raw in arr:
+            try:
+                drill_id = int(raw)
+            except Exception:
+                continue
+            if drill_id in seen:
+                continue
+            seen.add(drill_id)
+            entries.append((str(section)[:50], len(seen) - 1, drill_id))
+    return entries
+
+
+def sync_training_drills(db: Session, training: Training) -> None:
+    """
+    Поддържа training_drills в синхрон с training.plan (plan остава източникът за показване).
+    Прави diff по (section, drill_id) – така не се удря uq_training_drill_section
+    при пренареждане. Не commit-ва – вика се в транзакцията на save-а.
+    """
+    entries = _plan_entries(training.plan)
+    wanted_ids = {drill_id for _, _, drill_id in entries}
+    existing_drill_ids = set()
+    if wanted_ids:
+        existing_drill_ids = set(db.execute(select(Drill.id).where(Drill.id.in_(wanted_ids))).scalars())
+
+    wanted = {
+        (section, drill_id): position
+        for section, position, drill_id in entries
+        if drill_id in existing_drill_ids
+    }
+
+    current = {(item.section, item.drill_id): item for item in training.items}
+    for key, item in current.items():
+        if key not in wanted:
+            training.items.remove(item)
+        elif item.position != wanted[key]:
+            item.position = wanted[key]
+    for (section, drill_id), position in wanted.items():
+        if (section, drill_id) not in current:
+            training.items.append(TrainingDrill(section=section, drill_id=drill_id, position=position))
+
+
+def training_ids_using_drill(db: Session, drill_id: int, coach_id: int | None = None) -> list[int]:
+    stmt = select(TrainingDrill.training_id).where(TrainingDrill.drill_id == drill_id).distinct()
+    if coach_id is not None:
+        stmt = stmt.join(Training, Training.id == TrainingDrill.training_id).where(Training.coach_id == coach_id)
+    return list(db.execute(stmt).scalars())
+
+
+def drill_usage_counts(db: Session, limit: int = 20) -> list[tuple[int, int]]:
+    """[(drill_id, брой тренировки)] – най-използваните упражнения."""
+    trainings_count = func.count(func.distinct(TrainingDrill.training_id))
+    rows = db.execute(
+        select(TrainingDrill.drill_id, trainings_count)
+        .group_by(TrainingDrill.drill_id)
+        .order_by(trainings_count.desc(), TrainingDrill.drill_id.asc())
+        .limit(limit)
+    ).all()
+    return [(int(drill_id), int(count)) for drill_id, count in rows]
+
+
+def recent_drill_ids_by_session(db: Session, coach_id: int, limit_sessions: int = 3) -> list[list[int]]:
+    """Упражненията от последните N тренировки на треньора, най-новата първа."""
+    recent_ids = list(
+        db.execute(
+            select(Training.id)
+            .where(Training.coach_id == coach_id)
+            .order_by(Training.created_at.desc(), Training.id.desc())
+            .limit(limit_sessions)
+        ).scalars()
+    )
+    if not recent_ids:
+        return []
+
+    grouped: dict[int, list[int]] = {training_id: [] for training_id in recent_ids}
+    rows = db.execute(
+        select(TrainingDrill.training_id, TrainingDrill.drill_id)
+        .where(TrainingDrill.training_id.in_(recent_ids))
+        .order_by(TrainingDrill.training_id, TrainingDrill.section, TrainingDrill.position)
+    ).all()
+    for training_id, drill_id in rows:
+        if drill_id not in grouped[training_id]:
+            grouped[training_id].append(drill_id)
+    return [grouped[training_id] for training_id in recent_ids]
+
+
+def backfill_training_drills(db: Session, batch_size: int = 200) -> int:
+    """Попълва training_drills от plan JSON за всички тренировки. Връща броя обработени."""
+    processed = 0
+    last_id = 0
+    while True:
+        trainings = (
+            db.query(Training)
+            .filter(Training.id > last_id)
+            .order_by(Training.id.asc())
+            .limit(batch_size)
+            .all()
+        )
+        if not trainings:
+            break
+        for training in trainings:
+            sync_training_drills(db, training)
+            processed += 1
+        last_id = trainings[-1].id
+        db.commit()
+    return processed
@@ -0,0 +1,108 @@
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+from uuid import uuid4
+
+from fastapi import HTTPException, UploadFile
+
+from app.services.media_storage import media_storage
+
+
+STATIC_DIR = Path(__file__).resolve().parents[1] / "static"
+CHUNK_SIZE = 1024 * 1024
+MAX_UPLOAD_SIZE = 50 * 1024 * 1024
+
+# Content-Type-ът се определя от сървъра по разширението – браузърният upload.content_type
+# не се пази и не се връща (иначе "x.png" с text/html би се сервирал като HTML).
+MIME_TYPES_BY_EXTENSION = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+    ".gif": "image/gif",
+    ".mp4": "video/mp4",
+    ".webm": "video/webm",
+    ".mov": "video/quicktime",
+    ".avi": "video/x-msvideo",
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ".zip": "application/zip",
+}
+
+
+@dataclass
+class StagedUpload:
+    path: Path
+    name: str
+    mime_type: str
+    size: int
+    sha256: str
+
+    def discard(self) -> None:
+        # След acquire_blob файлът вече е преместен – тогава това е no-op.
+        self.path.unlink(missing_ok=True)
+
+
+def sanitize_filename(name: str) -> str:
+    return Path(name or "file").name.replace(" ", "_")
+
+
+def mime_type_for(name: str) -> str:
+    return MIME_TYPES_BY_EXTENSION.get(Path(name or "").suffix.lower(), "application/octet-stream")
+
+
+def stage_upload(
+    upload: UploadFile,
+    max_size: int = MAX_UPLOAD_SIZE,
+    allow_empty: bool = True,
+) -> StagedUpload:
+    """
+    Записва UploadFile във временен файл на парчета от CHUNK_SIZE – в паметта никога няма
+    повече от едно парче. Лимитът се проверява докато четем, а SHA-256 (ключът в media
+    хранилището) се смята в същия проход. Синхронна е: викат я sync route-ове, които
+    FastAPI пуска в threadpool.
+    """
+    staging_dir = media_storage.staging_dir
+    staging_dir.mkdir(parents=True, exist_ok=True)
+    part_path = staging_dir / f"{uuid4().hex}.part"
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with part_path.open("wb") as out:
+            while True:
+                chunk = upload.file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"File size exceeds {max_size // (1024 * 1024)}MB limit",
+                    )
+                digest.update(chunk)
+                out.write(chunk)
+        if size == 0 and not allow_empty:
+            raise HTTPException(status_code=400, detail="Empty file")
+    except BaseException:
+        part_path.unlink(missing_ok=True)
+        raise
+
+    name = sanitize_filename(upload.filename or "file")
+    return StagedUpload(
+        path=part_path,
+        name=name,
+        mime_type=mime_type_for(name),
+        size=size,
+        sha256=digest.hexdigest(),
+    )
+
+
+def delete_static_file(url: str) -> None:
+    """Трие стар локален файл по /static/ URL (blob-овете се трият през media_storage)."""
+    if not url or not url.startswith("/static/"):
+        return
+    local_path = STATIC_DIR.parent / url.lstrip("/")
+    local_path.unlink(missing_ok=True)
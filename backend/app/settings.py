@@ -40,11 +40,24 @@ class Settings(BaseSettings):
     # Database configuration - required, must be provided via env var or .env file
     database_url: str = Field(..., env="DATABASE_URL")
 
+    # Connection pool (PostgreSQL и SQLite файл) – за всеки от двата engine-а (sync и async) поотделно
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: int = 30
+    db_pool_recycle_seconds: int = 1800
+    # PostgreSQL statement_timeout за всяка връзка (ms); 0 = без ограничение
+    db_statement_timeout_ms: int = 30000
+    # SQLite: колко чака запис при заключена база (ms) и колко от файла се mmap-ва (bytes)
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+
     # JWT configuration - can use env vars or defaults
     jwt_secret: str = Field(default="changeme-secret", env="JWT_SECRET_KEY")
     jwt_algorithm: str = Field(default="HS256", env="JWT_ALGORITHM")
     access_token_expires_minutes: int = 60
     refresh_token_expires_minutes: int = 60 * 24 * 7
+    # Току-що ротиран refresh токен (друг таб, повторена заявка) дава нов токен вместо отмяна на family-то
+    refresh_token_reuse_grace_seconds: int = 10
 
     # Alembic paths
     alembic_ini_path: Path = Path(__file__).resolve().parent.parent / "alembic.ini"
@@ -52,6 +65,36 @@ class Settings(BaseSettings):
 
     storage_path: str = "./storage"
 
+    # Качени медии: "local" (под storage_path) или "s3" (S3-съвместим endpoint, напр. MinIO)
+    media_storage_backend: str = "local"
+    s3_bucket: Optional[str] = None
+    s3_endpoint_url: Optional[str] = None
+    s3_region: Optional[str] = None
+    s3_access_key_id: Optional[str] = None
+    s3_secret_access_key: Optional[str] = None
+
+    # Производни изображения (WebP, до тези ширини) – правят се в отделни процеси след качване
+    image_derivative_widths: list[int] = [480, 1280]
+    image_workers: int = 2
+
+    # Pub/sub за push канала на форума: "memory" = в рамките на процеса (един worker),
+    # "postgres" = LISTEN/NOTIFY през DATABASE_URL (няколко worker-а, само с PostgreSQL)
+    pubsub_backend: str = "memory"
+
+    # Кеш на публичните отговори за статии ("memory" = в рамките на процеса) и брой записи
+    response_cache_backend: str = "memory"
+    response_cache_size: int = 1024
+    # Горна граница на живота на запис, ако някоя инвалидация е пропусната (0 = без кеш)
+    response_cache_ttl_seconds: int = 300
+
+    # Колко секунди auth използва кеширания потребител (роля, клуб, активен ли е клубът) без заявка
+    principal_cache_ttl_seconds: int = 60
+
+    # Цена на bcrypt (log2 итерации); при промяна паролите се прехешират при следващ вход
+    bcrypt_rounds: int = 12
+    # Нишки за хеширане/проверка на пароли – ограничават CPU-то при вълна от входове
+    password_hash_workers: int = 4
+
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
@@ -0,0 +1,77 @@
+"""
+Обща среда за тестовете през HTTP: временна SQLite база и storage, TestClient над app.main.
+Импортира се преди всичко от app – settings се четат при първия import.
+"""
+import itertools
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+_TMP_DIR = tempfile.mkdtemp(prefix="volley-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP_DIR}/test.db"
+os.environ["STORAGE_PATH"] = f"{_TMP_DIR}/storage"
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+_client = None
+_sequence = itertools.count(1)
+
+
+def get_client() -> TestClient:
+    """Един клиент за целия процес; startup (init_db) минава при първото извикване."""
+    global _client
+    if _client is None:
+        _client = TestClient(app)
+        _client.__enter__()
+    return _client
+
+
+def unique(prefix: str) -> str:
+    return f"{prefix}-{next(_sequence)}"
+
+
+def bearer(access_token: str) -> dict:
+    return {"Authorization": f"Bearer {access_token}"}
+
+
+def login(email: str = "admin@admin.com", password: str = "admin") -> dict:
+    """Целият отговор на /auth/login (access и refresh токен)."""
+    response = get_client().post("/auth/login", json={"email": email, "password": password})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def admin_headers() -> dict:
+    return bearer(login()["access_token"])
+
+
+def create_club(name: str | None = None) -> dict:
+    response = get_client().post(
+        "/clubs/clubs/", json={"name": name or unique("Клуб")}, headers=admin_headers()
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def create_coach(password: str = "pw", club_id: int | None = None) -> dict:
+    """Треньор в собствен клуб (максимумът е 2 на клуб); връща и паролата му."""
+    club_id = club_id or create_club()["id"]
+    email = f"{unique('coach')}@example.com"
+    response = get_client().post(
+        "/users/users/create-coach",
+        json={"email": email, "password": password, "name": unique("Треньор"), "club_id": club_id},
+        headers=admin_headers(),
+    )
+    assert response.status_code == 200, response.text
+    return {**response.json(), "password": password}
+
+
+def coach_headers(coach: dict) -> dict:
+    return bearer(login(coach["email"], coach["password"])["access_token"])
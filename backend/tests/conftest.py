@@ -0,0 +1,7 @@
+"""Тестовете импортират app.* – backend/ трябва да е в sys.path и при pytest от корена на репото."""
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
@@ -0,0 +1,43 @@
+import unittest
+
+from app.services.article_render import make_excerpt, render_article
+
+
+class ArticleRenderTests(unittest.TestCase):
+    def test_sanitizes_rich_text_html(self):
+        rendered = render_article(
+            '<p onclick="x()">Текст <script>alert(1)</script><a href="javascript:x">a</a>'
+            '<span style="color:red;background:url(x)">b</span></p><iframe src="x"></iframe>'
+        )
+        self.assertNotIn("script", rendered.html)
+        self.assertNotIn("onclick", rendered.html)
+        self.assertNotIn("javascript", rendered.html)
+        self.assertNotIn("iframe", rendered.html)
+        self.assertIn('<span style="color:red">b</span>', rendered.html)
+
+    def test_toc_ids_match_heading_ids(self):
+        rendered = render_article("## Загрявка\nтекст\n### Игра\nоще текст")
+        self.assertEqual(
+            rendered.toc,
+            [
+                {"id": "sec-1", "label": "Загрявка", "level": 2},
+                {"id": "sec-2", "label": "Игра", "level": 3},
+            ],
+        )
+        self.assertIn('<h2 id="sec-1">Загрявка</h2>', rendered.html)
+        self.assertIn('<h3 id="sec-2">Игра</h3>', rendered.html)
+
+    def test_word_count_and_reading_time(self):
+        rendered = render_article("<p>" + "дума " * 441 + "</p>")
+        self.assertEqual(rendered.word_count, 441)
+        self.assertEqual(rendered.reading_minutes, 3)
+        self.assertEqual(render_article("").reading_minutes, 1)
+
+    def test_excerpt_is_plain_text_cut_on_word(self):
+        self.assertEqual(make_excerpt("едно  две\nтри"), "едно две три")
+        excerpt = make_excerpt("дума " * 100, length=23)
+        self.assertEqual(excerpt, "дума дума дума дума…")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+import io
+import unittest
+
+from api_support import admin_headers, coach_headers, create_coach, get_client
+from PIL import Image
+
+from app.database import SessionLocal
+from app.models import Article
+from app.services.article_render import RENDER_VERSION
+from app.services.article_service import backfill_article_renders
+
+
+def _create_article(headers: dict, title: str = "Статия", content: str = "текст") -> dict:
+    response = get_client().post("/api/articles", json={"title": title, "content": content}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def _approve(article_id: int) -> None:
+    response = get_client().post(f"/api/admin/articles/{article_id}/approve", headers=admin_headers())
+    assert response.status_code == 200, response.text
+
+
+def _png() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (40, 30), "blue").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def _comment(article_id: int, headers: dict) -> dict:
+    response = get_client().post(f"/api/articles/{article_id}/comments", json={"content": "коментар"}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def _comment_count(article_id: int) -> int:
+    db = SessionLocal()
+    try:
+        return db.get(Article, article_id).comment_count
+    finally:
+        db.close()
+
+
+class ArticleCommentCountTests(unittest.TestCase):
+    def setUp(self):
+        self.headers = coach_headers(create_coach())
+        self.article_id = _create_article(self.headers)["id"]
+
+    def test_count_follows_create_and_delete(self):
+        first = _comment(self.article_id, self.headers)
+        _comment(self.article_id, self.headers)
+        self.assertEqual(_comment_count(self.article_id), 2)
+
+        response = get_client().delete(f"/api/articles/{self.article_id}/comments/{first['id']}", headers=self.headers)
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(_comment_count(self.article_id), 1)
+
+    def test_decrement_is_clamped_at_zero(self):
+        comment = _comment(self.article_id, self.headers)
+        db = SessionLocal()
+        try:
+            # Разминал се брояч (напр. след паралелно изтриване).
+            db.query(Article).filter(Article.id == self.article_id).update({Article.comment_count: 0})
+            db.commit()
+        finally:
+            db.close()
+
+        get_client().delete(f"/api/articles/{self.article_id}/comments/{comment['id']}", headers=self.headers)
+        self.assertEqual(_comment_count(self.article_id), 0)
+
+
+class ArticleFeedTests(unittest.TestCase):
+    def setUp(self):
+        self.headers = coach_headers(create_coach())
+        self.first, self.pending, self.last = (_create_article(self.headers, title) for title in ("А", "Б", "В"))
+        _approve(self.first["id"])
+        _approve(self.last["id"])
+
+    def _walk(self, headers: dict) -> list[dict]:
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            response = get_client().get("/api/articles", params=params, headers=headers)
+            self.assertEqual(response.status_code, 200, response.text)
+            seen.extend(response.json()["items"])
+            cursor = response.json()["next_cursor"]
+            if not cursor:
+                return seen
+
+    def test_cursor_walk_lists_approved_newest_first(self):
+        items = self._walk(coach_headers(create_coach()))
+        ids = [item["id"] for item in items]
+        self.assertEqual(len(ids), len(set(ids)))
+        mine = [article_id for article_id in ids if article_id in {self.first["id"], self.pending["id"], self.last["id"]}]
+        self.assertEqual(mine, [self.last["id"], self.first["id"]])
+        self.assertNotIn("content", items[0])
+
+    def test_cover_image_is_the_first_uploaded_image(self):
+        uploaded = []
+        for name in ("cover.png", "second.png"):
+            response = get_client().post(
+                f"/api/articles/{self.pending['id']}/media",
+                files={"file": (name, _png(), "image/png")},
+                headers=self.headers,
+            )
+            self.assertEqual(response.status_code, 201, response.text)
+            uploaded.append(response.json()["id"])
+        _approve(self.pending["id"])
+
+        item = next(item for item in self._walk(self.headers) if item["id"] == self.pending["id"])
+        self.assertEqual(item["cover_image"]["id"], uploaded[0])
+
+    def test_bad_cursor_is_rejected(self):
+        response = get_client().get("/api/articles", params={"cursor": "???"}, headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+
+class ArticleRenderOnWriteTests(unittest.TestCase):
+    def setUp(self):
+        self.headers = coach_headers(create_coach())
+        self.article = _create_article(self.headers, content="## Загрявка\nедно две")
+
+    def _stored(self) -> Article:
+        db = SessionLocal()
+        try:
+            return db.get(Article, self.article["id"])
+        finally:
+            db.close()
+
+    def test_create_stores_rendered_fields(self):
+        self.assertIn('<h2 id="sec-1">Загрявка</h2>', self.article["content_html"])
+        self.assertEqual([item["label"] for item in self.article["toc"]], ["Загрявка"])
+        self.assertEqual(self._stored().render_version, RENDER_VERSION)
+
+    def test_content_update_re_renders(self):
+        content = '<h3>Игра</h3><p onclick="x()">три думи</p><script>x()</script>'
+        response = get_client().put(f"/api/articles/{self.article['id']}", json={"content": content}, headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.text)
+        body = response.json()
+        self.assertIn('<h3 id="sec-1">Игра</h3>', body["content_html"])
+        self.assertNotIn("script", body["content_html"])
+        self.assertNotIn("onclick", body["content_html"])
+        self.assertEqual(body["toc"][0]["level"], 3)
+        self.assertEqual(body["plain_excerpt"], self._stored().plain_excerpt)
+
+    def test_backfill_re_renders_stale_rows(self):
+        db = SessionLocal()
+        try:
+            db.query(Article).filter(Article.id == self.article["id"]).update(
+                {Article.render_version: RENDER_VERSION - 1, Article.content_html: None}
+            )
+            db.commit()
+            self.assertGreaterEqual(backfill_article_renders(db), 1)
+        finally:
+            db.close()
+        stored = self._stored()
+        self.assertEqual(stored.render_version, RENDER_VERSION)
+        self.assertEqual(stored.content_html, self.article["content_html"])
+
+    def test_approved_details_are_cached_until_the_article_changes(self):
+        _approve(self.article["id"])
+        reader = coach_headers(create_coach())
+        first = get_client().get(f"/api/articles/{self.article['id']}", headers=reader).json()
+        self.assertEqual(get_client().get(f"/api/articles/{self.article['id']}", headers=reader).json(), first)
+
+        response = get_client().put(
+            f"/api/admin/articles/{self.article['id']}", json={"content": "## Ново"}, headers=admin_headers()
+        )
+        self.assertEqual(response.status_code, 200, response.text)
+        again = get_client().get(f"/api/articles/{self.article['id']}", headers=reader).json()
+        self.assertIn("Ново", again["content_html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,9 @@
 import unittest
 
-from backend.app.services.bulgarian_training_generator import (
+from app.services.bulgarian_training_generator import (
     PickedState,
+    _drill_to_dict,
+    _has_valid_video,
     generateSessionPlan,
     inferGameContext,
     normalizeSkill,
@@ -156,6 +158,17 @@ class BulgarianGeneratorTests(unittest.TestCase):
         self.assertEqual(recent_meta["noveltyScore"], 0)
         self.assertEqual(new_meta["noveltyScore"], 12)
 
+    def test_precomputed_video_flag_wins_over_url_parsing(self):
+        no_url = _mk_drill(20, name="Без видео", category="Загрявка", skill_focus="Сервис", video_urls="Няма данни")
+        with_url = _mk_drill(21, name="С видео", category="Загрявка", skill_focus="Сервис")
+        self.assertFalse(_has_valid_video(_drill_to_dict(no_url)))
+        self.assertTrue(_has_valid_video(_drill_to_dict(with_url)))
+
+        no_url["has_valid_video"] = True
+        with_url["has_valid_video"] = False
+        self.assertTrue(_has_valid_video(_drill_to_dict(no_url)))
+        self.assertFalse(_has_valid_video(_drill_to_dict(with_url)))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+from api_support import admin_headers, coach_headers, create_club, create_coach, get_client
+
+from app.database import SessionLocal
+from app.models import User
+from app.services.coach_service import backfill_coach_numbers
+
+
+def _numbers(*coaches: dict) -> list:
+    db = SessionLocal()
+    try:
+        return [db.get(User, coach["id"]).coach_number for coach in coaches]
+    finally:
+        db.close()
+
+
+class CoachNumberTests(unittest.TestCase):
+    def setUp(self):
+        self.club_id = create_club()["id"]
+        self.first = create_coach(club_id=self.club_id)
+        self.second = create_coach(club_id=self.club_id)
+
+    def test_numbers_are_assigned_on_create(self):
+        self.assertEqual(_numbers(self.first, self.second), [1, 2])
+
+    def test_delete_renumbers_the_club(self):
+        response = get_client().delete(f"/users/users/coaches/{self.first['id']}", headers=admin_headers())
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertEqual(_numbers(self.second), [1])
+
+    def test_moving_a_coach_renumbers_both_clubs(self):
+        other = create_coach()
+        response = get_client().patch(
+            f"/users/users/coaches/{self.first['id']}", json={"club_id": other["club_id"]}, headers=admin_headers()
+        )
+        self.assertEqual(response.status_code, 200, response.text)
+        # В новия клуб е по-стар (по-малко id) от вече наличния треньор.
+        self.assertEqual(_numbers(self.first, other, self.second), [1, 2, 1])
+
+    def test_article_author_display_uses_stored_number(self):
+        headers = coach_headers(self.second)
+        article = get_client().post("/api/articles", json={"title": "Статия", "content": "текст"}, headers=headers).json()
+        self.assertEqual(article["author_coach_number"], 2)
+
+        get_client().delete(f"/users/users/coaches/{self.first['id']}", headers=admin_headers())
+        details = get_client().get(f"/api/articles/{article['id']}", headers=headers).json()
+        self.assertEqual(details["author_coach_number"], 1)
+        self.assertIn("Треньор №1", details["author_display"])
+
+    def test_backfill_fills_missing_numbers(self):
+        db = SessionLocal()
+        try:
+            db.query(User).filter(User.club_id == self.club_id).update({User.coach_number: None})
+            db.commit()
+            self.assertGreaterEqual(backfill_coach_numbers(db), 1)
+        finally:
+            db.close()
+        self.assertEqual(_numbers(self.first, self.second), [1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+
+from api_support import admin_headers, coach_headers, create_coach, get_client
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from app.db_pool import PoolMetrics, apply_sqlite_pragmas, timed_pool_class
+
+
+def _sqlite_file_url() -> str:
+    fd, name = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    return f"sqlite:///{name}"
+
+
+class PoolMetricsTests(unittest.TestCase):
+    def setUp(self):
+        self.metrics = PoolMetrics()
+        self.engine = create_engine(
+            _sqlite_file_url(),
+            poolclass=timed_pool_class(QueuePool, self.metrics),
+            pool_size=2,
+            max_overflow=0,
+            pool_timeout=0.05,
+        )
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_checkouts_peak_and_saturation(self):
+        with self.engine.connect() as first, self.engine.connect():
+            first.execute(text("SELECT 1"))
+            busy = self.metrics.stats(self.engine.pool)
+        self.assertEqual((busy["checked_out"], busy["saturation"]), (2, 1.0))
+
+        idle = self.metrics.stats(self.engine.pool)
+        self.assertEqual(idle["pool"], "TimedQueuePool")
+        self.assertEqual((idle["size"], idle["max_overflow"]), (2, 0))
+        self.assertEqual((idle["checked_out"], idle["saturation"]), (0, 0.0))
+        self.assertEqual((idle["checkouts"], idle["peak_checked_out"], idle["peak_saturation"]), (2, 2, 1.0))
+        self.assertEqual(idle["timeouts"], 0)
+        self.assertGreaterEqual(idle["wait_ms_max"], idle["wait_ms_avg"])
+
+    def test_exhausted_pool_counts_timeout(self):
+        with self.engine.connect(), self.engine.connect():
+            with self.assertRaises(exc.TimeoutError):
+                self.engine.connect()
+        stats = self.metrics.stats(self.engine.pool)
+        self.assertEqual((stats["timeouts"], stats["checkouts"]), (1, 2))
+
+    def test_metrics_survive_dispose(self):
+        with self.engine.connect():
+            pass
+        self.engine.dispose()
+        self.assertEqual(self.metrics.stats(self.engine.pool)["checkouts"], 1)
+
+    def test_non_queue_pool_reports_only_its_type(self):
+        engine = create_engine("sqlite://", poolclass=StaticPool)
+        self.assertEqual(PoolMetrics().stats(engine.pool), {"pool": "StaticPool"})
+
+
+class SqlitePragmaTests(unittest.TestCase):
+    def test_pragmas_are_applied_on_connect(self):
+        engine = create_engine(_sqlite_file_url())
+        apply_sqlite_pragmas(engine, busy_timeout_ms=1234, mmap_size=0)
+        try:
+            with engine.connect() as conn:
+                self.assertEqual(conn.execute(text("PRAGMA journal_mode")).scalar(), "wal")
+                self.assertEqual(conn.execute(text("PRAGMA synchronous")).scalar(), 1)  # NORMAL
+                self.assertEqual(conn.execute(text("PRAGMA busy_timeout")).scalar(), 1234)
+        finally:
+            engine.dispose()
+
+
+class DbPoolEndpointTests(unittest.TestCase):
+    def test_admin_sees_both_engines(self):
+        response = get_client().get("/api/admin/db-pool", headers=admin_headers())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()), {"sync", "async"})
+        self.assertIn("pool", response.json()["sync"])
+
+    def test_coach_is_forbidden(self):
+        response = get_client().get("/api/admin/db-pool", headers=coach_headers(create_coach()))
+        self.assertEqual(response.status_code, 403)
+
+
+if __name__ == "__main__":
+    unittest.main()
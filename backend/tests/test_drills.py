@@ -0,0 +1,127 @@
+import csv
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from api_support import admin_headers, coach_headers, create_coach, get_client, unique
+
+from PIL import Image
+
+from app.routers.drills import _stream_csv
+from app.services import drill_media_service
+from app.seed.seed_drills import drill_from_csv_row
+
+
+def _submit_drill(headers: dict, **fields) -> dict:
+    payload = {"title": unique("Упражнение"), **fields}
+    response = get_client().post("/drills", json=payload, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _approve(drill_id: int) -> None:
+    response = get_client().post(
+        f"/drills/admin/{drill_id}/decision", json={"action": "approve"}, headers=admin_headers()
+    )
+    assert response.status_code == 200, response.text
+
+
+class DrillExportTests(unittest.TestCase):
+    def setUp(self):
+        headers = coach_headers(create_coach())
+        self.approved = _submit_drill(
+            headers, category="Сервис", rpe=6, skill_domains=["Сервис", "Приемане; зона 5"]
+        )
+        _approve(self.approved["id"])
+        self.pending = _submit_drill(headers)
+
+    def _export(self, fmt: str):
+        response = get_client().get("/drills/export", params={"format": fmt})
+        self.assertEqual(response.status_code, 200, response.text)
+        return response
+
+    def test_csv_has_seed_columns_and_only_approved_drills(self):
+        response = self._export("csv")
+        self.assertTrue(response.headers["content-type"].startswith("text/csv"))
+        self.assertIn('filename="drills.csv"', response.headers["content-disposition"])
+
+        rows = {row["id"]: row for row in csv.DictReader(io.StringIO(response.content.decode("utf-8-sig")))}
+        self.assertNotIn(str(self.pending["id"]), rows)
+        row = rows[str(self.approved["id"])]
+        self.assertEqual(row["name"], self.approved["title"])
+
+        # Експортът се чете обратно от seed-а без загуби.
+        data = drill_from_csv_row(row)
+        self.assertEqual((data["category"], data["rpe"]), ("Сервис", 6))
+        self.assertEqual(data["skill_domains"], ["Сервис", "Приемане; зона 5"])
+
+    def test_jsonl_keeps_types(self):
+        lines = self._export("jsonl").text.splitlines()
+        records = {record["id"]: record for record in map(json.loads, lines)}
+        self.assertNotIn(self.pending["id"], records)
+        record = records[self.approved["id"]]
+        self.assertEqual(record["rpe"], 6)
+        self.assertEqual(record["skill_domains"], ["Сервис", "Приемане; зона 5"])
+
+    def test_csv_is_streamed_in_batches(self):
+        chunks = list(_stream_csv(batch_size=1))
+        self.assertGreater(len(chunks), 2)
+        self.assertEqual(sum(chunk.count(self.approved["title"]) for chunk in chunks), 1)
+
+    def test_unknown_format_is_rejected(self):
+        response = get_client().get("/drills/export", params={"format": "xml"})
+        self.assertEqual(response.status_code, 400)
+
+
+class DrillMediaTests(unittest.TestCase):
+    def setUp(self):
+        self.headers = coach_headers(create_coach())
+        static_dir = Path(tempfile.mkdtemp(prefix="drill-static-")) / "static"
+        (static_dir / "img").mkdir(parents=True)
+        Image.new("RGB", (800, 600), "orange").save(static_dir / "img" / "court.png")
+        for name, value in (("STATIC_DIR", static_dir), ("THUMBNAIL_DIR", static_dir / "thumbnails" / "drills")):
+            patcher = mock.patch.object(drill_media_service, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.static_dir = static_dir
+
+    def _media(self, drill: dict) -> dict:
+        return {(item["kind"], item["url"]): item for item in drill["media"]}
+
+    def test_submit_materializes_media_and_video_flag(self):
+        drill = _submit_drill(
+            self.headers,
+            image_urls=["https://example.com/a.jpg", "Няма данни"],
+            video_urls=["https://youtu.be/abc"],
+        )
+        media = self._media(drill)
+        self.assertTrue(drill["has_valid_video"])
+        self.assertEqual(media[("video", "https://youtu.be/abc")]["provider"], "youtube")
+        self.assertEqual(media[("image", "https://example.com/a.jpg")]["provider"], "other")
+        self.assertFalse(media[("image", "Няма данни")]["is_valid"])
+
+        updated = get_client().patch(f"/drills/{drill['id']}", json={"video_urls": ["-"]}, headers=admin_headers())
+        self.assertFalse(updated.json()["has_valid_video"])
+
+    def test_local_image_gets_thumbnail_once(self):
+        drill = _submit_drill(self.headers, image_urls=["/static/img/court.png"])
+        # TestClient изпълнява BackgroundTasks преди да върне отговора.
+        thumb = self._media(get_client().get(f"/drills/{drill['id']}").json())[("image", "/static/img/court.png")]
+        self.assertTrue(thumb["thumbnail_url"].startswith(f"/static/thumbnails/drills/{drill['id']}/"))
+        with Image.open(self.static_dir.parent / thumb["thumbnail_url"].lstrip("/")) as img:
+            self.assertEqual(img.width, drill_media_service.THUMBNAIL_WIDTH)
+
+        # Непроменен URL запазва вече генерирания thumbnail.
+        updated = get_client().patch(
+            f"/drills/{drill['id']}",
+            json={"image_urls": ["/static/img/court.png"], "video_urls": ["https://youtu.be/abc"]},
+            headers=admin_headers(),
+        ).json()
+        self.assertEqual(self._media(updated)[("image", "/static/img/court.png")]["thumbnail_url"], thumb["thumbnail_url"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+
+from api_support import admin_headers, coach_headers, create_coach, get_client
+from sqlalchemy import func
+
+from app.database import SessionLocal
+from app.models import ForumPost, ForumPostMedia, ForumPostSubscription, ForumReply
+
+
+def _create_topic(headers: dict, **fields) -> dict:
+    payload = {"title": "Тема", "content": "текст", **fields}
+    response = get_client().post("/api/forum/posts", json=payload, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def _reply(post_id: int, headers: dict) -> dict:
+    response = get_client().post(f"/api/forum/posts/{post_id}/replies", json={"content": "отговор"}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+class ForumCounterTests(unittest.TestCase):
+    def setUp(self):
+        self.author = coach_headers(create_coach())
+        self.other = coach_headers(create_coach())
+        self.post = _create_topic(self.author)
+        self.post_id = self.post["id"]
+
+    def _stored(self) -> ForumPost:
+        db = SessionLocal()
+        try:
+            return db.get(ForumPost, self.post_id)
+        finally:
+            db.close()
+
+    def _recount(self) -> tuple[int, int, int]:
+        db = SessionLocal()
+        try:
+            count = lambda model: db.query(func.count(model.id)).filter(model.post_id == self.post_id).scalar()  # noqa: E731
+            return count(ForumReply), count(ForumPostSubscription), count(ForumPostMedia)
+        finally:
+            db.close()
+
+    def test_counters_follow_replies_follows_and_media(self):
+        self.assertEqual(self.post["followers_count"], 1)  # авторът следва темата си
+
+        first = _reply(self.post_id, self.other)
+        _reply(self.post_id, admin_headers())
+        get_client().post(f"/api/forum/posts/{self.post_id}/follow", headers=admin_headers())
+        get_client().post(
+            f"/api/forum/posts/{self.post_id}/media",
+            files={"file": ("photo.png", b"not really a png", "image/png")},
+            headers=self.author,
+        )
+        get_client().delete(f"/api/forum/posts/{self.post_id}/replies/{first['id']}", headers=self.other)
+
+        stored = self._stored()
+        self.assertEqual((stored.reply_count, stored.follower_count, stored.media_count), self._recount())
+        self.assertEqual(self._recount()[:2], (1, 3))
+
+        details = get_client().get(f"/api/forum/posts/{self.post_id}", headers=self.author).json()
+        self.assertEqual((details["replies_count"], details["followers_count"]), (1, 3))
+
+    def test_reply_moves_last_activity_forward(self):
+        before = self._stored().last_activity_at
+        reply = _reply(self.post_id, self.other)
+        after = self._stored().last_activity_at
+        self.assertGreater(after, before)
+        self.assertEqual(after.isoformat()[:19], reply["created_at"][:19])
+
+    def test_unfollow_twice_does_not_go_negative(self):
+        get_client().post(f"/api/forum/posts/{self.post_id}/follow", headers=self.other)
+        for _ in range(2):
+            get_client().delete(f"/api/forum/posts/{self.post_id}/follow", headers=self.other)
+        self.assertEqual(self._stored().follower_count, 1)
+
+    def _set_counters(self, **values) -> None:
+        db = SessionLocal()
+        try:
+            db.query(ForumPost).filter(ForumPost.id == self.post_id).update(values)
+            db.commit()
+        finally:
+            db.close()
+
+    def test_decrements_are_clamped_at_zero(self):
+        # Броячите вече са 0 (напр. след паралелно изтриване) – DELETE-ите не ги правят отрицателни.
+        get_client().post(f"/api/forum/posts/{self.post_id}/follow", headers=self.other)
+        reply = _reply(self.post_id, self.other)
+        self._set_counters(follower_count=0, reply_count=0)
+
+        get_client().delete(f"/api/forum/posts/{self.post_id}/follow", headers=self.other)
+        get_client().delete(f"/api/forum/posts/{self.post_id}/replies/{reply['id']}", headers=self.other)
+
+        stored = self._stored()
+        self.assertEqual((stored.follower_count, stored.reply_count), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
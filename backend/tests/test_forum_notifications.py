@@ -0,0 +1,115 @@
+import unittest
+
+from api_support import admin_headers, coach_headers, create_coach, get_client
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+
+from app.database import SessionLocal, engine
+from app.models import ForumNotification
+from app.services.forum_service import fan_out_reply_notifications
+
+
+def _create_topic(headers: dict) -> int:
+    response = get_client().post("/api/forum/posts", json={"title": "Тема", "content": "текст"}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def _reply(post_id: int, headers: dict) -> dict:
+    response = get_client().post(f"/api/forum/posts/{post_id}/replies", json={"content": "отговор"}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def _notifications(headers: dict) -> dict:
+    response = get_client().get("/api/forum/notifications", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _for_post(payload: dict, post_id: int) -> list[dict]:
+    return [item for item in payload["items"] if item["post_id"] == post_id]
+
+
+class NotificationCoalescingTests(unittest.TestCase):
+    def setUp(self):
+        self.author = coach_headers(create_coach())
+        self.follower = coach_headers(create_coach())
+        self.post_id = _create_topic(self.author)
+        get_client().post(f"/api/forum/posts/{self.post_id}/follow", headers=self.follower)
+
+    def test_burst_of_replies_is_one_unread_notification_per_recipient(self):
+        replies = [_reply(self.post_id, admin_headers()) for _ in range(3)]
+
+        for headers in (self.author, self.follower):
+            items = _for_post(_notifications(headers), self.post_id)
+            self.assertEqual(len(items), 1)
+            self.assertFalse(items[0]["is_read"])
+            self.assertEqual(items[0]["reply_id"], replies[-1]["id"])
+            self.assertTrue(items[0]["message"].startswith("Нови отговори"))
+
+    def test_replier_is_not_notified(self):
+        _reply(self.post_id, self.follower)
+        self.assertEqual(_for_post(_notifications(self.follower), self.post_id), [])
+        self.assertEqual(len(_for_post(_notifications(self.author), self.post_id)), 1)
+
+    def test_reply_after_read_all_starts_a_new_notification(self):
+        _reply(self.post_id, admin_headers())
+        get_client().post("/api/forum/notifications/read-all", headers=self.author)
+        self.assertEqual(_notifications(self.author)["unread_count"], 0)
+
+        _reply(self.post_id, self.follower)
+        payload = _notifications(self.author)
+        self.assertEqual(payload["unread_count"], 1)
+        items = _for_post(payload, self.post_id)
+        self.assertEqual([item["is_read"] for item in items], [False, True])
+        self.assertTrue(items[0]["message"].startswith("Нов отговор"))
+
+    def test_fan_out_statement_count_does_not_grow_with_followers(self):
+        def statements_for_reply() -> int:
+            reply_id = _reply(self.post_id, admin_headers())["id"]
+            executed = []
+            listener = lambda *args: executed.append(args[2])  # noqa: E731
+            event.listen(engine, "before_cursor_execute", listener)
+            try:
+                fan_out_reply_notifications(reply_id)
+            finally:
+                event.remove(engine, "before_cursor_execute", listener)
+            return len(executed)
+
+        few = statements_for_reply()
+        for _ in range(5):
+            get_client().post(f"/api/forum/posts/{self.post_id}/follow", headers=coach_headers(create_coach()))
+        self.assertEqual(statements_for_reply(), few)
+
+    def test_second_unread_row_for_same_topic_is_rejected(self):
+        _reply(self.post_id, admin_headers())
+        db = SessionLocal()
+        try:
+            author_id = (
+                db.query(ForumNotification.user_id).filter(ForumNotification.post_id == self.post_id).first()[0]
+            )
+            # Това би направил втори паралелен fan-out без ON CONFLICT.
+            db.add(ForumNotification(user_id=author_id, post_id=self.post_id, message="дубликат", is_read=False))
+            with self.assertRaises(IntegrityError):
+                db.commit()
+        finally:
+            db.close()
+
+    def test_replier_filter_is_null_safe(self):
+        # forum_replies.author_id е NOT NULL днес; "!= NULL" би изключил всички получатели,
+        # затова филтърът е IS DISTINCT FROM (в SQLite – IS NOT).
+        reply_id = _reply(self.post_id, admin_headers())["id"]
+        executed = []
+        listener = lambda *args: executed.append(args[2])  # noqa: E731
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            fan_out_reply_notifications(reply_id)
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+        insert_sql = next(sql for sql in executed if sql.startswith("INSERT INTO forum_notifications"))
+        self.assertIn("users.id IS NOT ?", insert_sql)
+        self.assertIn("ON CONFLICT (user_id, post_id) WHERE is_read = false DO UPDATE", insert_sql)
+
+if __name__ == "__main__":
+    unittest.main()
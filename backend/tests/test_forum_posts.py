@@ -0,0 +1,112 @@
+import unittest
+
+from api_support import admin_headers, coach_headers, create_coach, get_client, unique
+
+from app.services.forum_service import REPLIES_PAGE_SIZE
+
+
+def _create_topic(headers: dict, title: str, **fields) -> dict:
+    response = get_client().post("/api/forum/posts", json={"title": title, "content": "текст", **fields}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def _reply(post_id: int, headers: dict, content: str = "отговор") -> dict:
+    response = get_client().post(f"/api/forum/posts/{post_id}/replies", json={"content": content}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+class TopicListingTests(unittest.TestCase):
+    def setUp(self):
+        self.headers = coach_headers(create_coach())
+        # Собствена категория – списъкът е изолиран от темите на другите тестове.
+        self.category = unique("Категория")
+        self.old, self.busy, self.new = (
+            _create_topic(self.headers, title, category=self.category) for title in ("Стара", "Активна", "Нова")
+        )
+        for _ in range(2):
+            _reply(self.busy["id"], admin_headers())
+        _reply(self.old["id"], admin_headers())
+
+    def _list(self, **params) -> dict:
+        response = get_client().get(
+            "/api/forum/posts", params={"category": self.category, **params}, headers=self.headers
+        )
+        self.assertEqual(response.status_code, 200, response.text)
+        return response.json()
+
+    def _ids(self, **params) -> list[int]:
+        return [item["id"] for item in self._list(**params)["items"]]
+
+    def test_sort_orders(self):
+        self.assertEqual(self._ids(), [self.old["id"], self.busy["id"], self.new["id"]])
+        self.assertEqual(self._ids(sort_by="newest"), [self.new["id"], self.busy["id"], self.old["id"]])
+        self.assertEqual(self._ids(sort_by="most_replied"), [self.busy["id"], self.old["id"], self.new["id"]])
+
+    def test_pinned_topic_comes_first(self):
+        response = get_client().patch(
+            f"/api/forum/posts/{self.new['id']}/moderation", json={"is_pinned": True}, headers=admin_headers()
+        )
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertEqual(self._ids(sort_by="most_replied")[0], self.new["id"])
+
+    def test_pages_are_cut_in_sql_with_total(self):
+        first = self._list(page=1, page_size=2)
+        second = self._list(page=2, page_size=2)
+        self.assertEqual((first["total"], first["total_pages"]), (3, 2))
+        self.assertEqual(len(first["items"]), 2)
+        self.assertEqual([item["id"] for item in second["items"]], [self.new["id"]])
+
+    def test_tag_filter_and_following_flag(self):
+        tagged = _create_topic(self.headers, "С таг", category=self.category, tags=["Блокада"])
+        get_client().post(f"/api/forum/posts/{tagged['id']}/follow", headers=self.headers)
+
+        items = self._list(tag="блокада")["items"]
+        self.assertEqual([item["id"] for item in items], [tagged["id"]])
+        self.assertTrue(items[0]["is_following"])
+        self.assertEqual(items[0]["tags"], ["блокада"])
+
+
+class ReplyPageTests(unittest.TestCase):
+    def setUp(self):
+        self.headers = coach_headers(create_coach())
+        self.post = _create_topic(self.headers, "Дълга тема")
+
+    def _get(self, post_id: int, **params):
+        return get_client().get(f"/api/forum/posts/{post_id}/replies", params=params, headers=self.headers)
+
+    def _page(self, **params) -> dict:
+        response = self._get(self.post["id"], **params)
+        self.assertEqual(response.status_code, 200, response.text)
+        return response.json()
+
+    def test_topic_embeds_first_page_and_cursor_walks_the_rest(self):
+        ids = [_reply(self.post["id"], admin_headers(), f"отговор {i}")["id"] for i in range(REPLIES_PAGE_SIZE + 3)]
+
+        topic = get_client().get(f"/api/forum/posts/{self.post['id']}", headers=self.headers).json()
+        self.assertEqual([reply["id"] for reply in topic["replies"]], ids[:REPLIES_PAGE_SIZE])
+        self.assertIsNotNone(topic["replies_next_cursor"])
+
+        rest = self._page(cursor=topic["replies_next_cursor"])
+        self.assertEqual([reply["id"] for reply in rest["items"]], ids[REPLIES_PAGE_SIZE:])
+        self.assertIsNone(rest["next_cursor"])
+
+    def test_small_pages_have_no_gaps(self):
+        ids = [_reply(self.post["id"], admin_headers())["id"] for _ in range(5)]
+        seen, cursor = [], None
+        while True:
+            page = self._page(limit=2, **({"cursor": cursor} if cursor else {}))
+            seen.extend(reply["id"] for reply in page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        self.assertEqual(seen, ids)
+
+    def test_bad_cursor_and_missing_topic(self):
+        self.assertEqual(self._get(self.post["id"], cursor="???").status_code, 400)
+        self.assertEqual(self._get(999999).status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
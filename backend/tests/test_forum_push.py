@@ -0,0 +1,75 @@
+import unittest
+from unittest import mock
+
+from api_support import admin_headers, coach_headers, create_coach, get_client, login
+from starlette.websockets import WebSocketDisconnect
+
+import app.pubsub as pubsub
+import app.services.forum_service as forum_service
+
+
+def _create_topic(headers: dict) -> int:
+    response = get_client().post("/api/forum/posts", json={"title": "Тема", "content": "текст"}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def _reply(post_id: int, headers: dict) -> None:
+    response = get_client().post(f"/api/forum/posts/{post_id}/replies", json={"content": "отговор"}, headers=headers)
+    assert response.status_code == 201, response.text
+
+
+class _RecordingBroker:
+    """Брокер като PostgresBroker – не знае кой е свързан; само записва publish-ите."""
+
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+
+    def channels(self, prefix=""):
+        return None
+
+
+class ForumPushChannelTests(unittest.TestCase):
+    def setUp(self):
+        self.coach = create_coach()
+        self.headers = coach_headers(self.coach)
+        self.token = login(self.coach["email"], self.coach["password"])["access_token"]
+
+    def test_invalid_token_is_rejected(self):
+        with self.assertRaises(WebSocketDisconnect) as ctx:
+            with get_client().websocket_connect("/api/forum/ws?token=bad") as ws:
+                ws.receive_json()
+        self.assertEqual(ctx.exception.code, 1008)
+
+    def test_reply_and_unread_count_are_pushed_to_topic_author(self):
+        post_id = _create_topic(self.headers)
+        with get_client().websocket_connect(f"/api/forum/ws?token={self.token}") as ws:
+            self.assertEqual(ws.receive_json(), {"type": "unread_count", "unread_count": 0})
+            self.assertIn(f"user:{self.coach['id']}", pubsub.broker.channels("user:"))
+
+            _reply(post_id, admin_headers())
+            event = ws.receive_json()
+            self.assertEqual((event["type"], event["post_id"]), ("reply", post_id))
+            self.assertEqual(ws.receive_json(), {"type": "unread_count", "unread_count": 1})
+
+            get_client().post("/api/forum/notifications/read-all", headers=self.headers)
+            self.assertEqual(ws.receive_json(), {"type": "unread_count", "unread_count": 0})
+
+    def test_without_local_presence_reply_goes_to_all_followers(self):
+        post_id = _create_topic(self.headers)
+        follower = create_coach()
+        get_client().post(f"/api/forum/posts/{post_id}/follow", headers=coach_headers(follower))
+
+        recording = _RecordingBroker()
+        with mock.patch.object(pubsub, "broker", recording), mock.patch.object(forum_service, "broker", recording):
+            _reply(post_id, admin_headers())
+
+        replies = {channel for channel, message in recording.published if message["type"] == "reply"}
+        self.assertEqual(replies, {f"user:{self.coach['id']}", f"user:{follower['id']}"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+import importlib.util
+import unittest
+import uuid
+from pathlib import Path
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from api_support import admin_headers, coach_headers, create_coach, get_client
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, engine
+from app.services.forum_search import (
+    SQLITE_SEARCH_DDL,
+    _fts5_query,
+    _search_backend,
+    _terms,
+    _tsquery,
+    ensure_sqlite_search_index,
+)
+
+MIGRATION = Path(__file__).resolve().parents[1] / "app/migrations/versions/8e5a1c7d3f20_forum_full_text_search.py"
+
+
+def _load_migration():
+    spec = importlib.util.spec_from_file_location("forum_fts_migration", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _word() -> str:
+    # Една "дума" за токенизатора – unique() съдържа тире и би се разделил на две.
+    return f"fts{uuid.uuid4().hex[:12]}"
+
+
+def _create_topic(headers: dict, title: str, content: str) -> dict:
+    response = get_client().post("/api/forum/posts", json={"title": title, "content": content}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def _reply(post_id: int, headers: dict, content: str) -> dict:
+    response = get_client().post(f"/api/forum/posts/{post_id}/replies", json={"content": content}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+class SearchQuerySanitizingTests(unittest.TestCase):
+    def test_only_words_reach_match_syntax(self):
+        terms = _terms('Сервис" OR title:* NEAR(a b) -- ')
+        self.assertEqual(terms, ["сервис", "or", "title", "near", "a", "b"])
+        self.assertEqual(_fts5_query(["сервис", "or"]), '"сервис"* "or"*')
+        self.assertEqual(_tsquery(["сервис", "or"]), "сервис:* & or:*")
+
+    def test_terms_are_capped(self):
+        self.assertEqual(len(_terms(" ".join(f"w{i}" for i in range(20)))), 8)
+        self.assertEqual(_terms("  !!! "), [])
+
+
+class ForumSearchTests(unittest.TestCase):
+    def setUp(self):
+        self.headers = coach_headers(create_coach())
+        self.word = _word()
+
+    def _search(self, q: str) -> list[dict]:
+        response = get_client().get("/api/forum/search", params={"q": q}, headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.text)
+        return response.json()
+
+    def test_title_match_outranks_body_match_and_has_snippet(self):
+        in_body = _create_topic(self.headers, "Тема", f"много текст около {self.word} тук")
+        in_title = _create_topic(self.headers, f"{self.word} заглавие", "текст")
+
+        hits = self._search(self.word)
+        self.assertEqual([hit["post"]["id"] for hit in hits], [in_title["id"], in_body["id"]])
+        self.assertGreater(hits[0]["score"], hits[1]["score"])
+        self.assertIn(f"**{self.word}**", hits[1]["snippet"])
+
+    def test_reply_match_reports_reply_and_one_hit_per_topic(self):
+        post = _create_topic(self.headers, "Тема", "текст")
+        first = _reply(post["id"], admin_headers(), f"отговор с {self.word}")
+        second = _reply(post["id"], admin_headers(), f"още един {self.word}")
+
+        hits = self._search(self.word)
+        self.assertEqual(len(hits), 1)
+        self.assertEqual(hits[0]["post"]["id"], post["id"])
+        self.assertIn(hits[0]["reply_id"], {first["id"], second["id"]})
+
+    def test_prefix_search_and_listing_filter(self):
+        post = _create_topic(self.headers, "Тема", f"думата {self.word}")
+        self.assertEqual([hit["post"]["id"] for hit in self._search(self.word[:-3])], [post["id"]])
+
+        page = get_client().get("/api/forum/posts", params={"query": self.word}, headers=self.headers).json()
+        self.assertEqual([item["id"] for item in page["items"]], [post["id"]])
+
+    def test_update_and_delete_triggers_keep_index_in_sync(self):
+        post = _create_topic(self.headers, "Тема", f"старо {self.word}")
+        reply = _reply(post["id"], self.headers, f"отговор {self.word}")
+        new_word = _word()
+
+        get_client().put(f"/api/forum/posts/{post['id']}", json={"content": f"ново {new_word}"}, headers=self.headers)
+        hits = self._search(self.word)
+        self.assertEqual(hits[0]["reply_id"], reply["id"])
+        self.assertEqual([hit["post"]["id"] for hit in self._search(new_word)], [post["id"]])
+
+        get_client().delete(f"/api/forum/posts/{post['id']}/replies/{reply['id']}", headers=self.headers)
+        self.assertEqual(self._search(self.word), [])
+
+        get_client().delete(f"/api/forum/posts/{post['id']}", headers=self.headers)
+        self.assertEqual(self._search(new_word), [])
+
+    def test_detected_backend_is_per_engine(self):
+        db = SessionLocal()
+        try:
+            self.assertEqual(_search_backend(db), "fts5")
+        finally:
+            db.close()
+        with Session(create_engine("sqlite://")) as other:
+            self.assertIsNone(_search_backend(other))
+
+    def test_ensure_index_is_idempotent(self):
+        _create_topic(self.headers, f"{self.word} тема", "текст")
+        with engine.begin() as conn:
+            self.assertTrue(ensure_sqlite_search_index(conn))
+        self.assertEqual(len(self._search(self.word)), 1)
+
+
+class SqliteSearchMigrationTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        self.migration = _load_migration()
+        with self.engine.begin() as conn:
+            conn.execute(text("CREATE TABLE forum_posts (id INTEGER PRIMARY KEY, title TEXT, content TEXT)"))
+            conn.execute(text("CREATE TABLE forum_replies (id INTEGER PRIMARY KEY, post_id INTEGER, content TEXT)"))
+            conn.execute(text("INSERT INTO forum_posts VALUES (1, 'стара тема', 'текст')"))
+            conn.execute(text("INSERT INTO forum_replies VALUES (1, 1, 'стар отговор')"))
+
+    def _run(self, step) -> None:
+        with self.engine.begin() as conn:
+            with Operations.context(MigrationContext.configure(conn)):
+                step()
+
+    def _matches(self, word: str) -> list[tuple]:
+        with self.engine.connect() as conn:
+            return conn.execute(
+                text("SELECT post_id, reply_id FROM forum_search WHERE forum_search MATCH :q ORDER BY rowid"),
+                {"q": word},
+            ).all()
+
+    def test_upgrade_backfills_and_installs_triggers(self):
+        self._run(self.migration.upgrade)
+        self.assertEqual(self._matches("стара"), [(1, None)])
+        self.assertEqual(self._matches("отговор"), [(1, 1)])
+
+        with self.engine.begin() as conn:
+            conn.execute(text("INSERT INTO forum_posts VALUES (2, 'нова', 'блокада')"))
+            conn.execute(text("UPDATE forum_replies SET content = 'сменен' WHERE id = 1"))
+        self.assertEqual(self._matches("блокада"), [(2, None)])
+        self.assertEqual(self._matches("отговор"), [])
+
+        # Повторно пускане не дублира backfill-а.
+        self._run(self.migration.upgrade)
+        self.assertEqual(self._matches("стара"), [(1, None)])
+
+    def test_migration_uses_runtime_schema(self):
+        self.assertIs(self.migration.SQLITE_SEARCH_DDL, SQLITE_SEARCH_DDL)
+
+    def test_downgrade_drops_index_and_triggers(self):
+        self._run(self.migration.upgrade)
+        self._run(self.migration.downgrade)
+        with self.engine.connect() as conn:
+            names = conn.execute(text("SELECT name FROM sqlite_master WHERE name LIKE 'forum_%search%'")).all()
+        self.assertEqual(names, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+
+from api_support import coach_headers, create_coach, get_client, unique
+
+from app.database import SessionLocal
+from app.models import ForumPost, ForumPostTag
+from app.services.forum_service import backfill_post_tags
+
+
+def _index_tags(post_id: int) -> set[str]:
+    db = SessionLocal()
+    try:
+        return {row[0] for row in db.query(ForumPostTag.tag).filter(ForumPostTag.post_id == post_id)}
+    finally:
+        db.close()
+
+
+class ForumTagSyncTests(unittest.TestCase):
+    def setUp(self):
+        self.headers = coach_headers(create_coach())
+        self.serve, self.block, self.spike = unique("serve"), unique("block"), unique("spike")
+
+    def _create(self, tags: list[str]) -> dict:
+        response = get_client().post(
+            "/api/forum/posts", json={"title": "Тема", "content": "текст", "tags": tags}, headers=self.headers
+        )
+        assert response.status_code == 201, response.text
+        return response.json()
+
+    def _counts(self) -> dict[str, int]:
+        rows = get_client().get("/api/forum/tags/counts?limit=200", headers=self.headers).json()
+        return {row["tag"]: row["count"] for row in rows}
+
+    def _tagged(self, tag: str) -> set[int]:
+        page = get_client().get(f"/api/forum/posts?tag={tag}&page_size=50", headers=self.headers).json()
+        return {item["id"] for item in page["items"]}
+
+    def test_tags_are_normalized_and_indexed(self):
+        post = self._create([f" {self.serve.upper()} ", self.serve, "", self.block])
+        self.assertEqual(post["tags"], [self.serve, self.block])
+        self.assertEqual(_index_tags(post["id"]), {self.serve, self.block})
+
+    def test_update_diffs_index_and_counts_follow(self):
+        first = self._create([self.serve, self.block])
+        second = self._create([self.serve])
+        self.assertEqual(self._counts()[self.serve], 2)
+
+        response = get_client().put(
+            f"/api/forum/posts/{first['id']}", json={"tags": [self.block, self.spike]}, headers=self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(_index_tags(first["id"]), {self.block, self.spike})
+
+        counts = self._counts()
+        self.assertEqual((counts[self.serve], counts[self.block], counts[self.spike]), (1, 1, 1))
+        self.assertEqual(self._tagged(self.serve), {second["id"]})
+        self.assertEqual(self._tagged(self.spike.upper()), {first["id"]})
+
+    def test_deleting_topic_removes_its_tags(self):
+        post = self._create([self.spike])
+        get_client().delete(f"/api/forum/posts/{post['id']}", headers=self.headers)
+        self.assertNotIn(self.spike, self._counts())
+        self.assertEqual(_index_tags(post["id"]), set())
+
+    def test_backfill_fills_index_from_json_column(self):
+        post = self._create([self.serve])
+        db = SessionLocal()
+        try:
+            db.query(ForumPostTag).filter(ForumPostTag.post_id == post["id"]).delete()
+            db.get(ForumPost, post["id"]).tags = [self.serve, self.block]
+            db.commit()
+            backfill_post_tags(db)
+        finally:
+            db.close()
+        self.assertEqual(_index_tags(post["id"]), {self.serve, self.block})
+
+
+if __name__ == "__main__":
+    unittest.main()
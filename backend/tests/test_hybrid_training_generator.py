@@ -1,6 +1,6 @@
 import unittest
 
-from backend.app.services.hybrid_training_generator import generate_training_session, hard_filter_drills
+from app.services.hybrid_training_generator import generate_training_session, hard_filter_drills
 
 
 def _mk_drill(
@@ -0,0 +1,41 @@
+import io
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+import api_support  # noqa: F401 – тестова среда (settings) преди app
+from PIL import Image
+
+import app.main as main
+from app.services.image_derivatives import pillow_available, render_derivatives
+
+
+class ImageDerivativeTests(unittest.TestCase):
+    def test_pillow_is_installed(self):
+        # Декларирана зависимост – без нея качванията тихо остават без производни.
+        self.assertTrue(pillow_available())
+
+    def test_renders_bounded_widths_without_upscaling(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / "photo.png"
+            Image.new("RGB", (800, 400), "orange").save(source)
+
+            result = render_derivatives(str(source), tmp, (480, 1280))
+
+            self.assertEqual([(item["width"], item["height"]) for item in result["items"]], [(480, 240), (800, 400)])
+            for item in result["items"]:
+                self.assertTrue(Path(item["path"]).is_file())
+            self.assertTrue(result["placeholder"].startswith("data:image/"))
+
+    def test_startup_warns_when_pillow_is_missing(self):
+        output = io.StringIO()
+        with mock.patch.object(main, "pillow_available", return_value=False), \
+                mock.patch.object(main, "init_db"), redirect_stdout(output):
+            main.startup_event()
+        self.assertIn("Pillow is not installed", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
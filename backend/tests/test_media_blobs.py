@@ -0,0 +1,272 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from api_support import coach_headers, create_coach, get_client
+from fastapi import HTTPException
+
+from app.database import SessionLocal
+from app.models import MediaBlob
+from app.routers.media import _parse_range
+import app.services.media_storage as media_storage_module
+from app.services.media_storage import acquire_blob, media_storage, purge_blobs, release_blobs
+
+
+def setUpModule():
+    get_client()  # startup създава таблиците
+
+
+def _staged(content: bytes) -> tuple[str, Path]:
+    fd, name = tempfile.mkstemp(suffix=".bin")
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(content)
+    return hashlib.sha256(content).hexdigest(), Path(name)
+
+
+def _ref_count(sha256: str):
+    db = SessionLocal()
+    try:
+        blob = db.get(MediaBlob, sha256)
+        return None if blob is None else blob.ref_count
+    finally:
+        db.close()
+
+
+def _acquire_and_commit(content: bytes) -> str:
+    sha256, path = _staged(content)
+    db = SessionLocal()
+    try:
+        acquire_blob(db, sha256, path, len(content), "application/octet-stream")
+        db.commit()
+    finally:
+        db.close()
+    return sha256
+
+
+class BlobRefCountTests(unittest.TestCase):
+    def test_same_content_is_stored_once_and_counted(self):
+        content = os.urandom(64)
+        sha256 = _acquire_and_commit(content)
+        sha256_again = _acquire_and_commit(content)
+        self.assertEqual(sha256, sha256_again)
+        self.assertEqual(_ref_count(sha256), 2)
+        with media_storage.local_copy(sha256) as path:
+            self.assertEqual(Path(path).read_bytes(), content)
+
+    def test_release_to_zero_deletes_row_and_purge_removes_content(self):
+        sha256 = _acquire_and_commit(os.urandom(64))
+        db = SessionLocal()
+        try:
+            self.assertEqual(release_blobs(db, [sha256, None]), [sha256])
+            db.commit()
+            purge_blobs(db, [sha256])
+        finally:
+            db.close()
+        self.assertIsNone(_ref_count(sha256))
+        with media_storage.local_copy(sha256) as path:
+            self.assertFalse(Path(path).exists())
+
+    def test_release_keeps_content_still_referenced(self):
+        content = os.urandom(64)
+        sha256 = _acquire_and_commit(content)
+        _acquire_and_commit(content)
+        db = SessionLocal()
+        try:
+            self.assertEqual(release_blobs(db, [sha256]), [])
+            db.commit()
+        finally:
+            db.close()
+        self.assertEqual(_ref_count(sha256), 1)
+
+    def test_concurrent_insert_of_same_new_content_is_counted_not_failed(self):
+        content = os.urandom(64)
+        sha256, path = _staged(content)
+        real_locked_blob = media_storage_module._locked_blob
+        calls = []
+
+        def stale_first_lookup(db, ident):
+            # Първото четене "не вижда" реда – другото качване го вмъква точно след него.
+            calls.append(ident)
+            if len(calls) == 1:
+                _acquire_and_commit(content)
+                return None
+            return real_locked_blob(db, ident)
+
+        db = SessionLocal()
+        try:
+            with mock.patch.object(media_storage_module, "_locked_blob", side_effect=stale_first_lookup):
+                acquire_blob(db, sha256, path, len(content), "application/octet-stream")
+            db.commit()
+        finally:
+            db.close()
+        self.assertEqual(_ref_count(sha256), 2)
+
+    def test_row_exists_before_new_content_is_written(self):
+        sha256, path = _staged(os.urandom(64))
+        db = SessionLocal()
+        real_put = media_storage.put
+        seen = []
+
+        def put(key, source, content_type):
+            # purge_blobs работи само под реда – той трябва да е вмъкнат преди файла.
+            seen.append(db.query(MediaBlob).filter(MediaBlob.sha256 == key).count())
+            real_put(key, source, content_type)
+
+        try:
+            with mock.patch.object(media_storage, "put", side_effect=put):
+                acquire_blob(db, sha256, path, 64, "application/octet-stream")
+            db.commit()
+        finally:
+            db.close()
+        self.assertEqual(seen, [1])
+
+    def test_purge_skips_content_that_is_referenced_again(self):
+        content = os.urandom(64)
+        sha256 = _acquire_and_commit(content)
+        db = SessionLocal()
+        try:
+            orphaned = release_blobs(db, [sha256])
+            db.commit()
+            _acquire_and_commit(content)  # ново качване преди purge-а на старото
+            purge_blobs(db, orphaned)
+        finally:
+            db.close()
+        self.assertEqual(_ref_count(sha256), 1)
+        with media_storage.local_copy(sha256) as path:
+            self.assertEqual(Path(path).read_bytes(), content)
+
+    def test_acquire_rewrites_content_of_row_without_references(self):
+        content = os.urandom(64)
+        sha256 = _acquire_and_commit(content)
+        db = SessionLocal()
+        try:
+            db.get(MediaBlob, sha256).ref_count = 0
+            db.commit()
+        finally:
+            db.close()
+        with media_storage.local_copy(sha256) as path:
+            Path(path).unlink()
+
+        _acquire_and_commit(content)
+        self.assertEqual(_ref_count(sha256), 1)
+        with media_storage.local_copy(sha256) as path:
+            self.assertEqual(Path(path).read_bytes(), content)
+
+    def test_purge_of_unreferenced_content_leaves_no_tombstone(self):
+        sha256, path = _staged(os.urandom(64))
+        media_storage.put(sha256, path, "application/octet-stream")
+        db = SessionLocal()
+        try:
+            purge_blobs(db, [sha256, None])
+        finally:
+            db.close()
+        self.assertIsNone(_ref_count(sha256))
+        with media_storage.local_copy(sha256) as stored:
+            self.assertFalse(Path(stored).exists())
+
+    def test_rollback_of_caller_transaction_undoes_new_blob_row(self):
+        sha256, path = _staged(os.urandom(64))
+        db = SessionLocal()
+        try:
+            acquire_blob(db, sha256, path, 64, "application/octet-stream")
+            db.rollback()
+        finally:
+            db.close()
+        self.assertIsNone(_ref_count(sha256))
+
+
+class ParseRangeTests(unittest.TestCase):
+    def test_supported_forms(self):
+        self.assertEqual(_parse_range("bytes=0-9", 100), (0, 9))
+        self.assertEqual(_parse_range("bytes=90-", 100), (90, 99))
+        self.assertEqual(_parse_range("bytes=-10", 100), (90, 99))
+        self.assertEqual(_parse_range("bytes=-500", 100), (0, 99))
+        self.assertEqual(_parse_range("bytes=50-500", 100), (50, 99))
+
+    def test_unsupported_header_means_whole_file(self):
+        self.assertIsNone(_parse_range("bytes=0-1,5-6", 100))
+        self.assertIsNone(_parse_range("items=0-1", 100))
+        self.assertIsNone(_parse_range("bytes=-", 100))
+
+    def test_unsatisfiable_range(self):
+        for header in ("bytes=100-", "bytes=20-10", "bytes=-0"):
+            with self.assertRaises(HTTPException) as ctx:
+                _parse_range(header, 100)
+            self.assertEqual(ctx.exception.status_code, 416)
+            self.assertEqual(ctx.exception.headers["Content-Range"], "bytes */100")
+
+
+def _upload_forum_media(file_name: str, content: bytes, content_type: str) -> dict:
+    headers = coach_headers(create_coach())
+    client = get_client()
+    post_id = client.post("/api/forum/posts", json={"title": "Медия", "content": "текст"}, headers=headers).json()["id"]
+    response = client.post(
+        f"/api/forum/posts/{post_id}/media",
+        files={"file": (file_name, content, content_type)},
+        headers=headers,
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+class MediaDownloadTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.content = os.urandom(1000)
+        cls.url = _upload_forum_media("clip.mp4", cls.content, "video/mp4")["url"]
+
+    def test_full_download_with_validators(self):
+        response = get_client().get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, self.content)
+        self.assertEqual(response.headers["accept-ranges"], "bytes")
+        self.assertIn("immutable", response.headers["cache-control"])
+        self.assertEqual(response.headers["content-type"], "video/mp4")
+        self.assertEqual(response.headers["x-content-type-options"], "nosniff")
+        self.assertNotIn("content-disposition", response.headers)
+
+    def test_range_request_returns_partial_content(self):
+        response = get_client().get(self.url, headers={"Range": "bytes=10-19"})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, self.content[10:20])
+        self.assertEqual(response.headers["content-range"], "bytes 10-19/1000")
+
+    def test_unsatisfiable_range_returns_416(self):
+        response = get_client().get(self.url, headers={"Range": "bytes=5000-"})
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response.headers["content-range"], "bytes */1000")
+
+    def test_matching_etag_returns_304(self):
+        etag = get_client().get(self.url).headers["etag"]
+        response = get_client().get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+
+class MediaContentTypeTests(unittest.TestCase):
+    def test_browser_supplied_type_is_ignored(self):
+        media = _upload_forum_media("x.png", b"<script>alert(1)</script>" + os.urandom(16), "text/html")
+        self.assertEqual(media["mime_type"], "image/png")
+
+        response = get_client().get(media["url"])
+        self.assertEqual(response.headers["content-type"], "image/png")
+        self.assertEqual(response.headers["x-content-type-options"], "nosniff")
+
+    def test_documents_and_unknown_names_are_attachments(self):
+        url = _upload_forum_media("plan.pdf", os.urandom(32), "text/html")["url"]
+        response = get_client().get(url)
+        self.assertEqual(response.headers["content-type"], "application/pdf")
+        self.assertEqual(response.headers["content-disposition"], "attachment; filename*=UTF-8''plan.pdf")
+
+        # Същото съдържание под друго име в URL-а – типът следва името, HTML никога.
+        sha256 = url.split("/")[-2]
+        response = get_client().get(f"/api/media/{sha256}/page.html")
+        self.assertEqual(response.headers["content-type"], "application/octet-stream")
+        self.assertTrue(response.headers["content-disposition"].startswith("attachment;"))
+
+
+if __name__ == "__main__":
+    unittest.main()
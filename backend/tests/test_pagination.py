@@ -0,0 +1,64 @@
+import unittest
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import Column, DateTime, Integer, create_engine, select
+from sqlalchemy.orm import Session, declarative_base
+
+from app.pagination import decode_cursor, encode_cursor, keyset_filter
+
+Base = declarative_base()
+
+
+class Row(Base):
+    __tablename__ = "rows"
+
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, nullable=False)
+
+
+class KeysetCursorTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = create_engine("sqlite://")
+        Base.metadata.create_all(cls.engine)
+        start = datetime(2026, 1, 1, 12, 0, 0, 123456)
+        with Session(cls.engine) as db:
+            # По три реда с еднакво created_at – cursor-ът трябва да ги разграничи по id.
+            db.add_all(Row(id=i, created_at=start + timedelta(minutes=i // 3)) for i in range(1, 11))
+            db.commit()
+
+    def _walk(self, descending: bool, limit: int = 4) -> list[int]:
+        order = (Row.created_at.desc(), Row.id.desc()) if descending else (Row.created_at, Row.id)
+        seen, cursor = [], None
+        with Session(self.engine) as db:
+            while True:
+                stmt = select(Row).order_by(*order).limit(limit)
+                if cursor:
+                    stmt = stmt.where(keyset_filter(Row.created_at, Row.id, cursor, descending=descending))
+                page = db.scalars(stmt).all()
+                seen.extend(row.id for row in page)
+                if len(page) < limit:
+                    return seen
+                cursor = encode_cursor(page[-1].created_at, page[-1].id)
+
+    def test_descending_walk_visits_every_row_once(self):
+        self.assertEqual(self._walk(descending=True), list(range(10, 0, -1)))
+
+    def test_ascending_walk_visits_every_row_once(self):
+        self.assertEqual(self._walk(descending=False), list(range(1, 11)))
+
+    def test_cursor_round_trip(self):
+        stamp = datetime(2026, 3, 4, 5, 6, 7, 890)
+        self.assertEqual(decode_cursor(encode_cursor(stamp, 42)), (stamp, 42))
+        self.assertNotIn("=", encode_cursor(stamp, 42))
+
+    def test_invalid_cursor_is_400(self):
+        for cursor in ("garbage", encode_cursor(None, 1)):
+            with self.assertRaises(HTTPException) as ctx:
+                decode_cursor(cursor)
+            self.assertEqual(ctx.exception.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
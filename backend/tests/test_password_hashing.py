@@ -0,0 +1,69 @@
+import threading
+import unittest
+from unittest import mock
+
+from api_support import admin_headers, create_coach, get_client, login
+from passlib.hash import bcrypt
+
+from app.auth import pwd_context
+from app.database import SessionLocal
+from app.models import User
+from app.settings import settings
+
+
+def _stored_hash(user_id: int) -> str:
+    db = SessionLocal()
+    try:
+        return db.get(User, user_id).hashed_password
+    finally:
+        db.close()
+
+
+class PasswordHashingTests(unittest.TestCase):
+    def _record_hash_threads(self):
+        threads = []
+        original = pwd_context.hash
+
+        def recording_hash(secret, *args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return original(secret, *args, **kwargs)
+
+        return threads, mock.patch.object(pwd_context, "hash", side_effect=recording_hash)
+
+    def test_coach_create_and_password_change_hash_in_password_pool(self):
+        get_client()  # startup (init_db) хешира паролата на admin-а – извън проверката
+        threads, patch = self._record_hash_threads()
+        with patch:
+            coach = create_coach()
+            get_client().patch(
+                f"/users/users/coaches/{coach['id']}", json={"password": "other"}, headers=admin_headers()
+            )
+        self.assertEqual(len(threads), 2, threads)
+        self.assertTrue(all(name.startswith("password-hash") for name in threads), threads)
+
+    def test_login_rehashes_password_with_other_cost(self):
+        coach = create_coach()
+        cheap_hash = bcrypt.using(rounds=4).hash(coach["password"])
+        db = SessionLocal()
+        try:
+            db.get(User, coach["id"]).hashed_password = cheap_hash
+            db.commit()
+        finally:
+            db.close()
+
+        login(coach["email"], coach["password"])
+
+        new_hash = _stored_hash(coach["id"])
+        self.assertNotEqual(new_hash, cheap_hash)
+        self.assertIn(f"${settings.bcrypt_rounds:02d}$", new_hash)
+        self.assertTrue(pwd_context.verify(coach["password"], new_hash))
+
+    def test_login_keeps_hash_with_current_cost(self):
+        coach = create_coach()
+        stored = _stored_hash(coach["id"])
+        login(coach["email"], coach["password"])
+        self.assertEqual(_stored_hash(coach["id"]), stored)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from unittest import mock
+
+from api_support import admin_headers, bearer, create_coach, get_client, login
+
+import app.database as database
+from app.principal_cache import principal_cache
+
+
+class _SessionCounter:
+    """Брои колко сесии отваря заявката през get_db / get_async_db."""
+
+    def __init__(self):
+        self.sync = 0
+        self.async_ = 0
+
+    def __enter__(self):
+        sync_factory, async_factory = database.SessionLocal, database.AsyncSessionLocal
+
+        def open_sync():
+            self.sync += 1
+            return sync_factory()
+
+        def open_async():
+            self.async_ += 1
+            return async_factory()
+
+        self._patches = [
+            mock.patch.object(database, "SessionLocal", open_sync),
+            mock.patch.object(database, "AsyncSessionLocal", open_async),
+        ]
+        for patch in self._patches:
+            patch.start()
+        return self
+
+    def __exit__(self, *exc):
+        for patch in self._patches:
+            patch.stop()
+
+
+class PrincipalCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.coach = create_coach()
+        self.headers = bearer(login(self.coach["email"], self.coach["password"])["access_token"])
+
+    def test_sync_handler_shares_its_session_with_auth(self):
+        headers = admin_headers()
+        principal_cache.clear()
+        with _SessionCounter() as sessions:
+            response = get_client().get("/users/users/coaches", headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((sessions.sync, sessions.async_), (1, 0))
+
+    def test_async_handler_shares_its_session_with_auth(self):
+        principal_cache.clear()
+        with _SessionCounter() as sessions:
+            response = get_client().get("/api/articles", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((sessions.sync, sessions.async_), (0, 1))
+
+    def test_cached_principal_needs_no_query(self):
+        get_client().get("/auth/me", headers=self.headers)
+        self.assertIsNotNone(principal_cache.get(self.coach["id"]))
+        with mock.patch("app.principal_cache._cache_principal") as loaded:
+            response = get_client().get("/auth/me", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        loaded.assert_not_called()
+
+    def test_coach_update_invalidates_principal(self):
+        get_client().get("/auth/me", headers=self.headers)
+        get_client().patch(
+            f"/users/users/coaches/{self.coach['id']}", json={"name": "Сменено име"}, headers=admin_headers()
+        )
+        self.assertEqual(get_client().get("/auth/me", headers=self.headers).json()["name"], "Сменено име")
+
+    def test_club_suspension_applies_immediately(self):
+        self.assertEqual(get_client().get("/auth/me", headers=self.headers).status_code, 200)
+        get_client().post(f"/clubs/clubs/{self.coach['club_id']}/toggle-access", headers=admin_headers())
+        self.assertEqual(get_client().get("/auth/me", headers=self.headers).status_code, 403)
+        self.assertEqual(get_client().get("/api/articles", headers=self.headers).status_code, 403)
+
+    def test_deleted_coach_is_rejected(self):
+        get_client().get("/auth/me", headers=self.headers)
+        get_client().delete(f"/users/users/coaches/{self.coach['id']}", headers=admin_headers())
+        self.assertEqual(get_client().get("/auth/me", headers=self.headers).status_code, 401)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import asyncio
+import json
+import unittest
+from unittest import mock
+
+import api_support  # noqa: F401 – тестова среда (settings) преди app
+
+import app.database as database
+import app.pubsub as pubsub
+from app.pubsub import InMemoryBroker, PostgresBroker
+
+
+class InMemoryBrokerTests(unittest.TestCase):
+    def test_publish_reaches_every_subscriber_of_the_channel(self):
+        async def scenario():
+            broker = InMemoryBroker()
+            first, second = broker.subscribe("user:1"), broker.subscribe("user:1")
+            other = broker.subscribe("user:2")
+            broker.publish("user:1", {"n": 1})
+            received = [await asyncio.wait_for(sub.get(), 1) for sub in (first, second)]
+            self.assertTrue(other.queue.empty())
+            self.assertEqual(broker.channels("user:"), {"user:1", "user:2"})
+            first.close()
+            second.close()
+            self.assertEqual(broker.channels("user:"), {"user:2"})
+            return received
+
+        self.assertEqual(asyncio.run(scenario()), [{"n": 1}, {"n": 1}])
+
+    def test_slow_subscriber_drops_instead_of_growing(self):
+        async def scenario():
+            broker = InMemoryBroker(max_queue=2)
+            subscription = broker.subscribe("user:1")
+            for n in range(5):
+                broker.publish("user:1", n)
+            await asyncio.sleep(0)
+            return subscription.queue.qsize()
+
+        self.assertEqual(asyncio.run(scenario()), 2)
+
+
+class PostgresBrokerTests(unittest.TestCase):
+    def setUp(self):
+        self.broker = PostgresBroker("postgresql+psycopg://u:p@db/volley")
+
+    def test_conninfo_drops_sqlalchemy_driver(self):
+        self.assertEqual(self.broker._conninfo, "postgresql://u:p@db/volley")
+
+    def test_publish_sends_notify_with_target_channel(self):
+        engine = mock.MagicMock()
+        with mock.patch.object(database, "engine", engine):
+            self.broker.publish("user:7", {"type": "unread_count", "unread_count": 3})
+        conn = engine.begin.return_value.__enter__.return_value
+        params = conn.execute.call_args.args[1]
+        self.assertEqual(params["name"], PostgresBroker.NOTIFY_CHANNEL)
+        self.assertEqual(
+            json.loads(params["payload"]),
+            {"channel": "user:7", "message": {"type": "unread_count", "unread_count": 3}},
+        )
+
+    def test_notification_is_delivered_to_local_subscribers(self):
+        async def scenario():
+            with mock.patch.object(PostgresBroker, "_listen", new=mock.AsyncMock()):
+                subscription = self.broker.subscribe("user:7")
+            self.broker._dispatch(json.dumps({"channel": "user:7", "message": {"n": 1}}))
+            self.broker._dispatch("not json")
+            message = await asyncio.wait_for(subscription.get(), 1)
+            subscription.close()
+            return message
+
+        self.assertEqual(asyncio.run(scenario()), {"n": 1})
+
+    def test_connected_users_are_unknown_across_workers(self):
+        with mock.patch.object(pubsub, "broker", self.broker):
+            self.assertIsNone(pubsub.connected_user_ids())
+
+    def test_unknown_backend_is_rejected(self):
+        with mock.patch.object(pubsub.settings, "pubsub_backend", "kafka"):
+            with self.assertRaises(ValueError):
+                pubsub._create_broker()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+from datetime import timedelta
+
+from api_support import admin_headers, create_coach, get_client, login
+
+from app.database import SessionLocal
+from app.models import RefreshToken
+from app.services.token_service import _hash_token
+
+
+def _refresh(token: str):
+    return get_client().post("/auth/refresh", json={"refresh_token": token})
+
+
+def _age_rotation(token: str, seconds: int = 60) -> None:
+    """Премества отмяната на токена назад във времето – извън grace прозореца."""
+    db = SessionLocal()
+    try:
+        row = db.get(RefreshToken, _hash_token(token))
+        row.revoked_at = row.revoked_at - timedelta(seconds=seconds)
+        db.commit()
+    finally:
+        db.close()
+
+
+class RefreshTokenTests(unittest.TestCase):
+    def test_rotation_issues_new_token_and_old_one_stops_working(self):
+        first = login()["refresh_token"]
+        response = _refresh(first)
+        self.assertEqual(response.status_code, 200)
+        second = response.json()["refresh_token"]
+        self.assertNotEqual(first, second)
+        self.assertEqual(_refresh(second).status_code, 200)
+
+    def test_reuse_of_rotated_token_revokes_whole_family(self):
+        first = login()["refresh_token"]
+        second = _refresh(first).json()["refresh_token"]
+        _age_rotation(first)
+
+        self.assertEqual(_refresh(first).status_code, 401)
+        # Легитимният (последен) токен също е отменен – крадецът и потребителят влизат наново.
+        self.assertEqual(_refresh(second).status_code, 401)
+
+    def test_second_tab_reusing_just_rotated_token_stays_logged_in(self):
+        first = login()["refresh_token"]
+        from_tab_a = _refresh(first).json()["refresh_token"]
+
+        response = _refresh(first)  # tab B със същия (вече ротиран) токен
+        self.assertEqual(response.status_code, 200)
+        from_tab_b = response.json()["refresh_token"]
+        self.assertNotIn(from_tab_b, {first, from_tab_a})
+        self.assertEqual(_refresh(from_tab_a).status_code, 200)
+        self.assertEqual(_refresh(from_tab_b).status_code, 200)
+
+    def test_grace_does_not_revive_logged_out_family(self):
+        first = login()["refresh_token"]
+        second = _refresh(first).json()["refresh_token"]
+        get_client().post("/auth/logout", json={"refresh_token": second})
+        self.assertEqual(_refresh(first).status_code, 401)
+
+    def test_logout_revokes_family(self):
+        token = login()["refresh_token"]
+        response = get_client().post("/auth/logout", json={"refresh_token": token})
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(_refresh(token).status_code, 401)
+
+    def test_garbage_token_is_rejected(self):
+        self.assertEqual(_refresh("not-a-token").status_code, 401)
+
+    def test_password_change_revokes_refresh_tokens(self):
+        coach = create_coach()
+        token = login(coach["email"], coach["password"])["refresh_token"]
+
+        response = get_client().patch(
+            f"/users/users/coaches/{coach['id']}", json={"password": "new-pw"}, headers=admin_headers()
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(_refresh(token).status_code, 401)
+        self.assertEqual(_refresh(login(coach["email"], "new-pw")["refresh_token"]).status_code, 200)
+
+    def test_rename_keeps_refresh_tokens(self):
+        coach = create_coach()
+        token = login(coach["email"], coach["password"])["refresh_token"]
+        get_client().patch(
+            f"/users/users/coaches/{coach['id']}", json={"name": "Ново име"}, headers=admin_headers()
+        )
+        self.assertEqual(_refresh(token).status_code, 200)
+
+    def test_deleting_coach_revokes_refresh_tokens(self):
+        coach = create_coach()
+        token = login(coach["email"], coach["password"])["refresh_token"]
+
+        response = get_client().delete(f"/users/users/coaches/{coach['id']}", headers=admin_headers())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(_refresh(token).status_code, 401)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from unittest import mock
+
+from api_support import admin_headers, bearer, create_coach, get_client, login, unique
+
+from app.response_cache import InMemoryResponseCache
+
+
+class InMemoryResponseCacheTests(unittest.TestCase):
+    def test_invalidate_bumps_only_its_scope(self):
+        cache = InMemoryResponseCache(maxsize=8)
+        feed_key = cache.key("feed", "articles:feed")
+        article_key = cache.key(("article", 1), "article:1")
+        cache.set(feed_key, b"feed")
+        cache.set(article_key, b"article")
+
+        cache.invalidate("article:1")
+
+        self.assertEqual(cache.get(cache.key("feed", "articles:feed")), b"feed")
+        self.assertIsNone(cache.get(cache.key(("article", 1), "article:1")))
+
+    def test_key_taken_before_invalidate_is_not_served_after_it(self):
+        cache = InMemoryResponseCache(maxsize=8)
+        stale_key = cache.key("feed", "articles:feed")
+        cache.invalidate("articles:feed")
+        cache.set(stale_key, b"stale")
+        self.assertIsNone(cache.get(cache.key("feed", "articles:feed")))
+
+    def test_entries_expire_after_ttl(self):
+        cache = InMemoryResponseCache(maxsize=8, ttl_seconds=10)
+        key = cache.key("feed", "articles:feed")
+        with mock.patch("app.response_cache.time.monotonic", return_value=100.0):
+            cache.set(key, b"feed")
+        with mock.patch("app.response_cache.time.monotonic", return_value=109.0):
+            self.assertEqual(cache.get(key), b"feed")
+        with mock.patch("app.response_cache.time.monotonic", return_value=111.0):
+            self.assertIsNone(cache.get(key))
+        self.assertEqual(cache.stats()["misses"], 1)
+
+
+class ArticleCacheInvalidationTests(unittest.TestCase):
+    def setUp(self):
+        client = get_client()
+        self.coach = create_coach()
+        self.coach_headers = bearer(login(self.coach["email"], self.coach["password"])["access_token"])
+        article = client.post(
+            "/api/articles", json={"title": unique("Статия"), "content": "текст"}, headers=self.coach_headers
+        ).json()
+        self.article_id = article["id"]
+        client.post(f"/api/admin/articles/{self.article_id}/approve", headers=admin_headers())
+
+    def _details(self) -> dict:
+        response = get_client().get(f"/api/articles/{self.article_id}", headers=self.coach_headers)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def _feed_item(self) -> dict:
+        items = get_client().get("/api/articles?limit=50", headers=self.coach_headers).json()["items"]
+        return next(item for item in items if item["id"] == self.article_id)
+
+    def test_club_rename_refreshes_cached_author_label(self):
+        self.assertNotIn("Преименуван", self._details()["author_display"])
+        self._feed_item()
+
+        new_name = unique("Преименуван")
+        response = get_client().patch(
+            f"/clubs/clubs/{self.coach['club_id']}", json={"name": new_name}, headers=admin_headers()
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.assertIn(new_name, self._details()["author_display"])
+        self.assertIn(new_name, self._feed_item()["author_display"])
+
+    def test_admin_edit_refreshes_cached_details(self):
+        self._details()
+        get_client().put(
+            f"/api/admin/articles/{self.article_id}", json={"title": "Ново заглавие"}, headers=admin_headers()
+        )
+        self.assertEqual(self._details()["title"], "Ново заглавие")
+        self.assertEqual(self._feed_item()["title"], "Ново заглавие")
+
+
+if __name__ == "__main__":
+    unittest.main()
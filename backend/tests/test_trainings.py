@@ -0,0 +1,181 @@
+import unittest
+
+from api_support import admin_headers, coach_headers, create_coach, get_client, unique
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+
+from app.database import SessionLocal, engine
+from app.models import Training, TrainingDrill
+from app.services.training_service import recent_drill_ids_by_session
+
+
+def _create_training(headers: dict, title: str, **fields) -> dict:
+    response = get_client().post("/trainings/", json={"title": title, **fields}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def _create_drill(headers: dict) -> dict:
+    response = get_client().post("/drills", json={"title": unique("Упражнение"), "category": "Сервис"}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+class MyTrainingsPageTests(unittest.TestCase):
+    def setUp(self):
+        self.headers = coach_headers(create_coach())
+
+    def _walk(self, **params) -> list[int]:
+        seen, cursor = [], None
+        while True:
+            query = {"limit": 2, **params, **({"cursor": cursor} if cursor else {})}
+            page = get_client().get("/trainings/my", params=query, headers=self.headers).json()
+            seen.extend(item["id"] for item in page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                return seen
+
+    def test_cursor_walk_returns_newest_first_without_gaps(self):
+        ids = [_create_training(self.headers, f"Тренировка {i}")["id"] for i in range(5)]
+        self.assertEqual(self._walk(), ids[::-1])
+
+    def test_search_and_filters_reach_later_pages(self):
+        match = _create_training(self.headers, "Сервис и приемане", status="запазена")
+        for _ in range(4):
+            _create_training(self.headers, "Блокада")
+        generated = _create_training(self.headers, "Сервис генериран", source="генерирана")
+
+        self.assertEqual(self._walk(q="Сервис"), [generated["id"], match["id"]])
+        self.assertEqual(self._walk(status="запазена"), [match["id"]])
+        self.assertEqual(self._walk(source="генерирана"), [generated["id"]])
+        self.assertEqual(self._walk(q=str(match["id"])), [match["id"]])
+
+    def test_unknown_filter_value_is_rejected(self):
+        response = get_client().get("/trainings/my", params={"status": "draftish"}, headers=self.headers)
+        self.assertEqual(response.status_code, 422)
+
+    def test_created_at_cannot_be_null(self):
+        training = _create_training(self.headers, "Без дата")
+        db = SessionLocal()
+        try:
+            db.get(Training, training["id"]).created_at = None
+            with self.assertRaises(IntegrityError):
+                db.commit()
+        finally:
+            db.close()
+
+
+class TrainingDetailsTests(unittest.TestCase):
+    def setUp(self):
+        self.headers = coach_headers(create_coach())
+        self.drills = [_create_drill(self.headers) for _ in range(2)]
+        plan = {"warmup": [self.drills[0]["id"]], "main": [self.drills[1]["id"], self.drills[0]["id"]]}
+        self.training = _create_training(self.headers, "С упражнения", plan=plan)
+
+    def _details(self, headers: dict | None = None):
+        return get_client().get(f"/trainings/{self.training['id']}/details", headers=headers or self.headers)
+
+    def _statements(self) -> list[str]:
+        executed = []
+        listener = lambda *args: executed.append(args[2])  # noqa: E731
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            self.assertEqual(self._details().status_code, 200)
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+        return [sql for sql in executed if sql.lstrip().upper().startswith("SELECT")]
+
+    def test_details_return_compact_drills(self):
+        details = self._details().json()
+        self.assertEqual(set(details["drills"]), {str(drill["id"]) for drill in self.drills})
+        drill = details["drills"][str(self.drills[0]["id"])]
+        self.assertEqual(drill["title"], self.drills[0]["title"])
+        self.assertNotIn("coaching_points", drill)
+
+    def test_second_read_is_served_from_cache(self):
+        self._details()
+        selects = self._statements()
+        self.assertEqual(len(selects), 1)
+        self.assertNotIn("training_drills", selects[0])
+
+    def test_training_and_drill_edits_refresh_cached_details(self):
+        self._details()
+        get_client().patch(f"/trainings/{self.training['id']}", json={"plan": {"main": [self.drills[1]["id"]]}}, headers=self.headers)
+        self.assertEqual(set(self._details().json()["drills"]), {str(self.drills[1]["id"])})
+
+        get_client().patch(f"/drills/{self.drills[1]['id']}", json={"title": "Ново име"}, headers=admin_headers())
+        self.assertEqual(self._details().json()["drills"][str(self.drills[1]["id"])]["title"], "Ново име")
+
+    def test_other_coach_gets_404(self):
+        self._details()
+        self.assertEqual(self._details(coach_headers(create_coach())).status_code, 404)
+
+
+class TrainingDrillsSyncTests(unittest.TestCase):
+    def setUp(self):
+        self.coach = create_coach()
+        self.headers = coach_headers(self.coach)
+        self.a, self.b, self.c = (_create_drill(self.headers)["id"] for _ in range(3))
+
+    def _rows(self, training_id: int) -> list[tuple]:
+        db = SessionLocal()
+        try:
+            return (
+                db.query(TrainingDrill.section, TrainingDrill.position, TrainingDrill.drill_id)
+                .filter(TrainingDrill.training_id == training_id)
+                .order_by(TrainingDrill.section, TrainingDrill.position)
+                .all()
+            )
+        finally:
+            db.close()
+
+    def test_rows_follow_the_plan_on_create_and_update(self):
+        # Несъществуващо упражнение и дубъл в секцията не влизат в индекса.
+        training = _create_training(self.headers, "План", plan={"main": [self.a, self.b, self.a, 999999]})
+        self.assertEqual(self._rows(training["id"]), [("main", 0, self.a), ("main", 1, self.b)])
+
+        # Пренареждане в същата секция не удря uq_training_drill_section.
+        response = get_client().patch(
+            f"/trainings/{training['id']}",
+            json={"plan": {"main": [self.b, self.a], "cooldown": [self.c]}},
+            headers=self.headers,
+        )
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertEqual(
+            self._rows(training["id"]), [("cooldown", 0, self.c), ("main", 0, self.b), ("main", 1, self.a)]
+        )
+
+    def test_usage_queries_read_the_index(self):
+        mine = _create_training(self.headers, "Моя", plan={"main": [self.a, self.b]})
+        other_headers = coach_headers(create_coach())
+        other = _create_training(other_headers, "Чужда", plan={"main": [self.a]})
+
+        own_view = get_client().get(f"/drills/{self.a}/trainings", headers=self.headers).json()
+        self.assertEqual([item["id"] for item in own_view], [mine["id"]])
+        admin_view = get_client().get(f"/drills/{self.a}/trainings", headers=admin_headers()).json()
+        self.assertEqual({item["id"] for item in admin_view}, {mine["id"], other["id"]})
+
+        popular = get_client().get("/drills/popular", params={"limit": 100}, headers=self.headers).json()
+        counts = {item["drill_id"]: item["trainings_count"] for item in popular}
+        self.assertEqual((counts[self.a], counts[self.b]), (2, 1))
+        self.assertNotIn(self.c, counts)
+
+    def test_recent_sessions_include_manual_trainings(self):
+        _create_training(self.headers, "Първа", plan={"main": [self.a]})
+        _create_training(self.headers, "Втора", plan={"warmup": [self.c], "main": [self.b, self.c]})
+        db = SessionLocal()
+        try:
+            self.assertEqual(recent_drill_ids_by_session(db, self.coach["id"]), [[self.b, self.c], [self.a]])
+        finally:
+            db.close()
+
+    def test_deleting_a_drill_drops_its_rows(self):
+        training = _create_training(self.headers, "План", plan={"main": [self.a, self.b]})
+        response = get_client().delete(f"/drills/{self.a}", headers=admin_headers())
+        self.assertEqual(response.status_code, 204)
+        # plan JSON не се пипа, затова позицията на останалото остава 1.
+        self.assertEqual(self._rows(training["id"]), [("main", 1, self.b)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import hashlib
+import io
+import unittest
+from unittest import mock
+
+from api_support import coach_headers, create_coach, get_client
+from fastapi import HTTPException, UploadFile
+
+from app.services import upload_service
+from app.services.media_storage import media_storage
+from app.services.upload_service import stage_upload
+
+
+class _ReadRecorder(io.BytesIO):
+    def __init__(self, content: bytes):
+        super().__init__(content)
+        self.reads: list[int] = []
+
+    def read(self, size: int = -1) -> bytes:
+        self.reads.append(size)
+        return super().read(size)
+
+
+def _part_files() -> set:
+    staging_dir = media_storage.staging_dir
+    return set(staging_dir.glob("*.part")) if staging_dir.exists() else set()
+
+
+class StageUploadTests(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(upload_service, "CHUNK_SIZE", 4)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.before = _part_files()
+
+    def test_streams_in_chunks_and_hashes_in_one_pass(self):
+        content = b"0123456789"
+        source = _ReadRecorder(content)
+        staged = stage_upload(UploadFile(file=source, filename="моят файл.PNG"))
+        self.addCleanup(staged.discard)
+
+        self.assertEqual(source.reads, [4, 4, 4, 4])
+        self.assertEqual(staged.path.read_bytes(), content)
+        self.assertEqual((staged.size, staged.sha256), (len(content), hashlib.sha256(content).hexdigest()))
+        self.assertEqual((staged.name, staged.mime_type), ("моят_файл.PNG", "image/png"))
+
+    def test_limit_is_enforced_while_reading_and_part_file_is_removed(self):
+        source = _ReadRecorder(b"x" * 100)
+        with self.assertRaises(HTTPException) as ctx:
+            stage_upload(UploadFile(file=source, filename="big.mp4"), max_size=10)
+        self.assertEqual(ctx.exception.status_code, 400)
+        # Спира на първото парче над лимита, без да дочита останалото.
+        self.assertEqual(len(source.reads), 3)
+        self.assertEqual(_part_files(), self.before)
+
+    def test_empty_file_is_rejected_when_not_allowed(self):
+        with self.assertRaises(HTTPException):
+            stage_upload(UploadFile(file=io.BytesIO(b""), filename="empty.pdf"), allow_empty=False)
+        self.assertEqual(_part_files(), self.before)
+
+    def test_discard_removes_staged_file(self):
+        staged = stage_upload(UploadFile(file=io.BytesIO(b"abc"), filename="a.pdf"))
+        staged.discard()
+        self.assertFalse(staged.path.exists())
+
+
+class ForumUploadTests(unittest.TestCase):
+    def test_rejected_upload_leaves_no_partial_file(self):
+        headers = coach_headers(create_coach())
+        client = get_client()
+        post_id = client.post("/api/forum/posts", json={"title": "Медия", "content": "текст"}, headers=headers).json()["id"]
+        before = _part_files()
+
+        response = client.post(
+            f"/api/forum/posts/{post_id}/media", files={"file": ("empty.pdf", b"", "application/pdf")}, headers=headers
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(_part_files(), before)
+        topic = client.get(f"/api/forum/posts/{post_id}", headers=headers).json()
+        self.assertEqual((topic["media_count"], topic["media_items"]), (0, []))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,7 @@
 import { Link, useNavigate } from "react-router-dom";
 import { useEffect, useMemo, useState } from "react";
 import { useAuth } from "./auth/AuthContext";
-import axiosInstance from "./utils/apiClient";
+import axiosInstance, { API_BASE_URL } from "./utils/apiClient";
 import { API_PATHS } from "./utils/apiPaths";
 
 export default function Navbar() {
@@ -44,10 +44,47 @@ export default function Navbar() {
       }
     };
     loadNotifications();
-    const timer = window.setInterval(loadNotifications, 45000);
+
+    // Push вместо polling: сървърът праща unread_count и нови отговори в следваните теми.
+    let socket = null;
+    let retryTimer = null;
+    let retryDelay = 2000;
+    const connect = () => {
+      const token = localStorage.getItem("access_token") || localStorage.getItem("token");
+      if (!token || cancelled) return;
+      const wsBase = API_BASE_URL.replace(/^http/, "ws");
+      socket = new WebSocket(`${wsBase}${API_PATHS.FORUM_PUSH_WS}?token=${encodeURIComponent(token)}`);
+      socket.onopen = () => {
+        retryDelay = 2000;
+      };
+      socket.onmessage = (event) => {
+        let data = null;
+        try {
+          data = JSON.parse(event.data);
+        } catch {
+          return;
+        }
+        if (data?.type === "unread_count") {
+          setUnreadCount(Number(data.unread_count) || 0);
+        } else if (data?.type === "reply") {
+          loadNotifications();
+        }
+      };
+      socket.onclose = () => {
+        if (cancelled) return;
+        retryTimer = window.setTimeout(() => {
+          loadNotifications();
+          connect();
+        }, retryDelay);
+        retryDelay = Math.min(retryDelay * 2, 60000);
+      };
+    };
+    connect();
+
     return () => {
       cancelled = true;
-      window.clearInterval(timer);
+      window.clearTimeout(retryTimer);
+      if (socket) socket.close();
     };
   }, [user]);
 
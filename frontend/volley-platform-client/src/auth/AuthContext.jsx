@@ -4,10 +4,12 @@ import { createContext, useContext, useEffect, useMemo, useState } from "react";
 import axiosInstance from "../utils/apiClient";
 import {
   clearAuth,
+  getRefreshToken,
   getToken,
   getUser,
   isAdmin as checkIsAdmin,
   isAuthenticated as checkIsAuthenticated,
+  setRefreshToken,
   setToken,
   setUser,
 } from "../utils/auth";
@@ -53,6 +55,7 @@ export const AuthProvider = ({ children }) => {
       }
 
       setToken(token);
+      setRefreshToken(res.data?.refresh_token);
 
       // fetch profile
       const meRes = await axiosInstance.get("/auth/me");
@@ -77,6 +80,11 @@ export const AuthProvider = ({ children }) => {
   };
 
   const logout = () => {
+    const refreshToken = getRefreshToken();
+    if (refreshToken) {
+      // Отменя refresh токена на сървъра; изходът не чака отговора.
+      axiosInstance.post("/auth/logout", { refresh_token: refreshToken }).catch(() => {});
+    }
     clearAuth();
     setUserState(null);
   };
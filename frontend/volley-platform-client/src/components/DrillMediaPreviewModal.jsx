@@ -167,12 +167,20 @@ function collectDrillMedia(drill) {
   const seen = new Set();
   const dedupedVideos = videoItems.filter((x) => (seen.has(x.src) ? false : (seen.add(x.src), true)));
 
-  return { images, videoItems: dedupedVideos };
+  // Генерирани от backend-а thumbnails за локални снимки (drill.media[].thumbnail_url)
+  const thumbs = {};
+  for (const m of Array.isArray(drill?.media) ? drill.media : []) {
+    if (m?.kind !== "image" || !m?.thumbnail_url) continue;
+    const full = resolveMediaUrl(m.url);
+    if (full) thumbs[full] = resolveMediaUrl(m.thumbnail_url);
+  }
+
+  return { images, videoItems: dedupedVideos, thumbs };
 }
 
 export function getDrillPrimaryMedia(drill) {
-  const { images, videoItems } = collectDrillMedia(drill || {});
-  if (images.length > 0) return { type: "image", src: images[0] };
+  const { images, videoItems, thumbs } = collectDrillMedia(drill || {});
+  if (images.length > 0) return { type: "image", src: thumbs[images[0]] || images[0] };
   if (videoItems.length > 0) return { type: "video", src: videoItems[0].src };
   return null;
 }
@@ -248,7 +256,7 @@ function ImageLightbox({ src, alt, onClose }) {
 export default function DrillMediaPreviewModal({ drill, onClose }) {
   const title = drill?.title || `Упражнение #${drill?.id}`;
 
-  const { images, videoItems } = useMemo(() => collectDrillMedia(drill || {}), [drill]);
+  const { images, videoItems, thumbs } = useMemo(() => collectDrillMedia(drill || {}), [drill]);
 
   const defaultMain = useMemo(() => {
     if (videoItems.length > 0) return { type: "video", index: 0 };
@@ -423,7 +431,7 @@ export default function DrillMediaPreviewModal({ drill, onClose }) {
                       onClick={() => setMain({ type: "image", index: i })}
                       title="Покажи снимка"
                     >
-                      <img className="dmpImgThumb" src={src} alt={`thumb-${i}`} />
+                      <img className="dmpImgThumb" src={thumbs[src] || src} alt={`thumb-${i}`} loading="lazy" />
                     </button>
                   ))}
                 </div>
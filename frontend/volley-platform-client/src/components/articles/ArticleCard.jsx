@@ -7,6 +7,7 @@ import {
   formatDateBg,
   getLocalReadCount,
   pickCoverImage,
+  pickCoverSrcSet,
   statusMeta,
 } from "./articleUtils";
 import "./articles.css";
@@ -19,10 +20,11 @@ function placeholderStyle() {
 }
 
 export default function ArticleCard({ article }) {
-  const cover = pickCoverImage(article);
+  const cover = pickCoverImage(article, 480);
+  const coverSrcSet = pickCoverSrcSet(article);
   const topics = articleTopics(article);
   const level = articleLevel(article);
-  const readMin = estimateReadMinutes(article?.content || article?.excerpt || "");
+  const readMin = article?.reading_minutes || estimateReadMinutes(article?.content || article?.excerpt || "");
   const st = statusMeta(article?.status);
   const readCount = getLocalReadCount(article.id);
 
@@ -32,7 +34,7 @@ export default function ArticleCard({ article }) {
         {cover ? (
           <img
             src={cover}
-            srcSet={`${cover} 480w, ${cover} 960w`}
+            srcSet={coverSrcSet}
             sizes="(max-width: 740px) 100vw, 33vw"
             alt={article?.title || "Статия"}
             className="articleThumb"
@@ -57,13 +59,14 @@ export default function ArticleCard({ article }) {
         </div>
 
         <h3 className="articleTitleClamp">{article?.title}</h3>
-        <p className="articleExcerptClamp">{article?.excerpt || "Материал с практични насоки за треньорска работа."}</p>
+        <p className="articleExcerptClamp">{article?.excerpt || article?.plain_excerpt || "Материал с практични насоки за треньорска работа."}</p>
 
         <div className="articleMetaRow">
           <span>{authorDisplayLabel(article)}</span>
           <span>{formatDateBg(article?.created_at)}</span>
           <span>{readMin} мин четене</span>
           <span>{readCount} прегледа</span>
+          <span>{article?.comment_count || 0} коментара</span>
         </div>
 
         <div className="articleCtaRow">
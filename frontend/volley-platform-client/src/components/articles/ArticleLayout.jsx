@@ -32,7 +32,7 @@ export default function ArticleLayout({
           </div>
           <div className="articleHeroBody">
             <h1>{article?.title}</h1>
-            <p className="articleHeroExcerpt">{article?.excerpt || "Практически материал за работа на треньори."}</p>
+            <p className="articleHeroExcerpt">{article?.excerpt || article?.plain_excerpt || "Практически материал за работа на треньори."}</p>
             <div className="articleHeroMeta">
               <span>{authorDisplayLabel(article)}</span>
               <span>Публикувана: {formatDateBg(article?.created_at)}</span>
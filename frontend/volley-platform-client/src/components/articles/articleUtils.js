@@ -66,12 +66,33 @@ export const articleLevel = (article) => {
   return "Всички нива";
 };
 
-export const pickCoverImage = (article) => {
+// Най-малкото намалено копие, което е поне width широко (или оригиналът, докато няма копия).
+export const pickImageVariant = (media, width) => {
+  const variants = Array.isArray(media?.derivatives) ? media.derivatives : [];
+  const sorted = [...variants].sort((a, b) => a.width - b.width);
+  const match = sorted.find((d) => d.width >= width) || sorted[sorted.length - 1];
+  return resolveMediaUrl(match?.url || media?.url || "");
+};
+
+export const imageSrcSet = (media) => {
+  const variants = Array.isArray(media?.derivatives) ? media.derivatives : [];
+  return variants.map((d) => `${resolveMediaUrl(d.url)} ${d.width}w`).join(", ") || undefined;
+};
+
+const firstImageMedia = (article) => {
+  // Списъците връщат само cover_image, детайлите – всички media_items.
+  if (article?.cover_image) return article.cover_image;
   const media = Array.isArray(article?.media_items) ? article.media_items : [];
-  const firstImage = media.find((m) => String(m?.type || "").toUpperCase() === "IMAGE");
-  return resolveMediaUrl(firstImage?.url || "");
+  return media.find((m) => String(m?.type || "").toUpperCase() === "IMAGE");
 };
 
+export const pickCoverImage = (article, width = 1280) => {
+  const firstImage = firstImageMedia(article);
+  return firstImage ? pickImageVariant(firstImage, width) : "";
+};
+
+export const pickCoverSrcSet = (article) => imageSrcSet(firstImageMedia(article));
+
 export const formatBytes = (bytes) => {
   const num = Number(bytes || 0);
   if (!Number.isFinite(num) || num <= 0) return "—";
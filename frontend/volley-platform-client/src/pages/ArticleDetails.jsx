@@ -1,6 +1,7 @@
 import { useEffect, useMemo, useState } from "react";
 import { Link, useParams } from "react-router-dom";
 import axiosInstance from "../utils/apiClient";
+import { API_PATHS } from "../utils/apiPaths";
 import { useAuth } from "../auth/AuthContext";
 import ArticleAttachmentList from "../components/articles/ArticleAttachmentList";
 import ArticleLayout from "../components/articles/ArticleLayout";
@@ -32,6 +33,8 @@ export default function ArticleDetails() {
   const [error, setError] = useState("");
   const [lightboxIndex, setLightboxIndex] = useState(-1);
   const [comments, setComments] = useState([]);
+  const [commentsCursor, setCommentsCursor] = useState(null);
+  const [commentsLoadingMore, setCommentsLoadingMore] = useState(false);
   const [commentInput, setCommentInput] = useState("");
   const [commentBusy, setCommentBusy] = useState(false);
   const [editingCommentId, setEditingCommentId] = useState(null);
@@ -51,12 +54,30 @@ export default function ArticleDetails() {
     }
   };
 
+  // Коментарите идват на страници (най-старите първо) – следващите с "Зареди още".
   const loadComments = async () => {
     try {
       const res = await axiosInstance.get(`/api/articles/${id}/comments`);
-      setComments(Array.isArray(res.data) ? res.data : []);
+      setComments(Array.isArray(res.data?.items) ? res.data.items : []);
+      setCommentsCursor(res.data?.next_cursor || null);
     } catch {
       setComments([]);
+      setCommentsCursor(null);
+    }
+  };
+
+  const loadMoreComments = async () => {
+    if (!commentsCursor) return;
+    try {
+      setCommentsLoadingMore(true);
+      const res = await axiosInstance.get(`/api/articles/${id}/comments`, { params: { cursor: commentsCursor } });
+      const items = Array.isArray(res.data?.items) ? res.data.items : [];
+      setComments((prev) => [...prev, ...items]);
+      setCommentsCursor(res.data?.next_cursor || null);
+    } catch (err) {
+      setError(normalizeError(err));
+    } finally {
+      setCommentsLoadingMore(false);
     }
   };
 
@@ -69,8 +90,9 @@ export default function ArticleDetails() {
     const loadRelated = async () => {
       if (!article?.id) return;
       try {
-        const res = await axiosInstance.get("/api/articles");
-        const list = Array.isArray(res.data) ? res.data : [];
+        // Свързаните се търсят само сред най-новите – лентата вече е на страници.
+        const res = await axiosInstance.get(API_PATHS.ARTICLES_LIST, { params: { limit: 50 } });
+        const list = Array.isArray(res.data?.items) ? res.data.items : [];
         const currentTopics = new Set(articleTopics(article));
         const scored = list
           .filter((it) => it.id !== article.id)
@@ -94,7 +116,8 @@ export default function ArticleDetails() {
     user &&
     (comment.author_id === user.id ||
       ["platform_admin", "federation_admin"].includes(String(user.role || "")));
-  const readMinutes = estimateReadMinutes(article?.content || "");
+  // Сървърът пази рендера (HTML, съдържание, минути); локално само за стари статии без него.
+  const readMinutes = article?.reading_minutes || estimateReadMinutes(article?.content || "");
   const coverImage = pickCoverImage(article);
   const imageItems = useMemo(
     () =>
@@ -104,15 +127,17 @@ export default function ArticleDetails() {
     [article]
   );
 
-  const tocItems = useMemo(
-    () =>
-      extractTocItems(article?.content || "").map((label, index) => ({
-        id: `sec-${index + 1}`,
-        label,
-      })),
-    [article?.content]
+  const tocItems = useMemo(() => {
+    if (article?.content_html) return Array.isArray(article.toc) ? article.toc : [];
+    return extractTocItems(article?.content || "").map((label, index) => ({
+      id: `sec-${index + 1}`,
+      label,
+    }));
+  }, [article?.content, article?.content_html, article?.toc]);
+  const articleHtml = useMemo(
+    () => article?.content_html || toDisplayHtml(article?.content || ""),
+    [article?.content, article?.content_html]
   );
-  const articleHtml = useMemo(() => toDisplayHtml(article?.content || ""), [article?.content]);
 
   return (
     <div className="uiPage" style={{ maxWidth: "100%" }}>
@@ -281,6 +306,14 @@ export default function ArticleDetails() {
               </div>
             )}
 
+            {commentsCursor && (
+              <div style={{ marginTop: 10 }}>
+                <Button variant="secondary" size="sm" onClick={loadMoreComments} disabled={commentsLoadingMore}>
+                  {commentsLoadingMore ? "Зареждане..." : "Зареди още"}
+                </Button>
+              </div>
+            )}
+
             {canComment ? (
               <div style={{ marginTop: 12, display: "grid", gap: 8 }}>
                 <Input
@@ -1,6 +1,7 @@
 import { useEffect, useMemo, useState } from "react";
 import { Link } from "react-router-dom";
 import axiosInstance from "../utils/apiClient";
+import { API_PATHS } from "../utils/apiPaths";
 import ArticleCard from "../components/articles/ArticleCard";
 import {
   articleLevel,
@@ -25,6 +26,8 @@ export default function Articles() {
   const { user } = useAuth();
   const [articles, setArticles] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
   const [error, setError] = useState("");
   const [filters, setFilters] = useState({
     query: "",
@@ -35,24 +38,14 @@ export default function Articles() {
     sort: "newest",
   });
 
+  // Списъкът идва на страници (без съдържанието на статиите) – следващите с "Зареди още".
   const loadArticles = async () => {
     try {
       setLoading(true);
       setError("");
-      const res = await axiosInstance.get("/api/articles");
-      const baseItems = Array.isArray(res.data) ? res.data : [];
-
-      const detailed = await Promise.all(
-        baseItems.map(async (item) => {
-          try {
-            const detailsRes = await axiosInstance.get(`/api/articles/${item.id}`);
-            return detailsRes.data;
-          } catch {
-            return item;
-          }
-        })
-      );
-      setArticles(detailed);
+      const res = await axiosInstance.get(API_PATHS.ARTICLES_LIST);
+      setArticles(Array.isArray(res.data?.items) ? res.data.items : []);
+      setNextCursor(res.data?.next_cursor || null);
     } catch (err) {
       setError(normalizeError(err));
     } finally {
@@ -60,6 +53,21 @@ export default function Articles() {
     }
   };
 
+  const loadMoreArticles = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const res = await axiosInstance.get(API_PATHS.ARTICLES_LIST, { params: { cursor: nextCursor } });
+      const items = Array.isArray(res.data?.items) ? res.data.items : [];
+      setArticles((prev) => [...prev, ...items]);
+      setNextCursor(res.data?.next_cursor || null);
+    } catch (err) {
+      setError(normalizeError(err));
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     loadArticles();
   }, []);
@@ -86,7 +94,7 @@ export default function Articles() {
 
     if (filters.query.trim()) {
       const q = filters.query.trim().toLowerCase();
-      list = list.filter((a) => `${a.title || ""} ${a.excerpt || ""} ${a.content || ""}`.toLowerCase().includes(q));
+      list = list.filter((a) => `${a.title || ""} ${a.excerpt || ""} ${a.plain_excerpt || ""}`.toLowerCase().includes(q));
     }
     if (filters.topic !== "all") {
       list = list.filter((a) => articleTopics(a).includes(filters.topic));
@@ -147,7 +155,7 @@ export default function Articles() {
         <Card className="articleToolbar">
           <div className="articleFilters">
             <Input
-              placeholder="Търси по тема, заглавие, съдържание..."
+              placeholder="Търси по тема, заглавие, резюме..."
               value={filters.query}
               onChange={(e) => setFilters((p) => ({ ...p, query: e.target.value }))}
             />
@@ -210,6 +218,14 @@ export default function Articles() {
           ))}
         </div>
       )}
+
+      {!loading && !error && nextCursor && (
+        <div style={{ display: "flex", justifyContent: "center", marginTop: 16 }}>
+          <Button variant="secondary" size="sm" onClick={loadMoreArticles} disabled={loadingMore}>
+            {loadingMore ? "Зареждане..." : "Зареди още"}
+          </Button>
+        </div>
+      )}
     </div>
   );
 }
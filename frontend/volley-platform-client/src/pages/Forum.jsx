@@ -104,7 +104,7 @@ export default function Forum() {
       try {
         const [catsRes, tagsRes] = await Promise.all([
           axiosInstance.get(API_PATHS.FORUM_CATEGORIES),
-          axiosInstance.get(API_PATHS.FORUM_TAGS),
+          axiosInstance.get(API_PATHS.FORUM_TAG_COUNTS),
         ]);
         setCategories(Array.isArray(catsRes.data) ? catsRes.data : []);
         setPopularTags(Array.isArray(tagsRes.data) ? tagsRes.data : []);
@@ -356,8 +356,8 @@ export default function Forum() {
             <Input as="select" value={filters.tag} onChange={(e) => setFilters((prev) => ({ ...prev, tag: e.target.value, page: 1 }))}>
               <option value="all">Таг: всички</option>
               {popularTags.map((t) => (
-                <option key={t} value={t}>
-                  #{t}
+                <option key={t.tag} value={t.tag}>
+                  #{t.tag} ({t.count})
                 </option>
               ))}
             </Input>
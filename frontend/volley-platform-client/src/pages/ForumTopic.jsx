@@ -4,7 +4,7 @@ import { Link, useNavigate, useParams } from "react-router-dom";
 import { useAuth } from "../auth/AuthContext";
 import axiosInstance from "../utils/apiClient";
 import { API_PATHS } from "../utils/apiPaths";
-import { resolveMediaUrl } from "../components/articles/articleUtils";
+import { pickImageVariant, resolveMediaUrl } from "../components/articles/articleUtils";
 import RichTextToolbar from "../components/RichTextToolbar";
 import { Button, Card, EmptyState, Input } from "../components/ui";
 import { toDisplayHtml } from "../utils/richText";
@@ -34,6 +34,7 @@ export default function ForumTopic() {
   const [editingReplyContent, setEditingReplyContent] = useState("");
   const [uploadBusy, setUploadBusy] = useState(false);
   const [followBusy, setFollowBusy] = useState(false);
+  const [repliesLoading, setRepliesLoading] = useState(false);
   const postContentRef = useRef(null);
   const replyContentRef = useRef(null);
   const editReplyContentRef = useRef(null);
@@ -61,6 +62,26 @@ export default function ForumTopic() {
     loadPost();
   }, [id]);
 
+  const loadMoreReplies = async () => {
+    if (!post?.replies_next_cursor) return;
+    try {
+      setRepliesLoading(true);
+      const res = await axiosInstance.get(API_PATHS.FORUM_REPLIES_LIST(id), {
+        params: { cursor: post.replies_next_cursor },
+      });
+      const items = Array.isArray(res.data?.items) ? res.data.items : [];
+      setPost((prev) => ({
+        ...prev,
+        replies: [...(prev?.replies || []), ...items],
+        replies_next_cursor: res.data?.next_cursor || null,
+      }));
+    } catch (err) {
+      setError(normalizeError(err));
+    } finally {
+      setRepliesLoading(false);
+    }
+  };
+
   const isAdmin = ["platform_admin", "federation_admin"].includes(String(user?.role || ""));
   const canManagePost = post && user && (post.author_id === user.id || isAdmin);
   const canManageReply = (reply) => user && (reply.author_id === user.id || isAdmin);
@@ -176,7 +197,7 @@ export default function ForumTopic() {
                     >
                       {isImage ? (
                         <img
-                          src={resolveMediaUrl(media.url)}
+                          src={pickImageVariant(media, 480)}
                           alt={media.name || "forum media"}
                           style={{ maxWidth: 320, borderRadius: 8 }}
                         />
@@ -465,6 +486,13 @@ export default function ForumTopic() {
                 </article>
               ))}
             </div>
+            {post.replies_next_cursor && (
+              <div style={{ marginTop: 10 }}>
+                <Button variant="ghost" size="sm" disabled={repliesLoading} onClick={loadMoreReplies}>
+                  {repliesLoading ? "Зареждане..." : `Зареди още отговори (${(post.replies_count || 0) - (post.replies || []).length})`}
+                </Button>
+              </div>
+            )}
 
             {!isLocked && (
               <div style={{ marginTop: 12, display: "grid", gap: 8 }}>
@@ -45,7 +45,7 @@ export default function Home() {
           axiosInstance.get(API_PATHS.FORUM_POSTS_LIST, {
             params: { page: 1, page_size: 5 },
           }),
-          axiosInstance.get(API_PATHS.ARTICLES_LIST),
+          axiosInstance.get(API_PATHS.ARTICLES_LIST, { params: { limit: 5 } }),
         ]);
 
         const feesRows = Array.isArray(feesRes.data?.rows) ? feesRes.data.rows : [];
@@ -62,8 +62,8 @@ export default function Home() {
         const forumList = Array.isArray(forumRes.data?.items) ? forumRes.data.items : [];
         setForumItems(forumList.slice(0, 5));
 
-        const articles = Array.isArray(articlesRes.data) ? articlesRes.data : [];
-        articles.sort((a, b) => new Date(b.created_at || 0) - new Date(a.created_at || 0));
+        // Сървърът ги връща най-новите първо.
+        const articles = Array.isArray(articlesRes.data?.items) ? articlesRes.data.items : [];
         setArticleItems(articles.slice(0, 5));
       } catch (e) {
         const detail = e?.response?.data?.detail;
@@ -28,28 +28,63 @@ function chipVariant({ status, source }) {
 
 export default function MyTrainings() {
   const [items, setItems] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [q, setQ] = useState("");
-  const [filterStatus, setFilterStatus] = useState("all"); // all | saved | draft
-  const [filterSource, setFilterSource] = useState("all"); // all | generated | manual
+  const [filterStatus, setFilterStatus] = useState("all"); // all | запазена | чернова (бекенд enum)
+  const [filterSource, setFilterSource] = useState("all"); // all | генерирана | ръчна (бекенд enum)
   const navigate = useNavigate();
 
+  // Търсенето и филтрите са параметри на пагинирания endpoint – иначе съвпаденията
+  // от още незаредените страници просто липсват.
+  const [search, setSearch] = useState("");
+  useEffect(() => {
+    const timer = setTimeout(() => setSearch(q.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [q]);
+
+  const filterParams = useMemo(() => {
+    const params = { limit: 30 };
+    if (search) params.q = search;
+    if (filterStatus !== "all") params.status = filterStatus;
+    if (filterSource !== "all") params.source = filterSource;
+    return params;
+  }, [search, filterStatus, filterSource]);
+
   async function load() {
     setLoading(true);
     try {
-      const data = await apiJson("/trainings/my");
-      setItems(Array.isArray(data) ? data : []);
+      const data = await apiJson("/trainings/my", { params: filterParams });
+      setItems(Array.isArray(data?.items) ? data.items : []);
+      setNextCursor(data?.next_cursor || null);
     } catch (e) {
       alert(e?.message || "Грешка при зареждане на тренировките");
       setItems([]);
+      setNextCursor(null);
     } finally {
       setLoading(false);
     }
   }
 
+  async function loadMore() {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const data = await apiJson("/trainings/my", { params: { ...filterParams, cursor: nextCursor } });
+      const more = Array.isArray(data?.items) ? data.items : [];
+      setItems((prev) => [...prev, ...more]);
+      setNextCursor(data?.next_cursor || null);
+    } catch (e) {
+      alert(e?.message || "Грешка при зареждане на тренировките");
+    } finally {
+      setLoadingMore(false);
+    }
+  }
+
   useEffect(() => {
     load();
-  }, []);
+  }, [filterParams]);
 
   async function onDelete(id, title) {
     const ok = confirm(`Сигурен ли си, че искаш да изтриеш тренировката?\n\n${title || `#${id}`}`);
@@ -63,33 +98,8 @@ export default function MyTrainings() {
     }
   }
 
-  const filtered = useMemo(() => {
-    const qq = q.trim().toLowerCase();
-
-    return (items || [])
-      .filter((t) => {
-        if (!qq) return true;
-        const hay = `${t?.title || ""} ${t?.id || ""} ${t?.status || ""} ${t?.source || ""}`.toLowerCase();
-        return hay.includes(qq);
-      })
-      .filter((t) => {
-        const s = String(t?.status || "").toLowerCase();
-        if (filterStatus === "saved") return s.includes("запаз") || s.includes("saved");
-        if (filterStatus === "draft") return s.includes("чернова") || s.includes("draft");
-        return true;
-      })
-      .filter((t) => {
-        const src = String(t?.source || "").toLowerCase();
-        if (filterSource === "generated") return src.includes("генер") || src.includes("generated");
-        if (filterSource === "manual") return src.includes("ръч") || src.includes("manual");
-        return true;
-      })
-      .sort((a, b) => {
-        const da = a?.created_at ? new Date(a.created_at).getTime() : 0;
-        const db = b?.created_at ? new Date(b.created_at).getTime() : 0;
-        return db - da;
-      });
-  }, [items, q, filterStatus, filterSource]);
+  // Сървърът връща вече филтрирани редове, подредени по created_at, id (низходящо).
+  const filtered = items || [];
 
   return (
     <div className="mtWrap">
@@ -147,19 +157,19 @@ export default function MyTrainings() {
         <Input
           value={q}
           onChange={(e) => setQ(e.target.value)}
-          placeholder="Търси по заглавие, ID, статус…"
+          placeholder="Търси по заглавие или ID…"
         />
 
         <Input as="select" value={filterStatus} onChange={(e) => setFilterStatus(e.target.value)}>
           <option value="all">Всички статуси</option>
-          <option value="saved">Запазени</option>
-          <option value="draft">Чернови</option>
+          <option value="запазена">Запазени</option>
+          <option value="чернова">Чернови</option>
         </Input>
 
         <Input as="select" value={filterSource} onChange={(e) => setFilterSource(e.target.value)}>
           <option value="all">Всички източници</option>
-          <option value="generated">Генерирани</option>
-          <option value="manual">Ръчни</option>
+          <option value="генерирана">Генерирани</option>
+          <option value="ръчна">Ръчни</option>
         </Input>
       </div>
 
@@ -212,6 +222,14 @@ export default function MyTrainings() {
           })}
         </div>
       )}
+
+      {!loading && nextCursor && (
+        <div style={{ marginTop: 14, display: "flex", justifyContent: "center" }}>
+          <Button variant="secondary" onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? "Зареждане…" : "Зареди още"}
+          </Button>
+        </div>
+      )}
     </div>
   );
 }
@@ -1,7 +1,7 @@
 // src/utils/apiClient.js
 import axiosLib from "axios";
 
-const API_BASE_URL = import.meta.env.VITE_API_URL || "http://127.0.0.1:8000";
+export const API_BASE_URL = import.meta.env.VITE_API_URL || "http://127.0.0.1:8000";
 
 export const axiosInstance = axiosLib.create({
   baseURL: API_BASE_URL,
@@ -23,6 +23,72 @@ axiosInstance.interceptors.request.use((config) => {
   return config;
 });
 
+// Изтекъл access token -> един общ /auth/refresh за всички паралелни 401 и повторна заявка.
+// Паролата (и bcrypt на сървъра) трябва само при истински вход.
+// Табовете делят localStorage: refresh-ът е под Web Lock, а след заключването токенът се
+// чете наново – ако друг таб вече го е сменил, ползваме неговия вместо втора ротация.
+const AUTH_ENDPOINTS = ["/auth/login", "/auth/refresh", "/auth/logout"];
+const REFRESH_LOCK = "volley-auth-refresh";
+let refreshPromise = null;
+
+const readAccessToken = () => localStorage.getItem("access_token") || localStorage.getItem("token");
+
+const withRefreshLock = (callback) =>
+  typeof navigator !== "undefined" && navigator.locks?.request
+    ? navigator.locks.request(REFRESH_LOCK, callback)
+    : callback();
+
+const rotateRefreshToken = async (staleAccessToken) => {
+  const current = readAccessToken();
+  if (current && current !== staleAccessToken) return current;
+
+  const refreshToken = localStorage.getItem("refresh_token");
+  if (!refreshToken) throw new Error("Missing refresh token");
+  try {
+    const res = await axiosLib.post(`${API_BASE_URL}/auth/refresh`, { refresh_token: refreshToken });
+    const token = res.data?.access_token;
+    localStorage.setItem("access_token", token);
+    localStorage.setItem("token", token);
+    localStorage.setItem("refresh_token", res.data?.refresh_token);
+    return token;
+  } catch (err) {
+    // Токенът е отменен или изтекъл – вече не става за нищо (освен ако друг таб не го е сменил).
+    if (err?.response?.status === 401 && localStorage.getItem("refresh_token") === refreshToken) {
+      localStorage.removeItem("refresh_token");
+    }
+    throw err;
+  }
+};
+
+const refreshAccessToken = (staleAccessToken) => {
+  if (!refreshPromise) {
+    refreshPromise = withRefreshLock(() => rotateRefreshToken(staleAccessToken)).finally(() => {
+      refreshPromise = null;
+    });
+  }
+  return refreshPromise;
+};
+
+axiosInstance.interceptors.response.use(
+  (res) => res,
+  async (error) => {
+    const original = error?.config;
+    if (error?.response?.status !== 401 || !original || original._retried || AUTH_ENDPOINTS.includes(original.url)) {
+      return Promise.reject(error);
+    }
+    original._retried = true;
+    const staleAccessToken = (original.headers?.Authorization || "").replace(/^Bearer /, "");
+    try {
+      const token = await refreshAccessToken(staleAccessToken);
+      original.headers = original.headers || {};
+      original.headers.Authorization = `Bearer ${token}`;
+      return axiosInstance.request(original);
+    } catch {
+      return Promise.reject(error);
+    }
+  }
+);
+
 export const apiClient = async (path, options = {}) => {
   const method = (options.method || "GET").toUpperCase();
   const res = await axiosInstance.request({
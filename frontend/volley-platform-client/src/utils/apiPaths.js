@@ -76,10 +76,13 @@ export const API_PATHS = {
   FORUM_POST_FOLLOW: (id) => `/api/forum/posts/${id}/follow`,
   FORUM_CATEGORIES: "/api/forum/categories",
   FORUM_TAGS: "/api/forum/tags",
+  FORUM_TAG_COUNTS: "/api/forum/tags/counts",
+  FORUM_PUSH_WS: "/api/forum/ws",
   FORUM_NOTIFICATIONS: "/api/forum/notifications",
   FORUM_NOTIFICATION_READ: (notificationId) => `/api/forum/notifications/${notificationId}/read`,
   FORUM_NOTIFICATIONS_READ_ALL: "/api/forum/notifications/read-all",
   FORUM_REPLY_CREATE: (postId) => `/api/forum/posts/${postId}/replies`,
+  FORUM_REPLIES_LIST: (postId) => `/api/forum/posts/${postId}/replies`,
   FORUM_REPLY_UPDATE: (postId, replyId) => `/api/forum/posts/${postId}/replies/${replyId}`,
   FORUM_REPLY_DELETE: (postId, replyId) => `/api/forum/posts/${postId}/replies/${replyId}`,
 
@@ -5,6 +5,7 @@ import { apiClient } from "./apiClient";
 
 const TOKEN_KEY = "access_token";
 const LEGACY_TOKEN_KEY = "token";
+const REFRESH_TOKEN_KEY = "refresh_token";
 const ROLE_KEY = "role";
 const USER_KEY = "user";
 
@@ -35,6 +36,16 @@ export const getToken = () => {
   );
 };
 
+export const setRefreshToken = (token) => {
+  if (!token) {
+    localStorage.removeItem(REFRESH_TOKEN_KEY);
+    return;
+  }
+  localStorage.setItem(REFRESH_TOKEN_KEY, token);
+};
+
+export const getRefreshToken = () => localStorage.getItem(REFRESH_TOKEN_KEY) || null;
+
 /**
  * Role helpers
  */
@@ -85,6 +96,7 @@ export const setAuth = (token, role = null, user = null) => {
 export const clearAuth = () => {
   localStorage.removeItem(TOKEN_KEY);
   localStorage.removeItem(LEGACY_TOKEN_KEY);
+  localStorage.removeItem(REFRESH_TOKEN_KEY);
   localStorage.removeItem(ROLE_KEY);
   localStorage.removeItem(USER_KEY);
 };